@@ -0,0 +1,239 @@
+# backend/benchmark.py
+#
+# Mede as rotas principais e as funções centrais (projeção, relatórios,
+# resumo, PDF) contra o banco configurado em DATABASE_URL, SQLite ou
+# PostgreSQL, populado por backend/dados_sinteticos.py. A linha de base
+# versionada (benchmarks/baseline-sqlite.json) usa esta massa, num banco
+# novo:
+#
+#   flask --app backend.app gerar-dados --pacientes 2000 --transacoes 200000 \
+#       --notas 20000 --simulacoes 50 --semente 42
+#   flask --app backend.app benchmark               # mostra a variação contra a base
+#   flask --app backend.app benchmark --comparar    # idem, e sai com erro se regredir
+#   flask --app backend.app benchmark --salvar      # grava uma nova linha de base
+#
+# Antes de medir, os meses encerrados dos relatórios são fechados, como faz
+# o cron de fechar-relatorios em produção.
+#
+# Cada caso roda uma vez para aquecer (caches, planos de consulta) e depois
+# `repeticoes` vezes; o número de referência é a mediana. As rotas passam
+# pelo test client do Flask (sem servidor HTTP) e registram também quantas
+# consultas SQL fizeram, lidas do cabeçalho Server-Timing.
+#
+# As linhas de base ficam em benchmarks/baseline-<banco>.json, com os
+# volumes de dados medidos: só compare resultados da mesma máquina e da
+# mesma massa de dados.
+
+import json
+import os
+import platform
+import re
+import statistics
+from datetime import datetime
+from time import perf_counter
+
+from sqlalchemy import func, select
+
+from backend.db import db
+from backend.models import Paciente, Nota, Transacao, Simulacao, SimulacaoItem, SimulacaoEvento
+from backend.relatorios import _calcular, fechar_meses, mes_atual, montar_relatorio
+from backend.resumo import ler_resumo, reconstruir_resumo
+
+DIRETORIO_BASELINE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                  'benchmarks')
+
+XHR = {'X-Requested-With': 'XMLHttpRequest'}
+
+# (nome, caminho, cabeçalhos); {simulacao} e {paciente} são preenchidos
+# com registros existentes
+ROTAS = (
+    ('dashboard', '/dashboard', None),
+    ('transacoes', '/transacoes', None),
+    ('transacoes_periodo_30', '/transacoes?periodo=30', None),
+    ('transacoes_ordem_valor', '/transacoes?ordenar_por=valor&ordem=asc', None),
+    ('transacoes_ordem_observacao', '/transacoes?ordenar_por=observacao', None),
+    ('transacoes_parcial_xhr', '/transacoes?tipo=despesa&limite=100', XHR),
+    ('transacoes_exportar_csv_30d', '/transacoes/exportar?periodo=30&formato=csv', None),
+    ('pacientes', '/pacientes', None),
+    ('pacientes_busca_nome', '/pacientes?q=silva', XHR),
+    ('pacientes_busca_cpf', '/pacientes?q=100.000', XHR),
+    ('pacientes_receitas', '/pacientes/{paciente}/receitas', None),
+    ('notas', '/notas', None),
+    ('notas_por_paciente', '/notas?paciente_id={paciente}', None),
+    ('relatorios', '/relatorios', None),
+    ('simulacoes', '/simulacoes', None),
+    ('simulacoes_comparar', '/simulacoes/comparar?meses=24', None),
+    ('simulacao_detalhe', '/simulacoes/{simulacao}?meses=60', None),
+)
+
+_RE_CONSULTAS = re.compile(r'consultas: (\d+)')
+
+
+def volumes():
+    """Quantidade de linhas das tabelas medidas (vai junto da linha de base)."""
+    return {
+        modelo.__tablename__: db.session.execute(select(func.count()).select_from(modelo)).scalar()
+        for modelo in (Paciente, Transacao, Nota, Simulacao)
+    }
+
+
+def _medir(funcao, repeticoes):
+    funcao()  # aquecimento
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = perf_counter()
+        funcao()
+        tempos.append((perf_counter() - inicio) * 1000)
+    return {
+        'mediana_ms': round(statistics.median(tempos), 3),
+        'min_ms': round(min(tempos), 3),
+        'max_ms': round(max(tempos), 3),
+    }
+
+
+def _casos_de_rota(app):
+    cliente = app.test_client()
+    # Sessão já autenticada: o hash da senha no /login não entra na medição
+    with cliente.session_transaction() as sessao:
+        sessao['user_id'] = 0
+
+    ids = {
+        'paciente': db.session.execute(
+            select(Transacao.paciente_id).where(Transacao.paciente_id.is_not(None)).limit(1)
+        ).scalar(),
+        'simulacao': db.session.execute(select(func.min(Simulacao.id))).scalar(),
+    }
+    casos = {}
+    for nome, caminho, cabecalhos in ROTAS:
+        chaves = re.findall(r'{(\w+)}', caminho)
+        if any(ids[chave] is None for chave in chaves):
+            continue  # sem dados para esta rota
+        url = caminho.format(**ids)
+
+        def requisicao(url=url, cabecalhos=cabecalhos):
+            resposta = cliente.get(url, headers=cabecalhos)
+            resposta.get_data()  # consome respostas em streaming (exportação)
+            if resposta.status_code != 200:
+                raise RuntimeError(f'{url} respondeu {resposta.status_code}')
+            return resposta
+
+        casos[nome] = requisicao
+    return casos
+
+
+def _casos_de_funcao():
+    from backend.pdf_notas import renderizar_pdf
+    from backend.projecao import comparar_cenarios, projetar
+
+    fim = mes_atual()
+    ano, mes = int(fim[:4]), int(fim[5:7])
+    inicio = f'{ano - 1 + mes // 12:04d}-{mes % 12 + 1:02d}'
+
+    itens = db.session.execute(
+        select(SimulacaoItem.simulacao_id, SimulacaoItem.pacientes, SimulacaoItem.valor_sessao)
+    ).all()
+    eventos = db.session.execute(
+        select(SimulacaoEvento.simulacao_id, SimulacaoEvento.mes_offset, SimulacaoEvento.delta)
+    ).all()
+    ids = sorted({sid for sid, _, _ in itens})
+    posicao = {sid: i for i, sid in enumerate(ids)}
+    primeira = ids[0] if ids else None
+
+    def _colunas(linhas):
+        return tuple(zip(*linhas)) if linhas else ([], [], [])
+
+    lote_itens = _colunas([(posicao[s], p, v) for s, p, v in itens])
+    lote_eventos = _colunas([(posicao[s], m, d) for s, m, d in eventos if s in posicao])
+
+    nota = {'id': 1, 'data': '31/01/2026', 'valor': '1.250,00', 'periodo': '2026-01',
+            'descricao': '5 sessões em 01/2026 ' * 10, 'paciente_nome': 'Ana Silva Souza',
+            'paciente_cpf': '123.456.789-00'}
+
+    return {
+        'ler_resumo': ler_resumo,
+        'relatorio_12_meses': lambda: montar_relatorio(inicio, fim),
+        'relatorio_12_meses_sem_congelamento': lambda: _calcular(inicio, fim),
+        'reconstruir_resumo': reconstruir_resumo,
+        'projetar_60_meses': lambda: projetar(
+            [(p, v) for s, p, v in itens if s == primeira],
+            [(m, d) for s, m, d in eventos if s == primeira], 5000, 60),
+        'comparar_cenarios_60_meses': lambda: comparar_cenarios(
+            len(ids), lote_itens, lote_eventos, [5000.0] * len(ids), 60),
+        'renderizar_pdf': lambda: renderizar_pdf(nota),
+    }
+
+
+def executar(app, repeticoes=5, filtro=None):
+    """
+    Roda os casos (os que contêm `filtro` no nome, se informado) e devolve
+    o documento da linha de base: metadados e {caso: medidas}.
+    """
+    fechar_meses()
+    casos = {f'rota:{nome}': f for nome, f in _casos_de_rota(app).items()}
+    casos.update({f'funcao:{nome}': f for nome, f in _casos_de_funcao().items()})
+
+    resultados = {}
+    for nome, funcao in casos.items():
+        if filtro and filtro not in nome:
+            continue
+        consultas = {}
+
+        def caso(funcao=funcao):
+            retorno = funcao()
+            servidor = getattr(retorno, 'headers', None)
+            if servidor is not None:
+                encontrado = _RE_CONSULTAS.search(', '.join(servidor.getlist('Server-Timing')))
+                if encontrado:
+                    consultas['sql'] = int(encontrado.group(1))
+
+        resultados[nome] = _medir(caso, repeticoes)
+        if 'sql' in consultas:
+            resultados[nome]['consultas_sql'] = consultas['sql']
+        # Funções que escrevem (reconstruir_resumo) não deixam sessão suja
+        db.session.rollback()
+
+    return {
+        'gerado_em': datetime.now().isoformat(timespec='seconds'),
+        'banco': db.engine.dialect.name,
+        'python': platform.python_version(),
+        'maquina': platform.node(),
+        'repeticoes': repeticoes,
+        'volumes': volumes(),
+        'resultados': resultados,
+    }
+
+
+def caminho_baseline(banco):
+    return os.path.join(DIRETORIO_BASELINE, f'baseline-{banco}.json')
+
+
+def salvar(documento, caminho):
+    os.makedirs(os.path.dirname(caminho) or '.', exist_ok=True)
+    with open(caminho, 'w', encoding='utf-8') as f:
+        json.dump(documento, f, ensure_ascii=False, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def carregar(caminho):
+    with open(caminho, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def comparar(atual, base, tolerancia=0.20, piso_ms=2.0):
+    """
+    Compara duas execuções caso a caso. Devolve uma lista de
+    (caso, mediana base, mediana atual, variação, regrediu); uma regressão
+    é a mediana piorar mais que `tolerancia` e mais que `piso_ms` (abaixo
+    disso é ruído de medição).
+    """
+    linhas = []
+    for nome, medidas in sorted(atual['resultados'].items()):
+        anterior = base['resultados'].get(nome)
+        if anterior is None:
+            linhas.append((nome, None, medidas['mediana_ms'], None, False))
+            continue
+        antes, agora = anterior['mediana_ms'], medidas['mediana_ms']
+        variacao = (agora - antes) / antes if antes else 0.0
+        regrediu = variacao > tolerancia and agora - antes > piso_ms
+        linhas.append((nome, antes, agora, variacao, regrediu))
+    return linhas
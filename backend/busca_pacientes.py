@@ -0,0 +1,62 @@
+# backend/busca_pacientes.py
+#
+# Filtros da listagem de pacientes. No PostgreSQL a busca por trecho do
+# nome usa f_unaccent(lower(nome)), a mesma expressão do índice trigram
+# criado pela migration; nos demais bancos cai para ILIKE.
+
+from sqlalchemy import func, text
+
+from backend.models import db, Paciente, normalizar_cpf
+
+_tem_unaccent = None
+
+
+def _busca_com_unaccent():
+    """Verifica (uma vez por processo) se a função f_unaccent existe no banco."""
+    global _tem_unaccent
+    if _tem_unaccent is None:
+        if db.engine.dialect.name != 'postgresql':
+            _tem_unaccent = False
+        else:
+            _tem_unaccent = bool(db.session.execute(
+                text("SELECT to_regprocedure('f_unaccent(text)') IS NOT NULL")
+            ).scalar())
+    return _tem_unaccent
+
+
+def _escapar_like(termo):
+    return termo.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def eh_busca_por_cpf(termo):
+    """Termos sem letras e com pelo menos 3 dígitos são tratados como CPF."""
+    digitos = normalizar_cpf(termo) or ''
+    return len(digitos) >= 3 and not any(c.isalpha() for c in termo)
+
+
+def filtrar_pacientes(query, termo=None, status=None):
+    """
+    Aplica à `query` o filtro de status ('ativos'/'inativos') e a busca
+    por nome (trecho) ou CPF (prefixo, só dígitos).
+    """
+    if status == 'ativos':
+        query = query.filter(Paciente.active.is_(True))
+    elif status == 'inativos':
+        query = query.filter(Paciente.active.is_(False))
+
+    termo = (termo or '').strip()
+    if not termo:
+        return query
+
+    if eh_busca_por_cpf(termo):
+        digitos = normalizar_cpf(termo)
+        if len(digitos) == 11:
+            return query.filter(Paciente.cpf_normalizado == digitos)
+        return query.filter(Paciente.cpf_normalizado.like(_escapar_like(digitos) + '%', escape='\\'))
+
+    padrao = '%' + _escapar_like(termo.lower()) + '%'
+    if _busca_com_unaccent():
+        return query.filter(
+            func.f_unaccent(func.lower(Paciente.nome)).like(func.f_unaccent(padrao), escape='\\')
+        )
+    return query.filter(Paciente.nome.ilike(padrao, escape='\\'))
@@ -0,0 +1,145 @@
+# backend/cache_projecao.py
+#
+# Cache das projeções de simulação, chaveado por (id, criada, versao, meses)
+# (ver chave_projecao). Simulacao.versao é incrementada a cada edição e
+# created_at distingue uma simulação nova que reaproveitou o id de uma
+# excluída (o SQLite reaproveita ids), então uma entrada antiga nunca é
+# servida no lugar de outra, mesmo em um worker que não viu a invalidação.
+#
+# Camadas:
+#   1. memória do processo, LRU com no máximo PROJECAO_CACHE_TAMANHO entradas;
+#   2. opcional, diretório em disco (PROJECAO_CACHE_DIR) compartilhado entre
+#      os workers do gunicorn, com no máximo PROJECAO_CACHE_MAX_ARQUIVOS
+#      arquivos (os menos usados, pelo mtime, saem primeiro). Gravar uma
+#      versão apaga as anteriores da mesma simulação, e .tmp abandonados
+#      por escritas interrompidas são removidos.
+
+import glob
+import logging
+import os
+import pickle
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# Um .tmp mais velho que isso é de uma escrita que não terminou
+IDADE_MAXIMA_TMP = 3600
+
+
+def chave_projecao(sim, meses):
+    """Chave do cache para a projeção de `meses` meses da simulação `sim`."""
+    criada = f'{sim.created_at:%Y%m%d%H%M%S%f}' if sim.created_at else '0'
+    return (sim.id, criada, sim.versao, meses)
+
+
+class CacheProjecao:
+    def __init__(self, tamanho_maximo=256, diretorio=None, max_arquivos=1024):
+        self.tamanho_maximo = tamanho_maximo
+        self.diretorio = diretorio
+        self.max_arquivos = max_arquivos
+        self._entradas = OrderedDict()
+        self._lock = threading.Lock()
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+
+    def _arquivo(self, chave):
+        return os.path.join(self.diretorio, '-'.join(map(str, chave)) + '.pkl')
+
+    def obter(self, chave):
+        with self._lock:
+            if chave in self._entradas:
+                self._entradas.move_to_end(chave)
+                return self._entradas[chave]
+        if self.diretorio:
+            arquivo = self._arquivo(chave)
+            try:
+                with open(arquivo, 'rb') as f:
+                    valor = pickle.load(f)
+                os.utime(arquivo)  # recém-usado: é o último a sair na poda
+            except (OSError, pickle.UnpicklingError, EOFError):
+                return None
+            self._guardar_em_memoria(chave, valor)
+            return valor
+        return None
+
+    def guardar(self, chave, valor):
+        self._guardar_em_memoria(chave, valor)
+        if self.diretorio:
+            # Escrita atômica: outro worker nunca lê um arquivo pela metade
+            try:
+                fd, tmp = tempfile.mkstemp(dir=self.diretorio, suffix='.tmp')
+                with os.fdopen(fd, 'wb') as f:
+                    pickle.dump(valor, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp, self._arquivo(chave))
+            except OSError:
+                logger.warning('Não foi possível gravar o cache de projeção em disco', exc_info=True)
+                return
+            self._podar_disco(chave)
+
+    def _guardar_em_memoria(self, chave, valor):
+        with self._lock:
+            self._entradas[chave] = valor
+            self._entradas.move_to_end(chave)
+            while len(self._entradas) > self.tamanho_maximo:
+                self._entradas.popitem(last=False)
+
+    def _podar_disco(self, chave):
+        """Apaga versões antigas da simulação de `chave`, .tmp abandonados e o excesso."""
+        sim_id, criada, versao = chave[:3]
+        atual = f'{sim_id}-{criada}-{versao}-'
+        remover = {a for a in glob.glob(os.path.join(self.diretorio, f'{sim_id}-*.pkl'))
+                   if not os.path.basename(a).startswith(atual)}
+
+        restantes = []
+        for arquivo in glob.glob(os.path.join(self.diretorio, '*.pkl')):
+            if arquivo not in remover:
+                try:
+                    restantes.append((os.path.getmtime(arquivo), arquivo))
+                except OSError:
+                    pass  # removido por outro worker
+        if len(restantes) > self.max_arquivos:
+            restantes.sort()
+            remover.update(a for _, a in restantes[:len(restantes) - self.max_arquivos])
+
+        limite_tmp = time.time() - IDADE_MAXIMA_TMP
+        for arquivo in glob.glob(os.path.join(self.diretorio, '*.tmp')):
+            try:
+                if os.path.getmtime(arquivo) < limite_tmp:
+                    remover.add(arquivo)
+            except OSError:
+                pass
+
+        for arquivo in remover:
+            try:
+                os.remove(arquivo)
+            except OSError:
+                pass
+
+    def invalidar(self, sim_id):
+        """Remove todas as versões em cache de uma simulação."""
+        with self._lock:
+            for chave in [c for c in self._entradas if c[0] == sim_id]:
+                del self._entradas[chave]
+        if self.diretorio:
+            for arquivo in glob.glob(os.path.join(self.diretorio, f'{sim_id}-*.pkl')):
+                try:
+                    os.remove(arquivo)
+                except OSError:
+                    pass
+
+    def obter_ou_calcular(self, chave, calcular):
+        valor = self.obter(chave)
+        if valor is None:
+            valor = calcular()
+            self.guardar(chave, valor)
+        return valor
+
+
+cache_projecoes = CacheProjecao(
+    tamanho_maximo=int(os.getenv('PROJECAO_CACHE_TAMANHO', '256')),
+    diretorio=os.getenv('PROJECAO_CACHE_DIR') or None,
+    max_arquivos=int(os.getenv('PROJECAO_CACHE_MAX_ARQUIVOS', '1024')),
+)
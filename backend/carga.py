@@ -0,0 +1,347 @@
+# backend/carga.py
+#
+# Teste de carga de ponta a ponta: N recepcionistas simultâneas, cada uma
+# com sua sessão (login em /login), repetem um dia típico de consultório
+# contra um servidor HTTP de verdade:
+#
+#   dashboard            GET  /dashboard
+#   transacoes           GET  /transacoes (parcial XHR, filtro e ordem sorteados)
+#   registrar_sessao     POST /pacientes/sessoes (JSON)
+#   editar_paciente      GET  /pacientes/<id>/edit + POST do mesmo formulário
+#   simulacao            GET  /simulacoes/<id>
+#
+# Ao fim de cada nível de concorrência mostra, por rota, vazão, latência
+# p50/p95/p99 e taxa de erro.
+#
+#   python -m backend.carga --url http://127.0.0.1:8000 --usuarios 5,10,20 \
+#       --email admin@admin.com --senha ...
+#   python -m backend.carga --gunicorn 4 --usuarios 10,20,40   # sobe o servidor
+#
+# Só usa a biblioteca padrão. Registra sessões de verdade (transações
+# novas) e regrava pacientes com os mesmos dados: rode contra um banco de
+# teste, por exemplo um populado por `flask gerar-dados`. O gerador roda
+# em threads de um único processo; acima de algumas centenas de
+# requisições por segundo, confira se ele não virou o gargalo (CPU a 100%).
+
+import argparse
+import html
+import http.client
+import http.cookiejar
+import json
+import math
+import os
+import random
+import re
+import socket
+import subprocess
+import sys
+import threading
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import Counter, defaultdict
+from time import monotonic, perf_counter, sleep
+
+# Peso de cada ação no dia típico
+MIX_PADRAO = {
+    'dashboard': 25,
+    'transacoes': 30,
+    'registrar_sessao': 15,
+    'editar_paciente': 10,
+    'simulacao': 20,
+}
+
+PERIODOS = ('', 'hoje', 'semana', 'mes', '30', '60')
+ORDENACOES = ('data_criacao', 'nome', 'valor', 'observacao')
+HORIZONTES = (12, 24, 36, 60)
+
+_RE_PACIENTE_ATIVO = re.compile(r'value="(\d+)" form="sessoes-em-lote"\s*>')
+_RE_SIMULACAO = re.compile(r'href="/simulacoes/(\d+)"')
+_RE_CAMPO = re.compile(r'<input[^>]*name="(\w+)"[^>]*value="([^"]*)"', re.S)
+
+
+class _SemRedirecionar(urllib.request.HTTPRedirectHandler):
+    # Os redirecionamentos (login, POSTs) são avaliados, não seguidos
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+
+class Falha(Exception):
+    pass
+
+
+class Recepcionista:
+    """Um usuário virtual: sessão própria e estatísticas próprias."""
+
+    def __init__(self, base, email, senha, pacientes, simulacoes, mix, semente, timeout):
+        self.base = base.rstrip('/')
+        self.email, self.senha = email, senha
+        self.pacientes, self.simulacoes = pacientes, simulacoes
+        self.acoes, self.pesos = zip(*mix.items())
+        self.rng = random.Random(semente)
+        self.timeout = timeout
+        self.cliente = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()), _SemRedirecionar)
+        self.latencias = defaultdict(list)  # rota -> [ms] das bem-sucedidas
+        self.erros = defaultdict(Counter)    # rota -> {motivo: vezes}
+
+    def _requisicao(self, metodo, caminho, dados=None, cabecalhos=None, json_=None):
+        """Devolve (status, Location, corpo); erros HTTP não levantam exceção."""
+        cabecalhos = dict(cabecalhos or {})
+        corpo = None
+        if json_ is not None:
+            corpo = json.dumps(json_).encode()
+            cabecalhos['Content-Type'] = 'application/json'
+        elif dados is not None:
+            corpo = urllib.parse.urlencode(dados).encode()
+        req = urllib.request.Request(self.base + caminho, data=corpo, headers=cabecalhos, method=metodo)
+        try:
+            with self.cliente.open(req, timeout=self.timeout) as resposta:
+                return resposta.status, resposta.headers.get('Location', ''), resposta.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.headers.get('Location', ''), e.read()
+
+    def _medir(self, rota, funcao):
+        inicio = perf_counter()
+        try:
+            funcao()
+        except Falha as e:
+            self.erros[rota][str(e)] += 1
+        except (OSError, http.client.HTTPException) as e:  # recusada, timeout, resposta cortada
+            self.erros[rota][type(e).__name__] += 1
+        else:
+            self.latencias[rota].append((perf_counter() - inicio) * 1000)
+
+    def _esperar(self, resposta, *status_ok, destino=None):
+        status, location, _ = resposta
+        if '/login' in location:
+            raise Falha('sessão perdida')
+        if status not in status_ok or (destino and destino not in location):
+            raise Falha(f'HTTP {status}')
+        return resposta
+
+    def login(self):
+        def _login():
+            self._esperar(self._requisicao('POST', '/login', {'email': self.email, 'senha': self.senha}),
+                          302, destino='/dashboard')
+        self._medir('login', _login)
+        return not self.erros['login']
+
+    # Ações do dia típico
+
+    def dashboard(self):
+        self._esperar(self._requisicao('GET', '/dashboard'), 200)
+
+    def transacoes(self):
+        parametros = urllib.parse.urlencode({
+            'tipo': self.rng.choice(('receita', 'despesa')),
+            'periodo': self.rng.choice(PERIODOS),
+            'ordenar_por': self.rng.choice(ORDENACOES),
+            'ordem': self.rng.choice(('asc', 'desc')),
+        })
+        self._esperar(self._requisicao('GET', f'/transacoes?{parametros}',
+                                       cabecalhos={'X-Requested-With': 'XMLHttpRequest'}), 200)
+
+    def registrar_sessao(self):
+        paciente_id = self.rng.choice(self.pacientes)
+        self._esperar(self._requisicao('POST', '/pacientes/sessoes',
+                                       json_={'sessoes': [{'paciente_id': paciente_id}]}), 201)
+
+    def editar_paciente(self):
+        # Abre o formulário e grava de volta os mesmos valores
+        paciente_id = self.rng.choice(self.pacientes)
+        _, _, corpo = self._esperar(self._requisicao('GET', f'/pacientes/{paciente_id}/edit'), 200)
+        campos = {nome: html.unescape(valor) for nome, valor in _RE_CAMPO.findall(corpo.decode())}
+        self._esperar(self._requisicao('POST', f'/pacientes/{paciente_id}/edit', campos),
+                      302, destino='/pacientes')
+
+    def simulacao(self):
+        sim_id = self.rng.choice(self.simulacoes)
+        self._esperar(self._requisicao('GET', f'/simulacoes/{sim_id}?meses={self.rng.choice(HORIZONTES)}'),
+                      200)
+
+    def executar(self, prazo, pausa):
+        if not self.login():
+            return
+        while monotonic() < prazo:
+            acao = self.rng.choices(self.acoes, self.pesos)[0]
+            self._medir(acao, getattr(self, acao))
+            if pausa:
+                sleep(self.rng.uniform(0, 2 * pausa))  # média = pausa
+
+
+def descobrir(base, email, senha, timeout):
+    """Lê, pelo próprio HTTP, pacientes ativos e simulações para o mix usar."""
+    r = Recepcionista(base, email, senha, [], [], {'dashboard': 1}, 0, timeout)
+    if not r.login():
+        raise SystemExit(f'Falha no login em {base} ({dict(r.erros["login"])}); confira o servidor e --email/--senha.')
+    _, _, pagina = r._requisicao('GET', '/pacientes?status=ativos&limite=200')
+    pacientes = [int(i) for i in _RE_PACIENTE_ATIVO.findall(pagina.decode())]
+    _, _, pagina = r._requisicao('GET', '/simulacoes')
+    simulacoes = sorted({int(i) for i in _RE_SIMULACAO.findall(pagina.decode())})
+    return pacientes, simulacoes
+
+
+def _percentil(ordenados, p):
+    if not ordenados:
+        return 0.0
+    # Posto mais próximo: o menor valor com pelo menos p% das amostras até ele
+    return ordenados[max(0, math.ceil(p / 100 * len(ordenados)) - 1)]
+
+
+def resumir(recepcionistas, segundos):
+    """Agrega as estatísticas de todos os usuários: {rota: medidas}."""
+    latencias, erros = defaultdict(list), defaultdict(Counter)
+    for r in recepcionistas:
+        for rota, valores in r.latencias.items():
+            latencias[rota] += valores
+        for rota, motivos in r.erros.items():
+            erros[rota].update(motivos)
+
+    resumo = {}
+    for rota in sorted(set(latencias) | set(erros)):
+        ok = sorted(latencias[rota])
+        falhas = sum(erros[rota].values())
+        total = len(ok) + falhas
+        resumo[rota] = {
+            'requisicoes': total,
+            'por_segundo': round(len(ok) / segundos, 2),
+            'erros': falhas,
+            'taxa_erro': round(falhas / total, 4) if total else 0.0,
+            'motivos_erro': dict(erros[rota]),
+            'p50_ms': round(_percentil(ok, 50), 1),
+            'p95_ms': round(_percentil(ok, 95), 1),
+            'p99_ms': round(_percentil(ok, 99), 1),
+            'max_ms': round(ok[-1], 1) if ok else 0.0,
+        }
+    return resumo
+
+
+def rodar_nivel(args, usuarios, pacientes, simulacoes, mix):
+    prazo = monotonic() + args.duracao
+    recepcionistas = [
+        Recepcionista(args.url, args.email, args.senha, pacientes, simulacoes, mix,
+                      args.semente + i, args.timeout)
+        for i in range(usuarios)
+    ]
+    threads = [threading.Thread(target=r.executar, args=(prazo, args.pausa), daemon=True)
+               for r in recepcionistas]
+    inicio = monotonic()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return resumir(recepcionistas, monotonic() - inicio)
+
+
+def imprimir(usuarios, resumo):
+    print(f'\n== {usuarios} recepcionistas ==')
+    print(f'{"rota":<18} {"req":>7} {"req/s":>8} {"erros":>7} {"p50":>8} {"p95":>8} {"p99":>8} {"max":>8}')
+    vazao = total = 0
+    for rota, m in resumo.items():
+        print(f'{rota:<18} {m["requisicoes"]:>7} {m["por_segundo"]:>8.1f} {m["taxa_erro"]:>7.1%} '
+              f'{m["p50_ms"]:>8.1f} {m["p95_ms"]:>8.1f} {m["p99_ms"]:>8.1f} {m["max_ms"]:>8.1f}')
+        if m['motivos_erro']:
+            print(f'{"":<18} erros: {m["motivos_erro"]}')
+        if rota != 'login':
+            total += m['requisicoes']
+            vazao += m['por_segundo']
+    print(f'{"total":<18} {total:>7} {vazao:>8.1f}   (latências em ms)')
+
+
+def _ler_mix(texto):
+    mix = dict(MIX_PADRAO)
+    for parte in filter(None, (texto or '').split(',')):
+        acao, _, peso = parte.partition('=')
+        if acao not in MIX_PADRAO:
+            raise SystemExit(f'Ação desconhecida em --mix: {acao} (use {", ".join(MIX_PADRAO)})')
+        mix[acao] = float(peso)
+    return mix
+
+
+def _porta_livre():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def iniciar_gunicorn(workers, threads):
+    """Sobe `gunicorn 'backend.app:create_app()'` numa porta livre; devolve (processo, url)."""
+    porta = _porta_livre()
+    raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    processo = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'backend/gunicorn_conf.py',
+         '-w', str(workers), '--threads', str(threads),
+         '-b', f'127.0.0.1:{porta}', 'backend.app:create_app()'],
+        cwd=raiz,
+    )
+    prazo = monotonic() + 30
+    while monotonic() < prazo:
+        if processo.poll() is not None:
+            raise SystemExit('O gunicorn terminou ao subir (está instalado?).')
+        try:
+            socket.create_connection(('127.0.0.1', porta), timeout=1).close()
+            return processo, f'http://127.0.0.1:{porta}'
+        except OSError:
+            sleep(0.2)
+    processo.terminate()
+    raise SystemExit('O gunicorn não respondeu em 30s.')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Teste de carga HTTP do Gestor de Notas.')
+    parser.add_argument('--url', default='http://127.0.0.1:8000', help='Servidor já em execução.')
+    parser.add_argument('--gunicorn', type=int, metavar='WORKERS',
+                        help='Sobe um gunicorn local com WORKERS processos (ignora --url).')
+    parser.add_argument('--threads', type=int, default=1, help='Threads por worker do gunicorn.')
+    parser.add_argument('--email', default=os.getenv('CARGA_EMAIL', 'admin@admin.com'))
+    parser.add_argument('--senha', default=os.getenv('CARGA_SENHA'),
+                        help='Senha do usuário (ou CARGA_SENHA).')
+    parser.add_argument('--usuarios', default='10',
+                        help='Recepcionistas simultâneas; vários níveis separados por vírgula.')
+    parser.add_argument('--duracao', type=float, default=30, help='Segundos por nível.')
+    parser.add_argument('--pausa', type=float, default=0.0,
+                        help='Pausa média entre ações de cada usuário, em segundos.')
+    parser.add_argument('--mix', help='Pesos, ex.: dashboard=40,simulacao=0 '
+                                      f'(padrão: {",".join(f"{k}={v}" for k, v in MIX_PADRAO.items())}).')
+    parser.add_argument('--timeout', type=float, default=30)
+    parser.add_argument('--semente', type=int, default=1)
+    parser.add_argument('--json', metavar='ARQUIVO', help='Grava os resultados de todos os níveis.')
+    args = parser.parse_args(argv)
+    if not args.senha:
+        parser.error('informe --senha ou CARGA_SENHA')
+
+    mix = _ler_mix(args.mix)
+    niveis = [int(n) for n in args.usuarios.split(',') if n.strip()]
+
+    servidor = None
+    if args.gunicorn:
+        servidor, args.url = iniciar_gunicorn(args.gunicorn, args.threads)
+    try:
+        pacientes, simulacoes = descobrir(args.url, args.email, args.senha, args.timeout)
+        for acao, necessarios in (('registrar_sessao', pacientes), ('editar_paciente', pacientes),
+                                  ('simulacao', simulacoes)):
+            if not necessarios and mix[acao]:
+                print(f'Sem dados para {acao}: ação removida do mix.', file=sys.stderr)
+                mix[acao] = 0
+        mix = {acao: peso for acao, peso in mix.items() if peso > 0}
+        print(f'{args.url}: {len(pacientes)} pacientes ativos, {len(simulacoes)} simulações; '
+              f'mix {mix}; {args.duracao:g}s por nível.')
+
+        resultados = {}
+        for usuarios in niveis:
+            resultados[usuarios] = rodar_nivel(args, usuarios, pacientes, simulacoes, mix)
+            imprimir(usuarios, resultados[usuarios])
+    finally:
+        if servidor is not None:
+            servidor.terminate()
+            servidor.wait()
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'url': args.url, 'mix': mix, 'duracao': args.duracao, 'pausa': args.pausa,
+                       'niveis': resultados}, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,184 @@
+# backend/comandos.py
+#
+# Comandos CLI (flask --app backend.app <comando>), registrados por create_app.
+
+from datetime import datetime
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+
+from backend.db import db
+from backend.dinheiro import formatar_dinheiro
+from backend.metricas import medir_job
+from backend.notas_mensais import gerar_notas_do_mes, renderizar_pdfs_do_mes
+from backend.recorrencias import materializar
+from backend.relatorios import fechar_meses, reabrir_meses
+from backend.resumo import reconstruir_resumo
+
+
+@click.command('importar-excel')
+@with_appcontext
+@click.argument('caminho_arquivo', type=click.Path(exists=True, dir_okay=False))
+@click.option('--lote', type=int, default=None,
+              help='Linhas processadas por transação (padrão: TAMANHO_LOTE_PADRAO do importador).')
+def importar_excel_cmd(caminho_arquivo, lote):
+    """Importa um extrato Excel em lotes e mostra as estatísticas."""
+    # pandas/openpyxl só são carregados por quem de fato importa planilhas
+    from backend.import_excel.import_excel import importar_excel, TAMANHO_LOTE_PADRAO
+    with medir_job('importacao'):
+        stats = importar_excel(caminho_arquivo, tamanho_lote=lote or TAMANHO_LOTE_PADRAO)
+    click.echo(
+        f"{stats['linhas']} linhas em {stats['segundos']}s "
+        f"({stats['linhas_por_segundo']} linhas/s, memória +{stats['memoria_adicional_mb']} MB): "
+        f"{stats['notas_criadas']} notas, {stats['pacientes_criados']} pacientes novos, "
+        f"{stats['ignoradas']} linhas ignoradas."
+    )
+
+
+@click.command('reconstruir-resumo')
+@with_appcontext
+def reconstruir_resumo_cmd():
+    """Recalcula do zero a tabela resumo_financeiro usada pelo dashboard."""
+    linhas = reconstruir_resumo()
+    click.echo(f'Resumo financeiro reconstruído ({linhas} linhas).')
+
+
+@click.command('fechar-relatorios')
+@with_appcontext
+@click.option('--refazer', is_flag=True, help='Descarta os meses já fechados e recalcula todos.')
+def fechar_relatorios_cmd(refazer):
+    """Congela os relatórios dos meses encerrados."""
+    if refazer:
+        reabrir_meses(db.session.connection())
+        db.session.commit()
+    meses = fechar_meses()
+    click.echo(f'{meses} meses fechados.')
+
+
+@click.command('materializar-recorrencias')
+@with_appcontext
+@click.option('--ate', type=click.DateTime(formats=['%Y-%m-%d']), default=None,
+              help='Gera as ocorrências até esta data (padrão: hoje).')
+def materializar_recorrencias_cmd(ate):
+    """Gera os lançamentos pendentes das transações recorrentes (idempotente)."""
+    criadas = materializar(ate.date() if ate else None)
+    click.echo(f'{criadas} lançamentos recorrentes gerados.')
+
+
+def _validar_mes(mes):
+    try:
+        datetime.strptime(mes, '%Y-%m')
+    except ValueError:
+        raise click.BadParameter('use o formato AAAA-MM', param_hint='MES')
+
+
+@click.command('gerar-notas')
+@with_appcontext
+@click.argument('mes')
+def gerar_notas_cmd(mes):
+    """Gera as notas do mês (AAAA-MM) para todos os pacientes ativos."""
+    _validar_mes(mes)
+    resultado = gerar_notas_do_mes(mes)
+    click.echo(f"{resultado['criadas']} notas geradas (R$ {formatar_dinheiro(resultado['valor_total'])}); "
+               f"{resultado['existentes']} pacientes já tinham nota no mês.")
+
+
+@click.command('gerar-pdfs-notas')
+@with_appcontext
+@click.argument('mes')
+@click.option('--lote', type=click.IntRange(min=1), default=1000, show_default=True,
+              help='Notas carregadas e renderizadas por vez.')
+def gerar_pdfs_notas_cmd(mes, lote):
+    """Renderiza os PDFs das notas do mês (AAAA-MM) que ainda não estão em cache."""
+    _validar_mes(mes)
+    resultado = renderizar_pdfs_do_mes(mes, lote)
+    click.echo(f"{resultado['renderizadas']} PDFs renderizados; "
+               f"{resultado['notas'] - resultado['renderizadas']} já estavam em cache.")
+
+
+@click.command('gerar-dados')
+@with_appcontext
+@click.option('--pacientes', type=click.IntRange(min=0), default=1000, show_default=True)
+@click.option('--transacoes', type=click.IntRange(min=0), default=100000, show_default=True)
+@click.option('--notas', type=click.IntRange(min=0), default=10000, show_default=True,
+              help='Notas mensais (no máximo uma por paciente ativo e mês).')
+@click.option('--simulacoes', type=click.IntRange(min=0), default=50, show_default=True)
+@click.option('--meses', type=click.IntRange(min=1), default=24, show_default=True,
+              help='Período coberto, terminando hoje.')
+@click.option('--semente', type=int, default=42, show_default=True)
+@click.option('--lote', type=click.IntRange(min=1), default=None,
+              help='Linhas por INSERT (padrão: TAMANHO_LOTE_PADRAO do gerador).')
+def gerar_dados_cmd(pacientes, transacoes, notas, simulacoes, meses, semente, lote):
+    """Acrescenta dados sintéticos ao banco, para medir desempenho."""
+    from backend.dados_sinteticos import gerar_dados, TAMANHO_LOTE_PADRAO
+    r = gerar_dados(pacientes, transacoes, notas, simulacoes, meses, semente,
+                    lote or TAMANHO_LOTE_PADRAO)
+    click.echo(f"{r['pacientes']} pacientes, {r['transacoes']} transações, {r['notas']} notas e "
+               f"{r['simulacoes']} simulações gerados em {r['segundos']}s.")
+
+
+@click.command('benchmark')
+@with_appcontext
+@click.option('--repeticoes', type=click.IntRange(min=1), default=5, show_default=True)
+@click.option('--filtro', default=None, help='Só os casos que contêm este texto no nome.')
+@click.option('--salvar', is_flag=True, help='Grava o resultado como nova linha de base.')
+@click.option('--comparar', is_flag=True,
+              help='Sai com erro se não houver linha de base ou se algum caso regredir.')
+@click.option('--baseline', type=click.Path(dir_okay=False), default=None,
+              help='Arquivo da linha de base (padrão: benchmarks/baseline-<banco>.json).')
+@click.option('--tolerancia', type=float, default=20.0, show_default=True,
+              help='Piora da mediana, em %, considerada regressão.')
+@click.option('--piso-ms', type=float, default=2.0, show_default=True,
+              help='Piora mínima da mediana, em ms, para contar como regressão (abaixo é ruído).')
+def benchmark_cmd(repeticoes, filtro, salvar, comparar, baseline, tolerancia, piso_ms):
+    """Mede as rotas e funções principais e compara com a linha de base, se houver."""
+    from backend import benchmark
+
+    resultado = benchmark.executar(current_app, repeticoes, filtro)
+    baseline = baseline or benchmark.caminho_baseline(resultado['banco'])
+    volumes = ', '.join(f'{tabela}={qtd}' for tabela, qtd in resultado['volumes'].items())
+    click.echo(f"Banco {resultado['banco']} ({volumes}), {repeticoes} repetições; mediana em ms.")
+
+    try:
+        base = benchmark.carregar(baseline)
+    except FileNotFoundError:
+        base = None
+    if base is None:
+        if comparar:
+            raise click.ClickException(f'linha de base não encontrada: {baseline} (rode com --salvar)')
+        for caso, medidas in resultado['resultados'].items():
+            sql = f"  [{medidas['consultas_sql']} SQL]" if 'consultas_sql' in medidas else ''
+            click.echo(f"{caso:<50} {medidas['mediana_ms']:>10.2f}{sql}")
+        if not salvar:
+            click.echo(f'Sem linha de base em {baseline}; grave uma com --salvar.')
+        regressoes = 0
+    else:
+        if base['volumes'] != resultado['volumes']:
+            click.echo(f"Atenção: volumes diferentes da linha de base ({base['volumes']}).", err=True)
+        click.echo(f"{'caso':<50} {'base':>10} {'atual':>10} {'variação':>8}")
+        linhas = benchmark.comparar(resultado, base, tolerancia / 100, piso_ms)
+        for caso, antes, agora, variacao, regrediu in linhas:
+            if antes is None:
+                click.echo(f'{caso:<50} {"-":>10} {agora:>10.2f}  (novo)')
+                continue
+            marca = '  REGRESSÃO' if regrediu else ''
+            click.echo(f'{caso:<50} {antes:>10.2f} {agora:>10.2f} {variacao:>+8.1%}{marca}')
+        regressoes = sum(1 for linha in linhas if linha[4])
+        click.echo(f'{regressoes} casos pioraram mais de {tolerancia:g}% em relação a {baseline}.')
+
+    if salvar:
+        benchmark.salvar(resultado, baseline)
+        click.echo(f'Linha de base gravada em {baseline}.')
+    if comparar and regressoes:
+        raise click.ClickException(f'{regressoes} casos pioraram mais de {tolerancia:g}%.')
+
+
+COMANDOS = (importar_excel_cmd, reconstruir_resumo_cmd, fechar_relatorios_cmd,
+            materializar_recorrencias_cmd, gerar_notas_cmd, gerar_pdfs_notas_cmd, gerar_dados_cmd,
+            benchmark_cmd)
+
+
+def registrar_comandos(app):
+    for comando in COMANDOS:
+        app.cli.add_command(comando)
@@ -0,0 +1,210 @@
+# backend/dados_sinteticos.py
+#
+# Gera uma massa de dados realista para medir desempenho (ver
+# backend/benchmark.py): pacientes, receitas de sessão e despesas
+# espalhadas pelos últimos meses, notas mensais e simulações.
+#
+#   flask --app backend.app gerar-dados --pacientes 10000 --transacoes 1000000
+#
+# As linhas entram por INSERTs do Core em lotes (sem os eventos do ORM) e,
+# no fim, o resumo financeiro é reconstruído uma única vez. Os dados são
+# acrescentados aos existentes; use um banco separado (DATABASE_URL).
+
+import calendar
+import random
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from time import perf_counter
+
+from sqlalchemy import func, insert, select
+
+from backend.models import (
+    db, Paciente, Nota, Transacao, Simulacao, SimulacaoItem, SimulacaoEvento, normalizar_cpf
+)
+from backend.resumo import reconstruir_resumo
+
+TAMANHO_LOTE_PADRAO = 5000
+
+NOMES = ('Ana', 'Bruno', 'Carla', 'Daniel', 'Eduarda', 'Felipe', 'Gabriela', 'Henrique',
+         'Isabela', 'João', 'Larissa', 'Lucas', 'Mariana', 'Mateus', 'Natália', 'Otávio',
+         'Paula', 'Rafael', 'Sofia', 'Thiago', 'Valéria', 'Vinícius')
+SOBRENOMES = ('Almeida', 'Barbosa', 'Cardoso', 'Costa', 'Ferreira', 'Gomes', 'Lima',
+              'Martins', 'Oliveira', 'Pereira', 'Ribeiro', 'Rocha', 'Santos', 'Silva', 'Souza')
+PROFISSOES = ('Advogada', 'Engenheiro', 'Estudante', 'Professora', 'Médico', 'Designer',
+              'Analista de sistemas', 'Enfermeira', 'Autônomo', None)
+LOGRADOUROS = ('Rua das Flores', 'Av. Brasil', 'Rua XV de Novembro', 'Av. Paulista',
+               'Rua São João', 'Travessa da Paz')
+
+# (nome, valor mínimo, valor máximo) em reais
+DESPESAS = (
+    ('Aluguel do consultório', 1800, 4500),
+    ('Supervisão clínica', 300, 900),
+    ('Software de agenda', 60, 250),
+    ('Contador', 250, 700),
+    ('Internet e telefone', 100, 300),
+    ('Material de escritório', 30, 400),
+    ('Marketing', 100, 1500),
+    ('Impostos', 200, 3000),
+)
+RECEITAS_AVULSAS = (
+    ('Avaliação psicológica', 400, 1500),
+    ('Palestra', 500, 3000),
+    ('Supervisão de estagiários', 200, 800),
+)
+
+# Proporção das transações: sessões de pacientes, outras receitas, despesas
+PESO_SESSOES, PESO_RECEITAS_AVULSAS = 0.80, 0.05
+
+
+def _reais(rng, minimo, maximo):
+    return Decimal(rng.randint(minimo * 100, maximo * 100)) / 100
+
+
+def _cpf(numero):
+    d = f'{numero:011d}'
+    return f'{d[:3]}.{d[3:6]}.{d[6:9]}-{d[9:]}'
+
+
+def _inserir_em_lotes(modelo, linhas, lote):
+    """Insere `linhas` (iterável de dicionários) em lotes; devolve quantas."""
+    tabela = modelo.__table__
+    conn = db.session.connection()
+    total, buffer = 0, []
+    for linha in linhas:
+        buffer.append(linha)
+        if len(buffer) >= lote:
+            conn.execute(insert(tabela), buffer)
+            total += len(buffer)
+            buffer = []
+    if buffer:
+        conn.execute(insert(tabela), buffer)
+        total += len(buffer)
+    db.session.commit()
+    return total
+
+
+def _ids_depois_de(modelo, colunas, id_anterior):
+    return db.session.execute(
+        select(*colunas).where(modelo.id > id_anterior).order_by(modelo.id)
+    ).all()
+
+
+def _ultimo_id(modelo):
+    return db.session.execute(select(func.max(modelo.id))).scalar() or 0
+
+
+def _pacientes(rng, quantidade, inicio_cpf):
+    for i in range(quantidade):
+        cpf = _cpf(inicio_cpf + i)
+        yield {
+            'nome': f'{rng.choice(NOMES)} {rng.choice(SOBRENOMES)} {rng.choice(SOBRENOMES)}',
+            'cpf': cpf,
+            'cpf_normalizado': normalizar_cpf(cpf),
+            'profissao': rng.choice(PROFISSOES),
+            'cep': f'{rng.randint(10000, 99999)}-{rng.randint(0, 999):03d}',
+            'endereco': f'{rng.choice(LOGRADOUROS)}, {rng.randint(1, 3000)}',
+            'idade': rng.randint(16, 80),
+            'valor_sessao': Decimal(rng.randrange(80, 310, 10)),
+            'active': rng.random() < 0.9,
+        }
+
+
+def _transacoes(rng, quantidade, pacientes, inicio, segundos):
+    for _ in range(quantidade):
+        data = inicio + timedelta(seconds=rng.random() * segundos)
+        sorteio = rng.random()
+        if sorteio < PESO_SESSOES and pacientes:
+            paciente_id, nome, valor = rng.choice(pacientes)
+            yield {'nome': nome, 'tipo': 'receita', 'observacao': 'Sessão',
+                   'valor': valor, 'data_criacao': data, 'paciente_id': paciente_id}
+            continue
+        tipo, opcoes = (('receita', RECEITAS_AVULSAS) if sorteio < PESO_SESSOES + PESO_RECEITAS_AVULSAS
+                        else ('despesa', DESPESAS))
+        nome, minimo, maximo = rng.choice(opcoes)
+        yield {'nome': nome, 'tipo': tipo,
+               'observacao': rng.choice((None, None, 'Pago via PIX', 'Boleto', 'Cartão')),
+               'valor': _reais(rng, minimo, maximo), 'data_criacao': data, 'paciente_id': None}
+
+
+def _notas(rng, quantidade, pacientes, meses):
+    # Uma nota por (paciente, mês), como as de backend/notas_mensais.py
+    quantidade = min(quantidade, len(pacientes) * len(meses))
+    vistos = set()
+    while len(vistos) < quantidade:
+        chave = (rng.randrange(len(pacientes)), rng.randrange(len(meses)))
+        if chave in vistos:
+            continue
+        vistos.add(chave)
+        (paciente_id, _, valor), (ano, mes) = pacientes[chave[0]], meses[chave[1]]
+        sessoes = rng.randint(1, 5)
+        yield {
+            'paciente_id': paciente_id,
+            'data': date(ano, mes, calendar.monthrange(ano, mes)[1]),
+            'valor': valor * sessoes,
+            'descricao': f'{sessoes} {"sessão" if sessoes == 1 else "sessões"} em {mes:02d}/{ano}',
+            'periodo': f'{ano:04d}-{mes:02d}',
+        }
+
+
+def gerar_dados(pacientes=1000, transacoes=100000, notas=10000, simulacoes=50,
+                meses=24, semente=42, lote=TAMANHO_LOTE_PADRAO):
+    """
+    Acrescenta ao banco os volumes pedidos de cada tabela, com datas nos
+    últimos `meses` meses. Mesma semente, mesmos dados. Devolve as
+    quantidades inseridas e o tempo gasto.
+    """
+    rng = random.Random(semente)
+    inicio_execucao = perf_counter()
+    agora = datetime.utcnow()
+    inicio = agora - timedelta(days=round(meses * 30.44))
+
+    id_anterior = _ultimo_id(Paciente)
+    # CPFs sequenciais a partir do maior id: execuções repetidas não colidem
+    _inserir_em_lotes(Paciente, _pacientes(rng, pacientes, 10 ** 10 + id_anterior), lote)
+    # Sessões e notas só para pacientes ativos, com o valor da sessão deles
+    ativos = [
+        (p.id, p.nome, p.valor_sessao)
+        for p in _ids_depois_de(Paciente, (Paciente.id, Paciente.nome, Paciente.valor_sessao,
+                                           Paciente.active), id_anterior)
+        if p.active
+    ]
+
+    qtd_transacoes = _inserir_em_lotes(
+        Transacao, _transacoes(rng, transacoes, ativos, inicio, (agora - inicio).total_seconds()), lote)
+
+    lista_meses, mes = [], date(inicio.year, inicio.month, 1)
+    while mes < date(agora.year, agora.month, 1):  # só meses encerrados
+        lista_meses.append((mes.year, mes.month))
+        mes = (mes + timedelta(days=32)).replace(day=1)
+    # Pacientes anteriores podem já ter notas nesses meses: só os novos recebem
+    qtd_notas = _inserir_em_lotes(Nota, _notas(rng, notas, ativos, lista_meses), lote) if ativos else 0
+
+    id_simulacao = _ultimo_id(Simulacao)
+    _inserir_em_lotes(Simulacao, (
+        {'nome': f'Cenário {id_simulacao + i + 1}', 'despesa_mensal_fixa': _reais(rng, 2000, 15000),
+         'versao': 1, 'created_at': agora, 'updated_at': agora}
+        for i in range(simulacoes)
+    ), lote)
+    ids_simulacao = [s.id for s in _ids_depois_de(Simulacao, (Simulacao.id,), id_simulacao)]
+    itens, eventos = [], []
+    for sim_id in ids_simulacao:
+        itens += [{'simulacao_id': sim_id, 'pacientes': rng.randint(5, 40),
+                   'valor_sessao': Decimal(rng.randrange(80, 310, 10))}
+                  for _ in range(rng.randint(1, 4))]
+        eventos += [{'simulacao_id': sim_id, 'mes_offset': rng.randrange(meses),
+                     'delta': rng.randint(-5, 10)}
+                    for _ in range(rng.randint(0, 6))]
+    _inserir_em_lotes(SimulacaoItem, itens, lote)
+    _inserir_em_lotes(SimulacaoEvento, eventos, lote)
+
+    # Uma reconstrução no fim em vez de deltas por lote; reabre os meses
+    # congelados dos relatórios que receberam dados
+    reconstruir_resumo()
+
+    return {
+        'pacientes': pacientes,
+        'transacoes': qtd_transacoes,
+        'notas': qtd_notas,
+        'simulacoes': len(ids_simulacao),
+        'segundos': round(perf_counter() - inicio_execucao, 1),
+    }
@@ -1,3 +1,36 @@
+from contextlib import contextmanager
+
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
 
 db = SQLAlchemy()
+
+# Bind opcional (DATABASE_URL_LEITURA) para consultas pesadas só de leitura
+BIND_LEITURA = 'leitura'
+
+
+@contextmanager
+def sessao_leitura():
+    """
+    Sessão para relatórios, dashboard e exportações: usa a réplica de
+    leitura, com pool próprio, quando configurada; senão, db.session.
+    """
+    engine = db.engines.get(BIND_LEITURA)
+    if engine is None:
+        yield db.session
+        return
+    with Session(engine) as sessao:
+        yield sessao
+
+
+def insert_do_dialeto(conn, tabela):
+    """
+    INSERT com suporte a ON CONFLICT (on_conflict_do_nothing /
+    on_conflict_do_update) para o banco da conexão: SQLite ou PostgreSQL.
+    """
+    dialetos = {'sqlite': sqlite.insert, 'postgresql': postgresql.insert}
+    nome = conn.dialect.name
+    if nome not in dialetos:
+        raise NotImplementedError(f'INSERT ... ON CONFLICT não suportado no banco {nome}')
+    return dialetos[nome](tabela)
@@ -0,0 +1,79 @@
+# backend/dinheiro.py
+#
+# Valores monetários são gravados como centavos inteiros (BIGINT) e
+# chegam ao Python como Decimal com duas casas. Assim os SUMs no banco
+# são feitos em aritmética inteira, exatos, e o código não mistura float
+# com dinheiro. Toda leitura de valor digitado passa por `ler_dinheiro`.
+
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+from sqlalchemy.types import BigInteger, TypeDecorator
+
+CENTAVO = Decimal('0.01')
+ZERO = Decimal('0.00')
+
+
+def para_decimal(valor):
+    """Converte int, float, str ou Decimal para Decimal com 2 casas."""
+    if valor is None:
+        return None
+    if isinstance(valor, float):
+        # str() evita carregar o erro binário do float (0.1 -> 0.1000000000000000055...)
+        valor = str(valor)
+    return Decimal(valor).quantize(CENTAVO, rounding=ROUND_HALF_UP)
+
+
+def para_centavos(valor):
+    return int(para_decimal(valor) * 100)
+
+
+def de_centavos(centavos):
+    return Decimal(int(centavos)).scaleb(-2)
+
+
+def ler_dinheiro(texto):
+    """
+    Lê um valor digitado ('170', '170,5', '1.234,56', 'R$ 99.90') ou vindo
+    do JSON (número). Devolve None para vazio e levanta ValueError se o
+    valor for inválido.
+    """
+    if texto is None:
+        return None
+    if not isinstance(texto, str):
+        try:
+            return para_decimal(texto)
+        except (InvalidOperation, ValueError, TypeError):
+            raise ValueError(f'Valor inválido: {texto!r}')
+    texto = texto.replace('R$', '').strip().replace(' ', '')
+    if not texto:
+        return None
+    if ',' in texto:
+        # Formato brasileiro: ponto é separador de milhar
+        texto = texto.replace('.', '').replace(',', '.')
+    try:
+        return para_decimal(texto)
+    except InvalidOperation:
+        raise ValueError(f'Valor inválido: {texto!r}')
+
+
+def formatar_dinheiro(valor, milhar='.'):
+    """Formata no padrão brasileiro: Decimal('1234.5') -> '1.234,50'."""
+    if valor is None:
+        return ''
+    return f'{para_decimal(valor):,.2f}'.replace(',', '\0').replace('.', ',').replace('\0', milhar)
+
+
+class Dinheiro(TypeDecorator):
+    """Coluna monetária: BIGINT de centavos no banco, Decimal no Python."""
+    impl = BigInteger
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return para_centavos(value) if value is not None else None
+
+    def process_result_value(self, value, dialect):
+        return de_centavos(value) if value is not None else None
+
+    def coerce_compared_value(self, op, value):
+        # Operações com literais (col + 10, col < Decimal(...)) também em centavos
+        return self
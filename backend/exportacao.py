@@ -0,0 +1,73 @@
+# backend/exportacao.py
+#
+# Geradores de exportação de transações. Recebem um iterável de linhas
+# (id, data_criacao, tipo, nome, observacao, valor) — normalmente um
+# resultado com cursor do lado do servidor — e produzem o arquivo em
+# pedaços, sem materializar todas as linhas na memória.
+
+import csv
+import io
+import tempfile
+
+from backend.dinheiro import formatar_dinheiro
+
+CABECALHO = ['ID', 'Data', 'Tipo', 'Nome', 'Observação', 'Valor']
+
+# Linhas acumuladas antes de enviar um pedaço do CSV ao cliente
+LINHAS_POR_BLOCO = 1000
+TAMANHO_BLOCO_ARQUIVO = 64 * 1024
+
+
+def gerar_csv(linhas):
+    """
+    Gera o CSV (separador ';' e vírgula decimal, como o Excel em pt-BR
+    espera) em blocos de texto. O primeiro bloco sai antes de a consulta
+    terminar de ser lida.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, delimiter=';')
+    buffer.write('\ufeff')  # BOM: o Excel reconhece o arquivo como UTF-8
+    writer.writerow(CABECALHO)
+    yield buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+
+    for n, (id_, data, tipo, nome, observacao, valor) in enumerate(linhas, start=1):
+        writer.writerow([
+            id_,
+            data.strftime('%d/%m/%Y %H:%M') if data else '',
+            tipo,
+            nome,
+            observacao or '',
+            formatar_dinheiro(valor, milhar=''),
+        ])
+        if n % LINHAS_POR_BLOCO == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def gerar_xlsx(linhas):
+    """
+    Gera o XLSX com o openpyxl em modo write-only, que grava as linhas
+    em disco à medida que chegam. O formato zip só fica completo no fim,
+    então o arquivo temporário é enviado em blocos depois de salvo.
+    """
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet('Transações')
+    ws.append(CABECALHO)
+    for id_, data, tipo, nome, observacao, valor in linhas:
+        ws.append([id_, data, tipo, nome, observacao or '', valor])
+
+    with tempfile.TemporaryFile() as arquivo:
+        wb.save(arquivo)
+        arquivo.seek(0)
+        while True:
+            bloco = arquivo.read(TAMANHO_BLOCO_ARQUIVO)
+            if not bloco:
+                break
+            yield bloco
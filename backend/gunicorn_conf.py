@@ -0,0 +1,17 @@
+# backend/gunicorn_conf.py
+#
+# Ganchos do gunicorn para as métricas com vários workers (METRICAS_DIR):
+#   gunicorn -c backend/gunicorn_conf.py -w 4 'backend.app:create_app()'
+
+from backend.metricas import metricas
+
+
+def child_exit(server, worker):
+    # No master, logo após o worker morrer (inclusive por SIGKILL): soma o
+    # arquivo dele em metricas-encerrados.json antes que o pid seja reutilizado
+    metricas.consolidar_encerrados()
+
+
+def worker_abort(worker):
+    # No worker, ao receber SIGABRT do master por timeout: grava o que acumulou
+    metricas.gravar()
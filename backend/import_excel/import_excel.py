@@ -1,46 +1,236 @@
-# backend/import_excel.py
+# backend/import_excel/import_excel.py
+
+import logging
+import os
+import time
 
 import pandas as pd
-from datetime import datetime
-from models import db, Paciente, Nota
+from openpyxl import load_workbook
+from sqlalchemy import func, insert, select
+
+from backend.db import insert_do_dialeto
+from backend.dinheiro import ZERO, de_centavos
+from backend.models import db, Paciente, Nota
+from backend.resumo import aplicar_deltas, PERIODO_TOTAL
+
+logger = logging.getLogger(__name__)
+
+# Quantidade de linhas da planilha processadas (e commitadas) por vez
+TAMANHO_LOTE_PADRAO = 5000
+
+# Colunas esperadas na planilha -> nomes internos
+COLUNAS = {
+    'CPF': 'cpf',
+    'Nome': 'nome',
+    'Data': 'data',
+    'Valor': 'valor',
+    'Tipo': 'tipo',
+    'Descrição': 'descricao',
+}
+
+
+def ler_planilha_em_lotes(caminho_arquivo: str, tamanho_lote: int = TAMANHO_LOTE_PADRAO):
+    """
+    Lê a primeira aba do Excel em modo somente-leitura (streaming) e
+    devolve DataFrames de no máximo `tamanho_lote` linhas, sem carregar
+    a planilha inteira na memória.
+    """
+    wb = load_workbook(caminho_arquivo, read_only=True, data_only=True)
+    try:
+        linhas = wb.active.iter_rows(values_only=True)
+        cabecalho = next(linhas, None)
+        if cabecalho is None:
+            return
+        cabecalho = [str(c).strip() if c is not None else '' for c in cabecalho]
+
+        lote = []
+        for linha in linhas:
+            lote.append(linha)
+            if len(lote) >= tamanho_lote:
+                yield pd.DataFrame.from_records(lote, columns=cabecalho)
+                lote = []
+        if lote:
+            yield pd.DataFrame.from_records(lote, columns=cabecalho)
+    finally:
+        wb.close()
+
+
+def contar_linhas(caminho_arquivo: str):
+    """
+    Estima o número de linhas de dados a partir da dimensão gravada na
+    planilha, sem percorrê-la. Devolve None se a dimensão não existir.
+    """
+    wb = load_workbook(caminho_arquivo, read_only=True)
+    try:
+        max_row = wb.active.max_row
+        return max(max_row - 1, 0) if max_row else None
+    finally:
+        wb.close()
+
+
+def normalizar_lote(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Normaliza as colunas do lote de forma vetorizada e descarta as
+    linhas sem CPF ou com data inválida.
+    """
+    df = df.rename(columns=COLUNAS)
+    for coluna in COLUNAS.values():
+        if coluna not in df.columns:
+            df[coluna] = None
+
+    out = pd.DataFrame(index=df.index)
+    out['cpf'] = df['cpf'].astype('string').str.strip().str.removesuffix('.0')
+    # Mesma regra de normalizar_cpf: a planilha pode trazer o CPF com ou
+    # sem pontuação, e é só pelos dígitos que ele é comparado
+    out['cpf_normalizado'] = out['cpf'].str.replace(r'\D', '', regex=True)
+    out['nome'] = df['nome'].astype('string').str.strip().fillna('')
+    out['data'] = pd.to_datetime(df['data'], errors='coerce').dt.date
+    # Valores em centavos inteiros: as somas do lote ficam exatas
+    out['centavos'] = (pd.to_numeric(
+        df['valor'].astype('string').str.replace(',', '.', regex=False),
+        errors='coerce'
+    ).fillna(0.0) * 100).round().astype('int64')
+    out['tipo'] = df['tipo'].astype('string').str.strip().str.lower().fillna('')
+    out['descricao'] = df['descricao'].astype('string').fillna('')
+
+    validas = out['cpf_normalizado'].notna() & (out['cpf_normalizado'] != '') & out['data'].notna()
+    return out[validas]
+
+
+def _ids_por_cpf(cpfs_normalizados) -> dict:
+    """{cpf_normalizado: id} dos pacientes existentes (o menor id, se houver mais de um)."""
+    return dict(db.session.execute(
+        select(Paciente.cpf_normalizado, func.min(Paciente.id))
+        .where(Paciente.cpf_normalizado.in_(cpfs_normalizados))
+        .group_by(Paciente.cpf_normalizado)
+    ).all())
 
-def importar_excel(caminho_arquivo: str):
+
+def _resolver_pacientes(df: pd.DataFrame) -> tuple:
+    """
+    Resolve todos os CPFs do lote (pelos dígitos) com uma única consulta e
+    insere, em lote, os pacientes que ainda não existem.
+    Devolve ({cpf_normalizado: id}, quantidade de pacientes criados).
+    """
+    ids_por_cpf = _ids_por_cpf(df['cpf_normalizado'].unique().tolist())
+
+    novos = df[~df['cpf_normalizado'].isin(ids_por_cpf.keys())].drop_duplicates('cpf_normalizado')
+    if novos.empty:
+        return ids_por_cpf, 0
+
+    # Outra importação (ou um cadastro manual) pode criar o mesmo CPF entre a
+    # consulta e o INSERT: o conflito é ignorado e o id vem da nova consulta
+    conn = db.session.connection()
+    tabela = Paciente.__table__
+    criados = conn.execute(
+        insert_do_dialeto(conn, tabela)
+        .on_conflict_do_nothing(index_elements=['cpf'])
+        .returning(tabela.c.id),
+        [
+            {'nome': nome or cpf, 'cpf': cpf, 'cpf_normalizado': cpf_normalizado, 'cep': ''}
+            for cpf, nome, cpf_normalizado in zip(novos['cpf'], novos['nome'], novos['cpf_normalizado'])
+        ]
+    ).all()
+    ids_por_cpf.update(_ids_por_cpf(novos['cpf_normalizado'].tolist()))
+    return ids_por_cpf, len(criados)
+
+
+def _deltas_resumo(receitas: pd.DataFrame, pacientes_criados: int) -> dict:
+    """
+    Os inserts em massa não passam pelos eventos do ORM, então os deltas
+    do resumo financeiro são calculados aqui, agrupando o lote por mês.
+    """
+    por_mes = receitas.groupby(pd.to_datetime(receitas['data']).dt.strftime('%Y-%m'))['centavos'].agg(['size', 'sum'])
+    deltas = {('notas', mes): (int(qtd), de_centavos(soma)) for mes, (qtd, soma) in por_mes.iterrows()}
+    deltas[('notas', PERIODO_TOTAL)] = (len(receitas), de_centavos(receitas['centavos'].sum()))
+    if pacientes_criados:
+        deltas[('pacientes_ativos', PERIODO_TOTAL)] = (pacientes_criados, ZERO)
+    return deltas
+
+
+def _memoria_residente_mb():
+    """
+    Memória residente atual do processo, em MB (None fora do Linux).
+    ru_maxrss não serve: é o pico de toda a vida do processo, que no worker
+    inclui importações e requisições anteriores.
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            paginas = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return paginas * os.sysconf('SC_PAGE_SIZE') / 2**20
+
+
+def importar_excel(caminho_arquivo: str, tamanho_lote: int = TAMANHO_LOTE_PADRAO,
+                   ao_progredir=None) -> dict:
     """
     Lê um arquivo Excel de extrato com colunas:
     - CPF
     - Nome
     - Data       (formato YYYY-MM-DD ou detectável pelo pandas)
-    - Valor      (float)
+    - Valor      (float, aceita vírgula decimal)
     - Tipo       ('Receita' ou 'Despesa')
     - Descrição  (texto)
-    
-    Insere/atualiza Paciente e Nota no banco SQLite.
-    """
-    df = pd.read_excel(caminho_arquivo, engine='openpyxl')
-    for _, row in df.iterrows():
-        cpf    = str(row.get('CPF')).strip()
-        nome   = str(row.get('Nome')).strip()
-        data   = pd.to_datetime(row.get('Data')).date()
-        valor  = float(row.get('Valor', 0))
-        tipo   = str(row.get('Tipo')).strip().lower()
-        descricao = str(row.get('Descrição', ''))
-
-        # Busca ou cria paciente
-        paciente = Paciente.query.filter_by(cpf=cpf).first()
-        if not paciente:
-            paciente = Paciente(nome=nome, cpf=cpf)
-            db.session.add(paciente)
-            db.session.commit()
-
-        # Cria a nota
-        nota = Nota(
-            paciente_id = paciente.id,
-            data        = data,
-            valor       = valor,
-            receita     = (tipo == 'receita'),
-            despesa     = (tipo == 'despesa'),
-            descricao   = descricao
-        )
-        db.session.add(nota)
-
-    db.session.commit()
+
+    Processa a planilha em lotes: cada lote resolve os CPFs com uma
+    consulta, cria os pacientes que faltam e insere as notas das linhas
+    de receita em uma única transação. Linhas de despesa não geram nota.
+
+    `ao_progredir(processadas)` é chamado após o commit de cada lote.
+    Devolve um dicionário com os totais, linhas/segundo e
+    `memoria_adicional_mb`: quanto a memória residente do processo subiu,
+    no máximo, acima da do início da importação (medida a cada lote).
+    """
+    inicio = time.perf_counter()
+    memoria_inicial = memoria_maxima = _memoria_residente_mb()
+
+    stats = {
+        'linhas': 0,
+        'pacientes_criados': 0,
+        'notas_criadas': 0,
+        'ignoradas': 0,
+    }
+    try:
+        for bruto in ler_planilha_em_lotes(caminho_arquivo, tamanho_lote):
+            df = normalizar_lote(bruto)
+            receitas = df[df['tipo'] != 'despesa']
+
+            criados = 0
+            try:
+                if not receitas.empty:
+                    ids_por_cpf, criados = _resolver_pacientes(receitas)
+                    db.session.execute(
+                        insert(Nota),
+                        [
+                            {'paciente_id': ids_por_cpf[cpf], 'data': data,
+                             'valor': de_centavos(centavos), 'descricao': descricao}
+                            for cpf, data, centavos, descricao in zip(
+                                receitas['cpf_normalizado'], receitas['data'],
+                                receitas['centavos'], receitas['descricao'])
+                        ]
+                    )
+                    aplicar_deltas(db.session.connection(), _deltas_resumo(receitas, criados))
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+
+            stats['linhas'] += len(bruto)
+            stats['pacientes_criados'] += criados
+            stats['notas_criadas'] += len(receitas)
+            stats['ignoradas'] += len(bruto) - len(receitas)
+            # Com o lote ainda em memória
+            if memoria_inicial is not None:
+                memoria_maxima = max(memoria_maxima, _memoria_residente_mb() or 0)
+            if ao_progredir:
+                ao_progredir(stats['linhas'])
+    finally:
+        segundos = time.perf_counter() - inicio
+        stats['segundos'] = round(segundos, 3)
+        stats['linhas_por_segundo'] = round(stats['linhas'] / segundos, 1) if segundos else 0.0
+        stats['memoria_adicional_mb'] = (round(memoria_maxima - memoria_inicial, 2)
+                                         if memoria_inicial is not None else None)
+        logger.info('Importação de %s: %s', caminho_arquivo, stats)
+
+    return stats
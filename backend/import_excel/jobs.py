@@ -0,0 +1,66 @@
+# backend/import_excel/jobs.py
+
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from sqlalchemy import update
+
+from backend.metricas import medir_job
+from backend.models import db, ImportacaoJob
+
+logger = logging.getLogger(__name__)
+
+# Pool local de workers: as importações rodam fora da thread da requisição
+_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv('IMPORT_WORKERS', '2')),
+    thread_name_prefix='importacao'
+)
+
+
+def enfileirar_importacao(app, caminho_arquivo: str) -> ImportacaoJob:
+    """Registra o job como 'pendente' e agenda a importação no pool."""
+    job = ImportacaoJob(arquivo=os.path.basename(caminho_arquivo), status='pendente')
+    db.session.add(job)
+    db.session.commit()
+    _executor.submit(_executar, app, job.id, caminho_arquivo)
+    return job
+
+
+def _atualizar(job_id, **valores):
+    db.session.execute(update(ImportacaoJob).where(ImportacaoJob.id == job_id).values(**valores))
+    db.session.commit()
+
+
+def _executar(app, job_id, caminho_arquivo):
+    # pandas/openpyxl só são carregados na primeira importação, não no boot dos workers
+    from backend.import_excel.import_excel import importar_excel, contar_linhas
+
+    with app.app_context():
+        try:
+            _atualizar(job_id, status='processando', total=contar_linhas(caminho_arquivo))
+            with medir_job('importacao'):
+                stats = importar_excel(
+                    caminho_arquivo,
+                    ao_progredir=lambda processadas: _atualizar(job_id, processadas=processadas)
+                )
+            _atualizar(
+                job_id,
+                status='concluido',
+                processadas=stats['linhas'],
+                total=stats['linhas'],
+                finalizado_em=datetime.utcnow(),
+                mensagem=(f"{stats['notas_criadas']} notas criadas, "
+                          f"{stats['pacientes_criados']} pacientes novos, "
+                          f"{stats['ignoradas']} linhas ignoradas.")
+            )
+        except Exception as e:
+            logger.exception('Falha na importação %s', job_id)
+            db.session.rollback()
+            _atualizar(job_id, status='erro', mensagem=str(e), finalizado_em=datetime.utcnow())
+        finally:
+            try:
+                os.remove(caminho_arquivo)
+            except OSError:
+                pass
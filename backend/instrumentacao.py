@@ -0,0 +1,131 @@
+# backend/instrumentacao.py
+#
+# Instrumentação das consultas SQL por requisição: quantidade de comandos,
+# tempo total no banco e os comandos mais lentos, enviados no cabeçalho
+# Server-Timing (visível na aba Network do navegador) e, para requisições
+# lentas ou com padrão N+1, em uma linha de log JSON.
+#
+# N+1: o mesmo comando (mesmo texto SQL, parâmetros diferentes) executado
+# SQL_N_MAIS_1_LIMITE vezes ou mais na mesma requisição.
+#
+# Configuração (app.config, lida do ambiente em backend/config.py):
+#   INSTRUMENTACAO_SQL      liga/desliga (padrão: ligado)
+#   REQUISICAO_LENTA_MS     a partir de quanto a requisição vai para o log
+#   SQL_N_MAIS_1_LIMITE     repetições do mesmo comando para sinalizar N+1
+#   SQL_LENTAS_TOP          quantos comandos mais lentos registrar
+
+import heapq
+import json
+import logging
+from collections import Counter
+from time import perf_counter
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# Tamanho máximo do SQL no log
+TAMANHO_SQL_LOG = 300
+
+
+class ColetorSQL:
+    """Acumula os comandos executados durante uma requisição."""
+
+    def __init__(self, top):
+        self.top = top
+        self.quantidade = 0
+        self.segundos = 0.0
+        self.por_comando = Counter()
+        self._lentas = []  # heap mínimo com os `top` comandos mais lentos
+
+    def registrar(self, comando, segundos):
+        self.quantidade += 1
+        self.segundos += segundos
+        self.por_comando[comando] += 1
+        item = (segundos, self.quantidade, comando)
+        if len(self._lentas) < self.top:
+            heapq.heappush(self._lentas, item)
+        elif segundos > self._lentas[0][0]:
+            heapq.heapreplace(self._lentas, item)
+
+    def lentas(self):
+        return [(segundos, comando) for segundos, _, comando in sorted(self._lentas, reverse=True)]
+
+    def repetidas(self, limite):
+        return [(comando, vezes) for comando, vezes in self.por_comando.most_common()
+                if vezes >= limite]
+
+
+def _coletor():
+    # Fora de requisição (CLI, jobs de importação) nada é coletado
+    return g.get('_coletor_sql') if has_request_context() else None
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _antes(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and _coletor() is not None:
+        context._inicio_sql = perf_counter()
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _depois(conn, cursor, statement, parameters, context, executemany):
+    inicio = getattr(context, '_inicio_sql', None)
+    if inicio is not None:
+        coletor = _coletor()
+        if coletor is not None:
+            coletor.registrar(statement, perf_counter() - inicio)
+
+
+def _sql_para_log(comando):
+    comando = ' '.join(comando.split())
+    return comando if len(comando) <= TAMANHO_SQL_LOG else comando[:TAMANHO_SQL_LOG] + '…'
+
+
+def _iniciar():
+    g._inicio_requisicao = perf_counter()
+    g._coletor_sql = ColetorSQL(current_app.config['SQL_LENTAS_TOP'])
+
+
+def _finalizar(response):
+    coletor = g.pop('_coletor_sql', None)
+    if coletor is None:
+        return response
+    config = current_app.config
+    total_ms = (perf_counter() - g._inicio_requisicao) * 1000
+    sql_ms = coletor.segundos * 1000
+
+    # Em respostas em streaming (exportação) só conta o que rodou até aqui
+    response.headers.add('Server-Timing', f'db;dur={sql_ms:.1f};desc="consultas: {coletor.quantidade}"')
+    response.headers.add('Server-Timing', f'app;dur={total_ms:.1f}')
+
+    repetidas = coletor.repetidas(config['SQL_N_MAIS_1_LIMITE'])
+    motivos = []
+    if total_ms >= config['REQUISICAO_LENTA_MS']:
+        motivos.append('lenta')
+    if repetidas:
+        motivos.append('n_mais_1')
+    if motivos:
+        logger.warning('Requisição instrumentada: %s', json.dumps({
+            'motivos': motivos,
+            'metodo': request.method,
+            'caminho': request.path,
+            'endpoint': request.endpoint,
+            'status': response.status_code,
+            'duracao_ms': round(total_ms, 1),
+            'sql_consultas': coletor.quantidade,
+            'sql_ms': round(sql_ms, 1),
+            'sql_lentas': [{'ms': round(s * 1000, 1), 'sql': _sql_para_log(c)}
+                           for s, c in coletor.lentas()],
+            'n_mais_1': [{'vezes': vezes, 'sql': _sql_para_log(c)} for c, vezes in repetidas],
+        }, ensure_ascii=False))
+    return response
+
+
+def instalar_instrumentacao(app):
+    """Registra os hooks de requisição (os eventos do engine valem para todos os engines)."""
+    if not app.config['INSTRUMENTACAO_SQL']:
+        return
+    app.before_request(_iniciar)
+    app.after_request(_finalizar)
@@ -0,0 +1,340 @@
+# backend/metricas.py
+#
+# Métricas operacionais no formato texto do Prometheus (GET /metrics):
+#   gestor_requisicoes_total{endpoint,metodo,status}      contador
+#   gestor_requisicao_segundos{endpoint}                  histograma
+#   gestor_db_checkout_segundos{pool}                     histograma (espera por conexão)
+#   gestor_db_checkout_timeouts_total{pool}               contador
+#   gestor_job_segundos{job,status}                       histograma (importação, relatórios...)
+#
+# Cada processo acumula em memória (um dict sob um lock: custo desprezível
+# por requisição). Com vários workers do gunicorn, defina METRICAS_DIR: cada
+# processo grava um arquivo próprio no máximo a cada METRICAS_INTERVALO
+# segundos e na saída, e /metrics soma todos os arquivos. O arquivo leva o pid
+# e o instante de início do processo (metricas-<pid>-<inicio>.json), então um
+# worker novo que herde o pid de um encerrado não sobrescreve o arquivo dele.
+# Os arquivos de workers encerrados são somados, sob um lock, em
+# metricas-encerrados.json e apagados: os contadores não voltam atrás e o
+# diretório não cresce a cada reciclagem de worker.
+#
+# Rode o gunicorn com `-c backend/gunicorn_conf.py`: o master consolida o
+# arquivo assim que um worker morre, e um worker abortado por timeout grava o
+# que acumulou. Um worker morto por SIGKILL ainda perde o que acumulou desde a
+# última gravação (até METRICAS_INTERVALO segundos).
+
+import atexit
+import glob
+import json
+import os
+import sys
+import tempfile
+import threading
+from contextlib import contextmanager
+from time import monotonic, perf_counter
+
+from flask import g, request
+from sqlalchemy import exc
+from sqlalchemy.pool import QueuePool
+
+BUCKETS_REQUISICAO = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+BUCKETS_CHECKOUT = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30)
+BUCKETS_JOB = (0.1, 0.5, 1, 5, 15, 60, 300, 900, 3600)
+
+# Soma dos processos encerrados, em METRICAS_DIR
+ARQUIVO_ENCERRADOS = 'metricas-encerrados.json'
+
+DESCRICOES = {
+    'gestor_requisicoes_total': ('counter', 'Requisições HTTP atendidas.'),
+    'gestor_requisicao_segundos': ('histogram', 'Duração das requisições HTTP.'),
+    'gestor_db_checkout_segundos': ('histogram', 'Tempo para obter uma conexão do pool.'),
+    'gestor_db_checkout_timeouts_total': ('counter', 'Checkouts que estouraram DB_POOL_TIMEOUT.'),
+    'gestor_job_segundos': ('histogram', 'Duração de importações, relatórios e demais jobs.'),
+}
+
+
+def _chave(nome, rotulos):
+    # Tupla em memória (barata); vira JSON só ao gravar/exportar
+    return (nome, tuple(sorted(rotulos.items())))
+
+
+def _chave_json(chave):
+    nome, rotulos = chave
+    return json.dumps([nome, rotulos], ensure_ascii=False)
+
+
+class RegistroMetricas:
+    def __init__(self, diretorio=None, intervalo=5.0):
+        self.diretorio = diretorio
+        self.intervalo = intervalo
+        self._lock = threading.Lock()
+        self._contadores = {}
+        self._histogramas = {}  # chave -> [buckets, contagens por bucket + (+Inf), soma]
+        self._gravado_em = monotonic()
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+            atexit.register(self.gravar)
+
+    def incrementar(self, nome, valor=1, **rotulos):
+        chave = _chave(nome, rotulos)
+        with self._lock:
+            self._contadores[chave] = self._contadores.get(chave, 0) + valor
+        self._talvez_gravar()
+
+    def observar(self, nome, valor, buckets, **rotulos):
+        chave = _chave(nome, rotulos)
+        with self._lock:
+            h = self._histogramas.get(chave)
+            if h is None:
+                h = self._histogramas[chave] = [list(buckets), [0] * (len(buckets) + 1), 0.0]
+            i = 0
+            while i < len(buckets) and valor > buckets[i]:
+                i += 1
+            h[1][i] += 1
+            h[2] += valor
+        self._talvez_gravar()
+
+    def _estado(self):
+        with self._lock:
+            return {
+                'contadores': {_chave_json(k): v for k, v in self._contadores.items()},
+                'histogramas': {_chave_json(k): [h[0], list(h[1]), h[2]]
+                                for k, h in self._histogramas.items()},
+            }
+
+    def _arquivo(self):
+        pid = os.getpid()
+        return os.path.join(self.diretorio, f'metricas-{pid}-{_inicio_processo(pid) or 0}.json')
+
+    def _talvez_gravar(self):
+        if self.diretorio and monotonic() - self._gravado_em >= self.intervalo:
+            self.gravar()
+
+    def gravar(self):
+        """Grava o estado deste processo em METRICAS_DIR (escrita atômica)."""
+        if not self.diretorio:
+            return
+        self._gravado_em = monotonic()
+        try:
+            fd, tmp = tempfile.mkstemp(dir=self.diretorio, suffix='.tmp')
+            with os.fdopen(fd, 'w') as f:
+                json.dump(self._estado(), f)
+            os.replace(tmp, self._arquivo())
+        except OSError:
+            pass
+
+    def _estados(self):
+        """Estado deste processo (em memória) e dos demais (arquivos)."""
+        estados = [self._estado()]
+        if self.diretorio:
+            self.consolidar_encerrados()
+            proprio = self._arquivo()
+            for arquivo in glob.glob(os.path.join(self.diretorio, 'metricas-*.json')):
+                if arquivo == proprio:
+                    continue
+                estado = _ler_estado(arquivo)
+                if estado is not None:
+                    estados.append(estado)
+        return estados
+
+    def consolidar_encerrados(self):
+        """Soma os arquivos de processos encerrados em ARQUIVO_ENCERRADOS."""
+        if not self.diretorio:
+            return
+        mortos = [arquivo for arquivo, pid, inicio in _arquivos_por_processo(self.diretorio)
+                  if not _processo_vivo(pid, inicio)]
+        if not mortos:
+            return
+        import fcntl  # só Unix, como o gunicorn
+
+        try:
+            with open(os.path.join(self.diretorio, 'metricas.lock'), 'w') as trava:
+                fcntl.flock(trava, fcntl.LOCK_EX)
+                # Outro worker pode já ter consolidado (e apagado) parte deles
+                estados = [e for e in map(_ler_estado, mortos) if e is not None]
+                if estados:
+                    destino = os.path.join(self.diretorio, ARQUIVO_ENCERRADOS)
+                    anterior = _ler_estado(destino)
+                    if anterior is not None:
+                        estados.append(anterior)
+                    fd, tmp = tempfile.mkstemp(dir=self.diretorio, suffix='.tmp')
+                    with os.fdopen(fd, 'w') as f:
+                        json.dump(_somar(estados), f)
+                    os.replace(tmp, destino)
+                for arquivo in mortos:
+                    try:
+                        os.remove(arquivo)
+                    except FileNotFoundError:
+                        pass
+        except OSError:
+            pass
+
+    def exportar(self):
+        """Texto no formato de exposição do Prometheus, somando todos os processos."""
+        total = _somar(self._estados())
+        contadores, histogramas = total['contadores'], total['histogramas']
+
+        por_nome = {}
+        for chave, valor in contadores.items():
+            nome, rotulos = json.loads(chave)
+            por_nome.setdefault(nome, []).append((rotulos, valor))
+        for chave, h in histogramas.items():
+            nome, rotulos = json.loads(chave)
+            por_nome.setdefault(nome, []).append((rotulos, h))
+
+        linhas = []
+        for nome in sorted(por_nome):
+            tipo, descricao = DESCRICOES.get(nome, ('untyped', ''))
+            linhas.append(f'# HELP {nome} {descricao}')
+            linhas.append(f'# TYPE {nome} {tipo}')
+            for rotulos, valor in sorted(por_nome[nome], key=lambda r: r[0]):
+                if tipo != 'histogram':
+                    linhas.append(f'{nome}{_rotulos(rotulos)} {_numero(valor)}')
+                    continue
+                buckets, contagens, soma = valor
+                acumulado = 0
+                for limite, contagem in zip(list(buckets) + ['+Inf'], contagens):
+                    acumulado += contagem
+                    le = limite if limite == '+Inf' else _numero(limite)
+                    linhas.append(f'{nome}_bucket{_rotulos(rotulos + [["le", le]])} {acumulado}')
+                linhas.append(f'{nome}_sum{_rotulos(rotulos)} {_numero(soma)}')
+                linhas.append(f'{nome}_count{_rotulos(rotulos)} {acumulado}')
+        return '\n'.join(linhas) + '\n'
+
+
+def _somar(estados):
+    """Soma estados de vários processos em um só, no mesmo formato."""
+    contadores, histogramas = {}, {}
+    for estado in estados:
+        for chave, valor in estado['contadores'].items():
+            contadores[chave] = contadores.get(chave, 0) + valor
+        for chave, (buckets, contagens, soma) in estado['histogramas'].items():
+            atual = histogramas.get(chave)
+            if atual is None or atual[0] != buckets:
+                histogramas[chave] = [buckets, list(contagens), soma]
+            else:
+                atual[1] = [a + b for a, b in zip(atual[1], contagens)]
+                atual[2] += soma
+    return {'contadores': contadores, 'histogramas': histogramas}
+
+
+def _ler_estado(arquivo):
+    try:
+        with open(arquivo) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _arquivos_por_processo(diretorio):
+    """
+    Trios (arquivo, pid, inicio) dos arquivos metricas-<pid>-<inicio>.json
+    (e dos antigos metricas-<pid>.json, com inicio 0).
+    """
+    for arquivo in glob.glob(os.path.join(diretorio, 'metricas-*.json')):
+        pid, _, inicio = os.path.basename(arquivo)[len('metricas-'):-len('.json')].partition('-')
+        if pid.isdigit() and (inicio or '0').isdigit():
+            yield arquivo, int(pid), int(inicio or 0)
+
+
+def _inicio_processo(pid):
+    """
+    Instante de início do processo, em ticks desde o boot (campo 22 de
+    /proc/<pid>/stat). None se o processo não existe ou fora do Linux.
+    """
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        with open(f'/proc/{pid}/stat') as f:
+            # O nome do executável (campo 2) pode ter espaços e parênteses
+            campos = f.read().rpartition(')')[2].split()
+        return int(campos[19])
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _processo_vivo(pid, inicio=0):
+    """O processo `pid` existe e, se `inicio` foi informado, é o mesmo que gravou o arquivo."""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass  # existe, mas é de outro usuário
+    if inicio:
+        atual = _inicio_processo(pid)
+        return atual is None or atual == inicio
+    return True
+
+
+def _numero(valor):
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+def _rotulos(rotulos):
+    if not rotulos:
+        return ''
+    partes = []
+    for nome, valor in rotulos:
+        valor = str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        partes.append(f'{nome}="{valor}"')
+    return '{' + ','.join(partes) + '}'
+
+
+metricas = RegistroMetricas(
+    diretorio=os.getenv('METRICAS_DIR') or None,
+    intervalo=float(os.getenv('METRICAS_INTERVALO', '5')),
+)
+
+
+@contextmanager
+def medir_job(job):
+    """Registra a duração de um job em gestor_job_segundos{job, status}."""
+    inicio = perf_counter()
+    status = 'erro'
+    try:
+        yield
+        status = 'ok'
+    finally:
+        metricas.observar('gestor_job_segundos', perf_counter() - inicio, BUCKETS_JOB,
+                          job=job, status=status)
+
+
+class QueuePoolMedido(QueuePool):
+    """QueuePool que mede quanto cada checkout espera por uma conexão."""
+    nome_metricas = 'principal'
+
+    def connect(self):
+        inicio = perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            metricas.incrementar('gestor_db_checkout_timeouts_total', pool=self.nome_metricas)
+            raise
+        finally:
+            metricas.observar('gestor_db_checkout_segundos', perf_counter() - inicio,
+                              BUCKETS_CHECKOUT, pool=self.nome_metricas)
+
+
+class QueuePoolLeituraMedido(QueuePoolMedido):
+    nome_metricas = 'leitura'
+
+
+def _inicio_requisicao():
+    g._inicio_metricas = perf_counter()
+
+
+def _fim_requisicao(response):
+    inicio = g.pop('_inicio_metricas', None)
+    if inicio is not None:
+        # Endpoint (não o caminho) como rótulo: cardinalidade limitada
+        endpoint = request.endpoint or 'desconhecido'
+        metricas.incrementar('gestor_requisicoes_total', endpoint=endpoint,
+                             metodo=request.method, status=response.status_code)
+        metricas.observar('gestor_requisicao_segundos', perf_counter() - inicio,
+                          BUCKETS_REQUISICAO, endpoint=endpoint)
+    return response
+
+
+def instalar_metricas(app):
+    app.before_request(_inicio_requisicao)
+    app.after_request(_fim_requisicao)
@@ -1,10 +1,17 @@
 from backend.db import db
+from backend.dinheiro import Dinheiro
 from sqlalchemy import Column, Integer, String
+from sqlalchemy.orm import validates
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime, timedelta
 import secrets # Para gerar tokens seguros
 
 
+def normalizar_cpf(cpf):
+    """Mantém só os dígitos do CPF ('123.456.789-00' -> '12345678900')."""
+    return ''.join(c for c in cpf if c.isdigit()) if cpf else None
+
+
 class Usuario(db.Model):
     __tablename__ = 'usuarios'
 
@@ -47,15 +54,31 @@ class Paciente(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     nome = db.Column(db.String(120), nullable=False)
     cpf = db.Column(db.String(14), unique=True, nullable=False)
+    cpf_normalizado = db.Column(db.String(14), nullable=True)  # só dígitos, para busca
     profissao = db.Column(db.String(120), nullable=True)
     cep = db.Column(db.String(10), nullable=False)
     endereco = db.Column(db.String(200), nullable=True)
     idade = db.Column(db.Integer, nullable=True)
-    valor_sessao = db.Column(db.Float, nullable=True)
+    valor_sessao = db.Column(Dinheiro, nullable=True)
     active = db.Column(db.Boolean, nullable=False, default=True)
 
     notas = db.relationship('Nota', backref='paciente', lazy=True)
 
+    # Busca/listagem em /pacientes: filtro por status ordenado por nome e
+    # CPF por prefixo. No PostgreSQL a busca por trecho do nome usa ainda um
+    # índice trigram criado pela migration (ver busca_pacientes.py).
+    __table_args__ = (
+        db.Index('ix_pacientes_active_nome_id', 'active', 'nome', 'id'),
+        db.Index('ix_pacientes_nome_id', 'nome', 'id'),
+        db.Index('ix_pacientes_cpf_normalizado', 'cpf_normalizado',
+                 postgresql_ops={'cpf_normalizado': 'varchar_pattern_ops'}),
+    )
+
+    @validates('cpf')
+    def _normaliza_cpf(self, key, cpf):
+        self.cpf_normalizado = normalizar_cpf(cpf)
+        return cpf
+
     def __repr__(self):
         return f"<Paciente {self.nome}>"
 
@@ -65,8 +88,18 @@ class Nota(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     paciente_id = db.Column(db.Integer, db.ForeignKey('pacientes.id'), nullable=False)
     data = db.Column(db.Date, default=datetime.utcnow)
-    valor = db.Column(db.Float, nullable=False)
+    valor = db.Column(Dinheiro, nullable=False)
     descricao = db.Column(db.Text, nullable=True)
+    # Mês de competência (AAAA-MM) das notas geradas por backend/notas_mensais.py
+    periodo = db.Column(db.String(7), nullable=True)
+
+    # Servem a listagem /notas (ordem por data, com ou sem filtro de paciente);
+    # a restrição única impede duas notas mensais do mesmo paciente no mês.
+    __table_args__ = (
+        db.Index('ix_notas_data_id', 'data', 'id'),
+        db.Index('ix_notas_paciente_data_id', 'paciente_id', 'data', 'id'),
+        db.UniqueConstraint('paciente_id', 'periodo', name='uq_notas_paciente_periodo'),
+    )
 
     def __repr__(self):
         return f"<Nota {self.id} - Paciente {self.paciente_id}>"
@@ -78,30 +111,77 @@ class Transacao(db.Model):
     nome = db.Column(db.String(120), nullable=False)
     tipo = db.Column(db.String(10), nullable=False)
     observacao = db.Column(db.Text, nullable=True)
-    valor = db.Column(db.Float, nullable=False)
+    valor = db.Column(Dinheiro, nullable=False)
     data_criacao = db.Column(db.DateTime, default=datetime.utcnow)
+    # Paciente que originou a receita (sessões e cadastro); nulo nas demais
+    paciente_id = db.Column(db.Integer, db.ForeignKey('pacientes.id'), nullable=True)
+    # Lançamentos gerados por uma regra recorrente: um por (regra, período)
+    recorrencia_id = db.Column(db.Integer, db.ForeignKey('transacoes_recorrentes.id'), nullable=True)
+    periodo = db.Column(db.String(8), nullable=True)  # AAAA-MM ou AAAA-Www
+
+    # Um índice por coluna ordenável em /transacoes, sempre prefixado por tipo
+    # (as listagens são separadas em receitas/despesas) e terminado em id
+    # para servir a paginação por cursor. O índice por paciente inclui valor
+    # para que total e histórico do paciente sejam lidos só do índice.
+    __table_args__ = (
+        db.Index('ix_transacoes_paciente_tipo_data', 'paciente_id', 'tipo', 'data_criacao', 'id', 'valor'),
+        db.UniqueConstraint('recorrencia_id', 'periodo', name='uq_transacoes_recorrencia_periodo'),
+        db.Index('ix_transacoes_tipo_data_criacao', 'tipo', 'data_criacao', 'id'),
+        db.Index('ix_transacoes_tipo_nome', 'tipo', 'nome', 'id'),
+        db.Index('ix_transacoes_tipo_valor', 'tipo', 'valor', 'id'),
+        db.Index('ix_transacoes_tipo_observacao', 'tipo', db.func.coalesce(observacao, ''), 'id'),
+    )
 
     def __repr__(self):
         return f"<Transacao {self.tipo} {self.nome}: {self.valor}>"
 
+class TransacaoRecorrente(db.Model):
+    __tablename__ = 'transacoes_recorrentes'
+
+    id = db.Column(db.Integer, primary_key=True)
+    nome = db.Column(db.String(120), nullable=False)
+    tipo = db.Column(db.String(10), nullable=False)
+    observacao = db.Column(db.Text, nullable=True)
+    valor = db.Column(Dinheiro, nullable=False)
+    frequencia = db.Column(db.String(10), nullable=False)  # mensal, semanal
+    # mensal: dia do mês (1-31, limitado ao último dia); semanal: 0=segunda .. 6=domingo
+    dia = db.Column(db.Integer, nullable=False)
+    inicio = db.Column(db.Date, nullable=False)
+    fim = db.Column(db.Date, nullable=True)
+    ativa = db.Column(db.Boolean, nullable=False, default=True)
+    criado_em = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<TransacaoRecorrente {self.frequencia} {self.nome}: {self.valor}>"
+
 class Simulacao(db.Model):
     __tablename__ = 'simulacoes'
 
     id = db.Column(db.Integer, primary_key=True)
     nome = db.Column(db.String(120), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    despesa_mensal_fixa = db.Column(db.Float, nullable=True, default=0.0)
+    despesa_mensal_fixa = db.Column(Dinheiro, nullable=True, default=0)
+    # Incrementada a cada edição; compõe a chave do cache de projeções
+    versao = db.Column(db.Integer, nullable=False, default=1)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     itens = db.relationship('SimulacaoItem', backref='simulacao', cascade='all,delete-orphan')
     eventos = db.relationship('SimulacaoEvento', backref='simulacao', cascade='all,delete-orphan')
 
+    def marcar_alterada(self):
+        # Incremento no próprio UPDATE (versao = versao + 1): dois
+        # salvamentos simultâneos nunca gravam a mesma versão. O valor novo
+        # é lido do banco no próximo acesso ao atributo.
+        self.versao = Simulacao.versao + 1
+        self.updated_at = datetime.utcnow()
+
 class SimulacaoItem(db.Model):
     __tablename__ = 'simulacao_itens'
 
     id = db.Column(db.Integer, primary_key=True)
     simulacao_id = db.Column(db.Integer, db.ForeignKey('simulacoes.id'), nullable=False)
     pacientes = db.Column(db.Integer, nullable=False)
-    valor_sessao = db.Column(db.Float, nullable=False)
+    valor_sessao = db.Column(Dinheiro, nullable=False)
 
 class SimulacaoEvento(db.Model):
     __tablename__ = 'simulacao_eventos'
@@ -110,3 +190,58 @@ class SimulacaoEvento(db.Model):
     simulacao_id = db.Column(db.Integer, db.ForeignKey('simulacoes.id'), nullable=False)
     mes_offset = db.Column(db.Integer, nullable=False)
     delta = db.Column(db.Integer, nullable=False)
+
+class ImportacaoJob(db.Model):
+    __tablename__ = 'importacao_jobs'
+
+    id = db.Column(db.Integer, primary_key=True)
+    arquivo = db.Column(db.String(255), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='pendente')  # pendente, processando, concluido, erro
+    total = db.Column(db.Integer, nullable=True)
+    processadas = db.Column(db.Integer, nullable=False, default=0)
+    mensagem = db.Column(db.Text, nullable=True)
+    criado_em = db.Column(db.DateTime, default=datetime.utcnow)
+    finalizado_em = db.Column(db.DateTime, nullable=True)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'status': self.status,
+            'total': self.total,
+            'processadas': self.processadas,
+            'mensagem': self.mensagem,
+        }
+
+# Agregados mantidos incrementalmente por backend/resumo.py.
+# Uma linha por (metrica, periodo); periodo é 'AAAA-MM' ou 'total'.
+class ResumoFinanceiro(db.Model):
+    __tablename__ = 'resumo_financeiro'
+
+    metrica = db.Column(db.String(30), primary_key=True)  # receita, despesa, notas, pacientes_ativos
+    periodo = db.Column(db.String(7), primary_key=True)
+    quantidade = db.Column(db.BigInteger, nullable=False, default=0)
+    soma = db.Column(Dinheiro, nullable=False, default=0)
+
+# Relatórios mensais congelados por backend/relatorios.py. Um mês só entra
+# em relatorio_meses depois de encerrado; o mês corrente é sempre calculado
+# na hora. relatorio_mensal_itens guarda as quebras por paciente e categoria.
+class RelatorioMes(db.Model):
+    __tablename__ = 'relatorio_meses'
+
+    mes = db.Column(db.String(7), primary_key=True)  # AAAA-MM
+    receita = db.Column(Dinheiro, nullable=False, default=0)
+    despesa = db.Column(Dinheiro, nullable=False, default=0)
+    notas_quantidade = db.Column(db.Integer, nullable=False, default=0)
+    notas_soma = db.Column(Dinheiro, nullable=False, default=0)
+    fechado_em = db.Column(db.DateTime, default=datetime.utcnow)
+
+class RelatorioMensalItem(db.Model):
+    __tablename__ = 'relatorio_mensal_itens'
+
+    mes = db.Column(db.String(7), primary_key=True)
+    dimensao = db.Column(db.String(10), primary_key=True)  # paciente, categoria
+    chave = db.Column(db.String(120), primary_key=True)    # id do paciente ou nome da transação
+    rotulo = db.Column(db.String(120), nullable=False)
+    quantidade = db.Column(db.Integer, nullable=False, default=0)
+    receita = db.Column(Dinheiro, nullable=False, default=0)
+    despesa = db.Column(Dinheiro, nullable=False, default=0)
@@ -0,0 +1,118 @@
+# backend/notas_mensais.py
+#
+# Geração das notas do mês: uma nota por paciente ativo, somando as
+# receitas de sessão vinculadas a ele (Transacao.paciente_id) no mês.
+# Um GROUP BY calcula todos os pacientes de uma vez e um único INSERT cria
+# as notas; a restrição única (paciente_id, periodo), com ON CONFLICT DO
+# NOTHING, garante que gerar o mesmo mês de novo não duplica notas.
+#
+# Os PDFs do mês são renderizados logo depois, fora da requisição (ver
+# backend/pdf_notas.py), para o download em .zip só compactar arquivos
+# prontos.
+
+import calendar
+from datetime import date, datetime
+
+from sqlalchemy import func, select
+
+from backend.db import insert_do_dialeto
+from backend.dinheiro import ZERO
+from backend.metricas import medir_job
+from backend.models import db, Paciente, Nota, Transacao
+from backend.pdf_notas import dados_da_nota, obter_pdfs, separar_em_cache
+from backend.relatorios import mes_seguinte
+from backend.resumo import aplicar_deltas, deltas_de_insercao
+
+
+def _inicio(mes):
+    return datetime(int(mes[:4]), int(mes[5:7]), 1)
+
+
+@medir_job('notas_mensais')
+def gerar_notas_do_mes(mes):
+    """
+    Gera as notas de `mes` ('AAAA-MM') para os pacientes ativos com
+    receitas no mês. Devolve {'criadas', 'existentes', 'valor_total'}.
+    """
+    inicio, fim = _inicio(mes), _inicio(mes_seguinte(mes))
+    ano, m = int(mes[:4]), int(mes[5:7])
+    data_nota = date(ano, m, calendar.monthrange(ano, m)[1])
+
+    sessoes = db.session.execute(
+        select(Transacao.paciente_id, func.count(), func.sum(Transacao.valor))
+        .join(Paciente, Paciente.id == Transacao.paciente_id)
+        .where(Transacao.tipo == 'receita',
+               Transacao.data_criacao >= inicio, Transacao.data_criacao < fim,
+               Paciente.active.is_(True))
+        .group_by(Transacao.paciente_id)
+    ).all()
+
+    existentes = set(db.session.execute(
+        select(Nota.paciente_id).where(Nota.periodo == mes)
+    ).scalars())
+
+    linhas = [
+        {
+            'paciente_id': paciente_id,
+            'data': data_nota,
+            'valor': soma,
+            'descricao': f'{qtd} {"sessão" if qtd == 1 else "sessões"} em {m:02d}/{ano}',
+            'periodo': mes,
+        }
+        for paciente_id, qtd, soma in sessoes
+        if paciente_id not in existentes
+    ]
+    resultado = {'criadas': 0, 'existentes': len(sessoes) - len(linhas), 'valor_total': ZERO}
+    if not linhas:
+        return resultado
+
+    # ON CONFLICT DO NOTHING: se outra geração do mesmo mês inserir antes,
+    # as notas dela ficam e só as que faltavam entram; o RETURNING traz as
+    # efetivamente inseridas, que são as que contam no resumo
+    conn = db.session.connection()
+    stmt = insert_do_dialeto(conn, Nota.__table__)
+    inseridas = [dict(linha._mapping) for linha in conn.execute(
+        stmt.on_conflict_do_nothing(index_elements=['paciente_id', 'periodo'])
+        .returning(Nota.__table__.c.paciente_id, Nota.__table__.c.data, Nota.__table__.c.valor),
+        linhas,
+    )]
+    aplicar_deltas(conn, deltas_de_insercao(Nota, inseridas))
+    db.session.commit()
+
+    resultado['criadas'] = len(inseridas)
+    resultado['existentes'] = len(sessoes) - len(inseridas)
+    resultado['valor_total'] = sum((linha['valor'] for linha in inseridas), ZERO)
+    return resultado
+
+
+def dados_das_notas_do_mes(mes, depois_do_id=0, limite=None):
+    """Dados de PDF das notas com data em `mes`, em ordem de id (após `depois_do_id`)."""
+    inicio, fim = _inicio(mes).date(), _inicio(mes_seguinte(mes)).date()
+    consulta = (
+        select(Nota, Paciente.nome, Paciente.cpf)
+        .join(Paciente, Nota.paciente_id == Paciente.id)
+        .where(Nota.data >= inicio, Nota.data < fim, Nota.id > depois_do_id)
+        .order_by(Nota.id)
+    )
+    if limite:
+        consulta = consulta.limit(limite)
+    return [dados_da_nota(nota, nome, cpf) for nota, nome, cpf in db.session.execute(consulta)]
+
+
+@medir_job('pdf_notas')
+def renderizar_pdfs_do_mes(mes, lote=1000):
+    """
+    Renderiza os PDFs das notas de `mes` que ainda não estão em cache, em
+    lotes de `lote` notas. Devolve {'notas', 'renderizadas'}.
+    """
+    resultado = {'notas': 0, 'renderizadas': 0}
+    ultimo_id = 0
+    while True:
+        lista_dados = dados_das_notas_do_mes(mes, ultimo_id, lote)
+        if not lista_dados:
+            return resultado
+        _, faltando = separar_em_cache(lista_dados)
+        obter_pdfs(faltando)
+        resultado['notas'] += len(lista_dados)
+        resultado['renderizadas'] += len(faltando)
+        ultimo_id = lista_dados[-1]['id']
@@ -0,0 +1,87 @@
+# backend/paginacao.py
+#
+# Paginação por cursor (keyset): em vez de OFFSET, cada página continua a
+# partir da chave de ordenação da última linha exibida, o que permite ao
+# banco descer direto pelo índice independentemente da página.
+
+import base64
+import json
+import math
+from datetime import date, datetime
+from decimal import Decimal
+
+from sqlalchemy import literal, tuple_
+
+LIMITE_PADRAO = 50
+LIMITE_MAXIMO = 200
+
+
+def limite_da_requisicao(args, padrao=LIMITE_PADRAO):
+    """Lê `limite` da query string, restrito a 1..LIMITE_MAXIMO."""
+    limite = args.get('limite', padrao, type=int)
+    return max(1, min(limite or padrao, LIMITE_MAXIMO))
+
+
+def codificar_cursor(*valores):
+    def _serializar(v):
+        if isinstance(v, (datetime, date)):
+            return v.isoformat()
+        if isinstance(v, Decimal):
+            return str(v)
+        return v
+    bruto = json.dumps([_serializar(v) for v in valores], separators=(',', ':'))
+    return base64.urlsafe_b64encode(bruto.encode()).decode().rstrip('=')
+
+
+def decodificar_cursor(cursor, tipos):
+    """
+    Converte o cursor de volta para valores Python; `tipos` indica, para
+    cada posição, o tipo esperado (datetime, date, Decimal, float, int ou str).
+    Devolve None se o cursor estiver ausente ou malformado.
+    """
+    if not cursor:
+        return None
+    try:
+        bruto = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        valores = json.loads(bruto)
+        if len(valores) != len(tipos):
+            return None
+        convertidos = []
+        for v, tipo in zip(valores, tipos):
+            if v is None:
+                convertidos.append(None)
+            elif tipo is datetime:
+                convertidos.append(datetime.fromisoformat(v))
+            elif tipo is date:
+                convertidos.append(date.fromisoformat(v))
+            else:
+                v = tipo(v)
+                # NaN/Infinity não são chaves de ordenação válidas
+                if isinstance(v, (Decimal, float)) and not math.isfinite(v):
+                    return None
+                convertidos.append(v)
+        return convertidos
+    except (ValueError, TypeError, ArithmeticError):
+        # ArithmeticError: decimal.InvalidOperation (ex.: Decimal('abc'))
+        return None
+
+
+def paginar(query, chaves, cursor, limite, descendente=True):
+    """
+    Aplica ordenação, predicado de keyset e limite à `query`.
+
+    `chaves` são as expressões de ordenação (a última deve ser única, ex.: id)
+    e `cursor` os valores delas na última linha da página anterior.
+    Busca uma linha a mais para saber se existe próxima página; devolve
+    (linhas, tem_mais).
+    """
+    if cursor is not None:
+        # Cada valor é ligado com o tipo da sua chave (ex.: Dinheiro -> centavos)
+        valores = tuple_(*[literal(v, c.type) for c, v in zip(chaves, cursor)])
+        if descendente:
+            query = query.filter(tuple_(*chaves) < valores)
+        else:
+            query = query.filter(tuple_(*chaves) > valores)
+    ordenacao = [c.desc() if descendente else c.asc() for c in chaves]
+    linhas = query.order_by(*ordenacao).limit(limite + 1).all()
+    return linhas[:limite], len(linhas) > limite
@@ -0,0 +1,208 @@
+# backend/pdf_notas.py
+#
+# PDF das notas, gerado em Python puro (texto em Helvetica, sem
+# dependências) para poder rodar em processos separados sem carregar o
+# Flask nem o banco: cada nota chega aqui como um dicionário simples.
+#
+# Os arquivos ficam em cache em NOTAS_PDF_DIR com o nome
+# nota-<id>-<hash>.pdf, onde o hash cobre todo o conteúdo impresso. Nota
+# alterada gera um hash novo (e o arquivo antigo é apagado); nota sem
+# alteração é servida direto do disco.
+#
+# Lotes grandes (as notas do mês) são renderizados antes de alguém pedir:
+# pelo comando `flask --app backend.app gerar-pdfs-notas AAAA-MM` (cron) ou
+# em segundo plano por renderizar_em_segundo_plano, nunca na requisição.
+
+import glob
+import hashlib
+import json
+import multiprocessing
+import os
+import tempfile
+import logging
+import textwrap
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from backend.dinheiro import formatar_dinheiro
+
+# Mudar o layout invalida todos os PDFs em cache
+VERSAO_LAYOUT = 1
+
+DIRETORIO_PADRAO = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pdf_cache')
+# Abaixo disso o custo de subir os processos não compensa
+MINIMO_PARA_PARALELO = 8
+
+logger = logging.getLogger(__name__)
+
+_pool = None
+# Fila de renderização em segundo plano (uma thread; o paralelismo vem do
+# pool de processos) e ids de notas já enfileiradas
+_fila = ThreadPoolExecutor(max_workers=1, thread_name_prefix='pdf_notas')
+_pendentes = set()
+_lock_pendentes = threading.Lock()
+
+
+def dados_da_nota(nota, paciente_nome, paciente_cpf):
+    """Extrai de uma Nota o que vai impresso no PDF (tipos serializáveis)."""
+    return {
+        'id': nota.id,
+        'data': nota.data.strftime('%d/%m/%Y') if nota.data else '',
+        'valor': formatar_dinheiro(nota.valor),
+        'descricao': nota.descricao or '',
+        'periodo': nota.periodo or '',
+        'paciente_nome': paciente_nome,
+        'paciente_cpf': paciente_cpf,
+    }
+
+
+def hash_conteudo(dados):
+    bruto = json.dumps([VERSAO_LAYOUT, dados], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(bruto.encode()).hexdigest()[:16]
+
+
+def _texto_pdf(texto):
+    # Helvetica com WinAnsiEncoding cobre os acentos do português (cp1252)
+    bruto = texto.encode('cp1252', errors='replace')
+    return bruto.replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)')
+
+
+def renderizar_pdf(dados):
+    """Monta o PDF (uma página A4) de uma nota e devolve os bytes."""
+    linhas = []  # (fonte, tamanho, x, y, texto)
+    y = 780
+    linhas.append(('F2', 18, 50, y, f"Nota de Prestação de Serviços nº {dados['id']}"))
+    y -= 40
+    campos = [
+        ('Paciente', dados['paciente_nome']),
+        ('CPF', dados['paciente_cpf']),
+        ('Data de emissão', dados['data']),
+    ]
+    if dados['periodo']:
+        campos.append(('Competência', f"{dados['periodo'][5:]}/{dados['periodo'][:4]}"))
+    for rotulo, valor in campos:
+        linhas.append(('F2', 11, 50, y, f'{rotulo}:'))
+        linhas.append(('F1', 11, 160, y, valor or '-'))
+        y -= 20
+
+    y -= 10
+    linhas.append(('F2', 11, 50, y, 'Descrição:'))
+    y -= 18
+    for trecho in textwrap.wrap(dados['descricao'] or '-', 90) or ['-']:
+        linhas.append(('F1', 11, 50, y, trecho))
+        y -= 16
+
+    y -= 20
+    linhas.append(('F2', 14, 50, y, f"Valor total: R$ {dados['valor']}"))
+
+    conteudo = [b'0.5 w 50 765 m 545 765 l S']
+    for fonte, tamanho, x, yy, texto in linhas:
+        conteudo.append(b'BT /%s %d Tf %d %d Td (%s) Tj ET' % (
+            fonte.encode(), tamanho, x, yy, _texto_pdf(texto)))
+    stream = b'\n'.join(conteudo)
+
+    objetos = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        b'<< /Type /Pages /Kids [3 0 R] /Count 1 >>',
+        b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] '
+        b'/Resources << /Font << /F1 4 0 R /F2 5 0 R >> >> /Contents 6 0 R >>',
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>',
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>',
+        b'<< /Length %d >>\nstream\n%s\nendstream' % (len(stream), stream),
+    ]
+    saida = bytearray(b'%PDF-1.4\n')
+    posicoes = []
+    for n, corpo in enumerate(objetos, start=1):
+        posicoes.append(len(saida))
+        saida += b'%d 0 obj\n%s\nendobj\n' % (n, corpo)
+    inicio_xref = len(saida)
+    saida += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objetos) + 1)
+    for pos in posicoes:
+        saida += b'%010d 00000 n \n' % pos
+    saida += b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (
+        len(objetos) + 1, inicio_xref)
+    return bytes(saida)
+
+
+def caminho_em_cache(dados, diretorio):
+    return os.path.join(diretorio, f"nota-{dados['id']}-{hash_conteudo(dados)}.pdf")
+
+
+def _gravar(dados, diretorio):
+    """Renderiza e grava o PDF (escrita atômica); roda nos processos do pool."""
+    destino = caminho_em_cache(dados, diretorio)
+    fd, tmp = tempfile.mkstemp(dir=diretorio, suffix='.tmp')
+    with os.fdopen(fd, 'wb') as f:
+        f.write(renderizar_pdf(dados))
+    os.replace(tmp, destino)
+    # Versões anteriores da mesma nota não servem mais
+    for antigo in glob.glob(os.path.join(diretorio, f"nota-{dados['id']}-*.pdf")):
+        if antigo != destino:
+            try:
+                os.remove(antigo)
+            except OSError:
+                pass
+    return destino
+
+
+def _executor():
+    global _pool
+    if _pool is None:
+        # spawn: os processos só importam este módulo, sem herdar conexões
+        # do banco nem threads do servidor
+        _pool = ProcessPoolExecutor(
+            max_workers=int(os.getenv('NOTAS_PDF_WORKERS', '0')) or None,
+            mp_context=multiprocessing.get_context('spawn'),
+        )
+    return _pool
+
+
+def _diretorio(diretorio=None):
+    diretorio = diretorio or os.getenv('NOTAS_PDF_DIR') or DIRETORIO_PADRAO
+    os.makedirs(diretorio, exist_ok=True)
+    return diretorio
+
+
+def separar_em_cache(lista_dados, diretorio=None):
+    """Devolve (caminhos de todas as notas, na ordem; dados das que não estão em cache)."""
+    diretorio = _diretorio(diretorio)
+    caminhos = [caminho_em_cache(dados, diretorio) for dados in lista_dados]
+    faltando = [dados for dados, caminho in zip(lista_dados, caminhos) if not os.path.exists(caminho)]
+    return caminhos, faltando
+
+
+def obter_pdfs(lista_dados, diretorio=None, paralelo=True):
+    """
+    Devolve os caminhos dos PDFs das notas em `lista_dados`, na mesma
+    ordem, renderizando só os que não estão em cache; com `paralelo`, lotes
+    grandes são renderizados no pool de processos.
+    """
+    diretorio = _diretorio(diretorio)
+    caminhos, faltando = separar_em_cache(lista_dados, diretorio)
+    if paralelo and len(faltando) >= MINIMO_PARA_PARALELO:
+        list(_executor().map(_gravar, faltando, [diretorio] * len(faltando),
+                             chunksize=max(1, len(faltando) // 32)))
+    else:
+        for dados in faltando:
+            _gravar(dados, diretorio)
+    return caminhos
+
+
+def _renderizar_pendentes(lista_dados, diretorio):
+    try:
+        obter_pdfs(lista_dados, diretorio)
+    except Exception:
+        logger.exception('Falha ao renderizar %d PDFs de notas', len(lista_dados))
+    finally:
+        with _lock_pendentes:
+            _pendentes.difference_update(dados['id'] for dados in lista_dados)
+
+
+def renderizar_em_segundo_plano(lista_dados, diretorio=None):
+    """Agenda a renderização das notas ainda não enfileiradas; devolve quantas entraram na fila."""
+    with _lock_pendentes:
+        novas = [dados for dados in lista_dados if dados['id'] not in _pendentes]
+        _pendentes.update(dados['id'] for dados in novas)
+    if novas:
+        _fila.submit(_renderizar_pendentes, novas, _diretorio(diretorio))
+    return len(novas)
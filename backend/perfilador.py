@@ -0,0 +1,184 @@
+# backend/perfilador.py
+#
+# Perfilamento opcional de requisições, para investigar páginas lentas em
+# produção (ex.: detalhe_simulacao, transacoes) sem reproduzir localmente.
+#
+# Uma requisição é perfilada quando:
+#   - PERFIL_TAXA > 0 e o sorteio cai dentro da taxa (0.01 = 1% das
+#     requisições), opcionalmente só nos endpoints de PERFIL_ENDPOINTS; ou
+#   - o administrador pede com ?perfil=1 (ou ?perfil=cprofile /
+#     ?perfil=amostragem para escolher o modo), mesmo com a taxa em zero.
+#
+# Modos (PERFIL_MODO):
+#   amostragem  uma thread lê a pilha da requisição a cada
+#               PERFIL_INTERVALO_MS e grava <arquivo>.folded, no formato de
+#               pilhas colapsadas ("a;b;c 12") aceito por flamegraph.pl e
+#               speedscope. Custo baixo: serve para deixar ligado sob carga.
+#   cprofile    cProfile determinístico, grava <arquivo>.prof (pstats,
+#               snakeviz). Mais preciso por função e bem mais caro.
+#
+# Os arquivos ficam em PERFIL_DIR, no máximo PERFIL_MAX_ARQUIVOS (os mais
+# antigos são apagados); a resposta perfilada traz o nome no cabeçalho
+# X-Perfil.
+
+import cProfile
+import glob
+import logging
+import os
+import random
+import sys
+import threading
+from collections import Counter
+from datetime import datetime
+from itertools import count
+
+from flask import current_app, g, request
+
+from backend.rotas.auth import usuario_eh_admin
+
+logger = logging.getLogger(__name__)
+
+MODOS = ('amostragem', 'cprofile')
+
+_sequencia = count(1)
+# Prefixos removidos dos caminhos nas pilhas (site-packages, raiz do projeto)
+_PREFIXOS = sorted({os.path.join(p, '') for p in sys.path if p and os.path.isdir(p)},
+                   key=len, reverse=True)
+
+
+def _rotulo(code):
+    arquivo = code.co_filename
+    for prefixo in _PREFIXOS:
+        if arquivo.startswith(prefixo):
+            arquivo = arquivo[len(prefixo):]
+            break
+    return f'{code.co_name} ({arquivo}:{code.co_firstlineno})'.replace(';', ':')
+
+
+class Amostrador:
+    """Amostra periodicamente a pilha de uma thread e conta pilhas iguais."""
+
+    def __init__(self, thread_id, intervalo):
+        self.thread_id = thread_id
+        self.intervalo = intervalo
+        self.pilhas = Counter()
+        self._parar = threading.Event()
+        self._thread = threading.Thread(target=self._executar, name='perfilador', daemon=True)
+
+    def iniciar(self):
+        self._thread.start()
+
+    def parar(self):
+        self._parar.set()
+        self._thread.join()
+
+    def _executar(self):
+        while not self._parar.wait(self.intervalo):
+            frame = sys._current_frames().get(self.thread_id)
+            pilha = []
+            while frame is not None:
+                pilha.append(_rotulo(frame.f_code))
+                frame = frame.f_back
+            if pilha:
+                self.pilhas[';'.join(reversed(pilha))] += 1
+
+    def gravar(self, caminho):
+        with open(caminho, 'w', encoding='utf-8') as f:
+            for pilha, vezes in self.pilhas.most_common():
+                f.write(f'{pilha} {vezes}\n')
+
+
+def _modo_da_requisicao(config):
+    """Modo a usar nesta requisição, ou None se ela não deve ser perfilada."""
+    pedido = request.args.get('perfil')
+    if pedido and usuario_eh_admin():
+        return pedido if pedido in MODOS else config['PERFIL_MODO']
+    taxa = config['PERFIL_TAXA']
+    if taxa <= 0 or random.random() >= taxa:
+        return None
+    endpoints = config['PERFIL_ENDPOINTS']
+    if endpoints and request.endpoint not in endpoints:
+        return None
+    return config['PERFIL_MODO']
+
+
+def _iniciar():
+    config = current_app.config
+    modo = _modo_da_requisicao(config)
+    if modo is None:
+        return
+    if modo == 'cprofile':
+        perfil = cProfile.Profile()
+        try:
+            perfil.enable()
+        except ValueError:
+            # Outro perfil cProfile já ativo neste processo (Python 3.12+)
+            return
+    else:
+        perfil = Amostrador(threading.get_ident(), config['PERFIL_INTERVALO_MS'] / 1000)
+        perfil.iniciar()
+    g._perfil = (modo, perfil)
+
+
+def _limpar_antigos(diretorio, maximo):
+    arquivos = glob.glob(os.path.join(diretorio, 'perfil-*'))
+    if len(arquivos) > maximo:
+        arquivos.sort(key=os.path.getmtime)
+        for antigo in arquivos[:len(arquivos) - maximo]:
+            try:
+                os.remove(antigo)
+            except OSError:
+                pass
+
+
+def _encerrar():
+    """Para o perfil da requisição (se houver) e grava o arquivo; devolve o nome."""
+    modo, perfil = g.pop('_perfil', (None, None))
+    if perfil is None:
+        return None
+    config = current_app.config
+    if modo == 'cprofile':
+        perfil.disable()
+    else:
+        perfil.parar()
+        if not perfil.pilhas:
+            return None  # mais rápida que o intervalo de amostragem
+
+    diretorio = config['PERFIL_DIR']
+    endpoint = (request.endpoint or 'desconhecido').replace('.', '-')
+    nome = (f'perfil-{datetime.now():%Y%m%d-%H%M%S}-{endpoint}-{os.getpid()}-{next(_sequencia)}'
+            f'.{"prof" if modo == "cprofile" else "folded"}')
+    try:
+        os.makedirs(diretorio, exist_ok=True)
+        caminho = os.path.join(diretorio, nome)
+        if modo == 'cprofile':
+            perfil.dump_stats(caminho)
+        else:
+            perfil.gravar(caminho)
+        _limpar_antigos(diretorio, config['PERFIL_MAX_ARQUIVOS'])
+    except OSError:
+        logger.exception('Não foi possível gravar o perfil em %s', diretorio)
+        return None
+    return nome
+
+
+def _finalizar(response):
+    nome = _encerrar()
+    if nome:
+        response.headers['X-Perfil'] = nome
+    return response
+
+
+def _finalizar_com_erro(exc):
+    # Exceção não tratada: after_request não roda, mas o perfil ainda vale
+    if exc is not None:
+        _encerrar()
+
+
+def instalar_perfilador(app):
+    """Registra os hooks; sem taxa configurada, custa uma leitura de ?perfil por requisição."""
+    if app.config['PERFIL_MODO'] not in MODOS:
+        raise ValueError(f"PERFIL_MODO inválido: {app.config['PERFIL_MODO']} (use {', '.join(MODOS)})")
+    app.before_request(_iniciar)
+    app.after_request(_finalizar)
+    app.teardown_request(_finalizar_com_erro)
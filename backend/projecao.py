@@ -0,0 +1,190 @@
+# backend/projecao.py
+#
+# Motor de projeção das simulações financeiras. Não depende de Flask nem
+# do banco: recebe itens/eventos como sequências simples e calcula as
+# séries mensais com somas acumuladas do NumPy, para qualquer horizonte.
+# As séries são calculadas em centavos inteiros (int64), então resultados
+# e caixa acumulado somam sem erro; só a saída é convertida para reais.
+
+from dataclasses import dataclass
+
+import numpy as np
+
+# Fator para converter valor de sessão em valor mensal (1 sessão/semana, 4 semanas/mês)
+FATOR_SESSOES_MES = 4
+# Semanas médias por mês, usadas na estimativa de receita semanal
+SEMANAS_POR_MES = 4.33
+
+HORIZONTE_PADRAO = 6
+HORIZONTE_MAXIMO = 120
+
+
+@dataclass
+class Projecao:
+    """Séries mensais de uma simulação (arrays de tamanho `meses`)."""
+    delta_pacientes: np.ndarray
+    receita: np.ndarray
+    despesa: np.ndarray
+    resultado: np.ndarray
+    semanal_estimada: np.ndarray
+
+    @property
+    def meses(self):
+        return len(self.receita)
+
+    @property
+    def labels(self):
+        return [f'Mês {m + 1}' for m in range(self.meses)]
+
+    @property
+    def caixa_acumulado(self):
+        return np.cumsum(_centavos(self.resultado)) / 100
+
+    def linhas_tabela(self):
+        """Linhas no formato usado pela tabela de simulacao_detail.html."""
+        return [
+            {
+                'mes': label,
+                'delta_pacientes': int(delta),
+                'mensal': float(receita),
+                'semanal_estimada': float(semanal),
+                'despesa_total_mes': float(despesa),
+                'resultado_liquido_mes': float(resultado),
+            }
+            for label, delta, receita, semanal, despesa, resultado in zip(
+                self.labels, self.delta_pacientes, self.receita,
+                self.semanal_estimada, self.despesa, self.resultado)
+        ]
+
+
+def _centavos(reais):
+    return np.rint(np.asarray(reais, dtype=float) * 100).astype(np.int64)
+
+
+def valores_base_lote(indices, pacientes, valores, n):
+    """
+    Versão em lote de `valores_base`: itens de N cenários em arrays
+    paralelos, com `indices` indicando a qual cenário (0..n-1) pertence
+    cada item. Devolve (renda_mensal_base, valor_unitario), ambos (n,).
+    """
+    indices = np.asarray(indices, dtype=np.int64)
+    pacientes = np.nan_to_num(np.asarray(pacientes, dtype=float))
+    valores = np.nan_to_num(np.asarray(valores, dtype=float))
+
+    renda_base = np.bincount(indices, weights=pacientes * valores, minlength=n) * FATOR_SESSOES_MES
+    total_pacientes = np.bincount(indices, weights=pacientes, minlength=n)
+    soma_valores = np.bincount(indices, weights=valores, minlength=n)
+    qtd_itens = np.bincount(indices, minlength=n)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Média ponderada do valor MENSAL por paciente; sem pacientes base,
+        # média simples dos valores de sessão mensais dos itens.
+        valor_unitario = np.where(
+            total_pacientes > 0,
+            renda_base / total_pacientes,
+            np.where(qtd_itens > 0, soma_valores / qtd_itens * FATOR_SESSOES_MES, 0.0)
+        )
+    return renda_base, valor_unitario
+
+
+def valores_base(itens):
+    """
+    Calcula, a partir de pares (pacientes, valor_sessao), a renda mensal
+    base e o impacto mensal de 1 paciente adicionado/removido por evento.
+    """
+    if not itens:
+        return 0.0, 0.0
+    pacientes = [p or 0 for p, _ in itens]
+    valores = [v or 0.0 for _, v in itens]
+    renda_base, valor_unitario = valores_base_lote(np.zeros(len(itens)), pacientes, valores, 1)
+    return float(renda_base[0]), float(valor_unitario[0])
+
+
+def deltas_lote(indices, offsets, deltas, n, meses):
+    """Matriz (n, meses) de deltas de pacientes a partir de eventos em arrays paralelos."""
+    indices = np.asarray(indices, dtype=np.int64)
+    offsets = np.asarray(offsets, dtype=np.int64)
+    deltas = np.asarray(deltas, dtype=np.int64)
+    matriz = np.zeros((n, meses), dtype=np.int64)
+    validos = (offsets >= 0) & (offsets < meses)
+    np.add.at(matriz, (indices[validos], offsets[validos]), deltas[validos])
+    return matriz
+
+
+def deltas_por_mes(eventos, meses):
+    """Vetor de deltas de pacientes por mês a partir de pares (mes_offset, delta)."""
+    eventos = [(o, d or 0) for o, d in eventos if o is not None]
+    if not eventos:
+        return np.zeros(meses, dtype=np.int64)
+    offsets, deltas = zip(*eventos)
+    return deltas_lote(np.zeros(len(eventos)), offsets, deltas, 1, meses)[0]
+
+
+def projetar_matriz(renda_base, valor_unitario, deltas, despesa_mensal):
+    """
+    Projeta N cenários de uma vez. `renda_base`, `valor_unitario` e
+    `despesa_mensal` (em reais) têm forma (N,) e `deltas` forma (N, meses).
+    Devolve (receita, despesa, resultado) em centavos inteiros, cada um
+    com forma (N, meses).
+    """
+    renda_base = np.asarray(renda_base, dtype=float)[:, None] * 100
+    valor_unitario = np.asarray(valor_unitario, dtype=float)[:, None] * 100
+    despesa = _centavos(despesa_mensal)[:, None]
+
+    receita = np.rint(renda_base + np.cumsum(deltas, axis=1) * valor_unitario).astype(np.int64)
+    despesa = np.broadcast_to(despesa, receita.shape)
+    return receita, despesa, receita - despesa
+
+
+def projetar(itens, eventos, despesa_mensal_fixa=0.0, meses=HORIZONTE_PADRAO):
+    """
+    Projeta uma simulação por `meses` meses.
+
+    `itens`: pares (pacientes, valor_sessao) da base inicial.
+    `eventos`: pares (mes_offset, delta) com a variação de pacientes no mês.
+    """
+    renda_base, valor_unitario = valores_base(itens)
+    deltas = deltas_por_mes(eventos, meses)
+    receita, despesa, resultado = projetar_matriz(
+        [renda_base], [valor_unitario], deltas[None, :], [despesa_mensal_fixa or 0.0]
+    )
+    receita, despesa, resultado = receita[0], despesa[0], resultado[0]
+    semanal = np.where(receita > 0, np.rint(receita / SEMANAS_POR_MES), 0)
+    return Projecao(
+        delta_pacientes=deltas,
+        receita=receita / 100,
+        despesa=despesa / 100,
+        resultado=resultado / 100,
+        semanal_estimada=semanal / 100,
+    )
+
+
+def comparar_cenarios(n, itens, eventos, despesas, meses):
+    """
+    Projeta N cenários como uma matriz cenários × meses.
+
+    `itens`: tupla de arrays (indices, pacientes, valores);
+    `eventos`: tupla de arrays (indices, offsets, deltas);
+    `despesas`: despesa mensal fixa de cada cenário, forma (n,).
+
+    Devolve um dicionário com as matrizes `receita`, `resultado` e
+    `caixa_acumulado` e, por cenário, `resultado_total`, `caixa_final` e
+    `mes_equilibrio` (primeiro mês, 1-based, com caixa acumulado >= 0;
+    0 se não houver).
+    """
+    renda_base, valor_unitario = valores_base_lote(*itens, n)
+    deltas = deltas_lote(*eventos, n, meses)
+    despesas = np.nan_to_num(np.asarray(despesas, dtype=float))
+    receita, _, resultado = projetar_matriz(renda_base, valor_unitario, deltas, despesas)
+
+    caixa = np.cumsum(resultado, axis=1)
+    positivo = caixa >= 0
+    mes_equilibrio = np.where(positivo.any(axis=1), positivo.argmax(axis=1) + 1, 0)
+    return {
+        'receita': receita / 100,
+        'resultado': resultado / 100,
+        'caixa_acumulado': caixa / 100,
+        'resultado_total': resultado.sum(axis=1) / 100,
+        'caixa_final': caixa[:, -1] / 100 if meses else np.zeros(n),
+        'mes_equilibrio': mes_equilibrio,
+    }
@@ -0,0 +1,99 @@
+# backend/recorrencias.py
+#
+# Materializa as transações recorrentes (aluguel, software...) cadastradas
+# em transacoes_recorrentes. Cada ocorrência tem um período ('AAAA-MM' nas
+# regras mensais, 'AAAA-Www' nas semanais) e a restrição única
+# (recorrencia_id, periodo) em transacoes, com ON CONFLICT DO NOTHING,
+# garante que rodar de novo não duplica nada. Pôr em dia meses sem
+# execução é um único INSERT em lote.
+#
+# Agende no cron, por exemplo:
+#   0 6 * * *  flask --app backend.app materializar-recorrencias
+
+import calendar
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import select
+
+from backend.db import insert_do_dialeto
+from backend.metricas import medir_job
+from backend.models import db, Transacao, TransacaoRecorrente
+from backend.resumo import aplicar_deltas, deltas_de_insercao
+
+FREQUENCIAS = ('mensal', 'semanal')
+
+
+def ocorrencias(regra, ate):
+    """Gera pares (periodo, data) da `regra` do início dela até `ate`, inclusive."""
+    fim = min(ate, regra.fim) if regra.fim else ate
+    if regra.frequencia == 'mensal':
+        ano, mes = regra.inicio.year, regra.inicio.month
+        while True:
+            # Dia 31 em meses mais curtos cai no último dia do mês
+            data = date(ano, mes, min(regra.dia, calendar.monthrange(ano, mes)[1]))
+            if data > fim:
+                break
+            if data >= regra.inicio:
+                yield f'{ano:04d}-{mes:02d}', data
+            ano, mes = (ano + 1, 1) if mes == 12 else (ano, mes + 1)
+    else:
+        data = regra.inicio + timedelta(days=(regra.dia - regra.inicio.weekday()) % 7)
+        while data <= fim:
+            ano, semana, _ = data.isocalendar()
+            yield f'{ano:04d}-W{semana:02d}', data
+            data += timedelta(weeks=1)
+
+
+@medir_job('recorrencias')
+def materializar(ate=None, regras=None):
+    """
+    Cria, em um único INSERT, os lançamentos ainda não gerados das regras
+    ativas (ou das `regras` informadas) com data até `ate` (padrão: hoje).
+    Devolve a quantidade de transações criadas.
+    """
+    ate = ate or date.today()
+    if regras is None:
+        regras = db.session.execute(
+            select(TransacaoRecorrente)
+            .where(TransacaoRecorrente.ativa.is_(True), TransacaoRecorrente.inicio <= ate)
+        ).scalars().all()
+    if not regras:
+        return 0
+
+    # Uma consulta traz os períodos já gerados de todas as regras
+    existentes = set(db.session.execute(
+        select(Transacao.recorrencia_id, Transacao.periodo)
+        .where(Transacao.recorrencia_id.in_([r.id for r in regras]))
+    ).all())
+
+    linhas = [
+        {
+            'nome': regra.nome,
+            'tipo': regra.tipo,
+            'observacao': regra.observacao,
+            'valor': regra.valor,
+            'data_criacao': datetime.combine(data, datetime.min.time()),
+            'recorrencia_id': regra.id,
+            'periodo': periodo,
+        }
+        for regra in regras
+        for periodo, data in ocorrencias(regra, ate)
+        if (regra.id, periodo) not in existentes
+    ]
+    if not linhas:
+        return 0
+
+    # Outra execução pode materializar os mesmos períodos ao mesmo tempo:
+    # os conflitos são ignorados e só as linhas inseridas de fato (RETURNING)
+    # entram no resumo e na contagem
+    conn = db.session.connection()
+    tabela = Transacao.__table__
+    inseridas = [dict(linha._mapping) for linha in conn.execute(
+        insert_do_dialeto(conn, tabela)
+        .on_conflict_do_nothing(index_elements=['recorrencia_id', 'periodo'])
+        .returning(tabela.c.tipo, tabela.c.valor, tabela.c.data_criacao, tabela.c.nome),
+        linhas,
+    )]
+    aplicar_deltas(conn, deltas_de_insercao(Transacao, inseridas))
+    db.session.commit()
+    return len(inseridas)
@@ -0,0 +1,261 @@
+# backend/relatorios.py
+#
+# Relatórios mensais: receita, despesa e resultado por mês, por paciente
+# (notas emitidas) e por categoria (nome da transação).
+#
+# Meses encerrados são calculados uma única vez e congelados nas tabelas
+# relatorio_meses / relatorio_mensal_itens pelo comando agendado
+#
+#   flask --app backend.app fechar-relatorios     (ex.: cron diário)
+#
+# A leitura (GET /relatorios) não escreve nada: meses ainda não congelados
+# (o corrente e os encerrados desde o último fechamento) são lidos das
+# tabelas de origem. Se uma escrita atingir um mês já fechado,
+# resumo.aplicar_deltas chama `reabrir_meses` e ele volta a ser calculado
+# na leitura até o próximo fechamento.
+
+from collections import defaultdict
+from datetime import date, datetime
+
+from sqlalchemy import delete, extract, func, insert, select
+from sqlalchemy.exc import IntegrityError
+
+from backend.db import sessao_leitura
+from backend.dinheiro import ZERO
+from backend.metricas import medir_job
+from backend.models import (
+    db, Paciente, Nota, Transacao, ResumoFinanceiro, RelatorioMes, RelatorioMensalItem
+)
+
+PACIENTE = 'paciente'
+CATEGORIA = 'categoria'
+CAMPOS_ITEM = ('dimensao', 'chave', 'rotulo', 'quantidade', 'receita', 'despesa')
+
+
+def mes_atual():
+    # data_criacao e Nota.data são gravados em UTC (datetime.utcnow)
+    return f'{datetime.utcnow():%Y-%m}'
+
+
+def mes_seguinte(mes):
+    ano, m = int(mes[:4]), int(mes[5:7])
+    return f'{ano + m // 12:04d}-{m % 12 + 1:02d}'
+
+
+def meses_entre(inicio, fim):
+    """Lista 'AAAA-MM' de `inicio` a `fim`, inclusive."""
+    meses = []
+    mes = inicio
+    while mes <= fim:
+        meses.append(mes)
+        mes = mes_seguinte(mes)
+    return meses
+
+
+def _primeiro_dia(mes):
+    return date(int(mes[:4]), int(mes[5:7]), 1)
+
+
+def _chave_mes(a, m):
+    return f'{int(a):04d}-{int(m):02d}'
+
+
+def _calcular(inicio, fim, sessao=None):
+    """
+    Agrega as tabelas de origem nos meses de `inicio` a `fim` (inclusive).
+    Devolve (geral, itens): geral é {mes: {receita, despesa, notas_quantidade,
+    notas_soma}} e itens uma lista de dicionários de relatorio_mensal_itens.
+    """
+    sessao = sessao or db.session
+    de, ate = _primeiro_dia(inicio), _primeiro_dia(mes_seguinte(fim))
+    geral = defaultdict(lambda: {'receita': ZERO, 'despesa': ZERO,
+                                 'notas_quantidade': 0, 'notas_soma': ZERO})
+    itens = {}
+
+    def _item(mes, dimensao, chave, rotulo):
+        k = (mes, dimensao, chave)
+        if k not in itens:
+            itens[k] = {'mes': mes, 'dimensao': dimensao, 'chave': chave, 'rotulo': rotulo,
+                        'quantidade': 0, 'receita': ZERO, 'despesa': ZERO}
+        return itens[k]
+
+    # Transações: um único GROUP BY por (mês, tipo, nome) alimenta o total
+    # do mês e a quebra por categoria.
+    ano, mes = extract('year', Transacao.data_criacao), extract('month', Transacao.data_criacao)
+    for a, m, tipo, nome, qtd, soma in sessao.execute(
+        select(ano, mes, Transacao.tipo, Transacao.nome, func.count(), func.sum(Transacao.valor))
+        .where(Transacao.data_criacao >= datetime.combine(de, datetime.min.time()),
+               Transacao.data_criacao < datetime.combine(ate, datetime.min.time()))
+        .group_by(ano, mes, Transacao.tipo, Transacao.nome)
+    ):
+        if tipo not in ('receita', 'despesa'):
+            continue
+        chave_mes = _chave_mes(a, m)
+        geral[chave_mes][tipo] += soma or ZERO
+        item = _item(chave_mes, CATEGORIA, nome, nome)
+        item['quantidade'] += qtd
+        item[tipo] += soma or ZERO
+
+    ano, mes = extract('year', Nota.data), extract('month', Nota.data)
+    for a, m, paciente_id, nome, qtd, soma in sessao.execute(
+        select(ano, mes, Nota.paciente_id, Paciente.nome, func.count(), func.sum(Nota.valor))
+        .join(Paciente, Paciente.id == Nota.paciente_id)
+        .where(Nota.data >= de, Nota.data < ate)
+        .group_by(ano, mes, Nota.paciente_id, Paciente.nome)
+    ):
+        chave_mes = _chave_mes(a, m)
+        geral[chave_mes]['notas_quantidade'] += qtd
+        geral[chave_mes]['notas_soma'] += soma or ZERO
+        item = _item(chave_mes, PACIENTE, str(paciente_id), nome)
+        item['quantidade'] += qtd
+        item['receita'] += soma or ZERO
+
+    return geral, list(itens.values())
+
+
+def _com_movimento(*condicoes):
+    # resumo_financeiro já sabe quais meses têm movimento: não é preciso
+    # varrer transações e notas para descobrir.
+    return select(ResumoFinanceiro.periodo).where(
+        ResumoFinanceiro.metrica.in_(('receita', 'despesa', 'notas')),
+        ResumoFinanceiro.periodo != 'total',
+        ResumoFinanceiro.quantidade > 0,
+        *condicoes
+    ).distinct()
+
+
+def meses_pendentes():
+    """Meses encerrados com movimento que ainda não foram congelados."""
+    com_movimento = _com_movimento(ResumoFinanceiro.periodo < mes_atual())
+    fechados = select(RelatorioMes.mes)
+    return sorted(db.session.execute(com_movimento.except_(fechados)).scalars())
+
+
+@medir_job('fechar_relatorios')
+def fechar_meses():
+    """
+    Congela os meses encerrados que ainda não estão em relatorio_meses.
+    Devolve a quantidade de meses fechados nesta chamada.
+    """
+    pendentes = meses_pendentes()
+    if not pendentes:
+        return 0
+    geral, itens = _calcular(pendentes[0], pendentes[-1])
+    pendentes_set = set(pendentes)
+    agora = datetime.utcnow()
+    try:
+        db.session.execute(insert(RelatorioMes), [
+            {'mes': mes, 'fechado_em': agora, **geral[mes]} for mes in pendentes
+        ])
+        itens = [i for i in itens if i['mes'] in pendentes_set]
+        if itens:
+            db.session.execute(insert(RelatorioMensalItem), itens)
+        db.session.commit()
+    except IntegrityError:
+        # Outro worker fechou os mesmos meses ao mesmo tempo
+        db.session.rollback()
+        return 0
+    return len(pendentes)
+
+
+def reabrir_meses(conn, meses=None):
+    """
+    Descarta os meses congelados informados (ou todos, se `meses` for
+    None) para que sejam recalculados na próxima leitura.
+    """
+    meses_tabela, itens_tabela = RelatorioMes.__table__, RelatorioMensalItem.__table__
+    if meses is None:
+        conn.execute(delete(itens_tabela))
+        conn.execute(delete(meses_tabela))
+        return
+    meses = list(meses)
+    if meses:
+        conn.execute(delete(itens_tabela).where(itens_tabela.c.mes.in_(meses)))
+        conn.execute(delete(meses_tabela).where(meses_tabela.c.mes.in_(meses)))
+
+
+@medir_job('relatorio')
+def montar_relatorio(inicio, fim):
+    """
+    Relatório dos meses `inicio` a `fim` ('AAAA-MM', inclusive).
+
+    Devolve um dicionário com `meses` (uma linha por mês, inclusive os sem
+    movimento), `pacientes` e `categorias` (somados no intervalo, em ordem
+    decrescente de valor) e `totais`. Só lê: o congelamento é feito por
+    `fechar_meses` (comando fechar-relatorios).
+    """
+    atual = mes_atual()
+
+    # As leituras vão para a réplica, se houver (backend/db.py)
+    with sessao_leitura() as sessao:
+        geral = {
+            m.mes: {'receita': m.receita, 'despesa': m.despesa,
+                    'notas_quantidade': m.notas_quantidade, 'notas_soma': m.notas_soma}
+            for m in sessao.execute(
+                select(RelatorioMes).where(RelatorioMes.mes >= inicio, RelatorioMes.mes <= fim)
+            ).scalars()
+        }
+        itens = [
+            dict(zip(CAMPOS_ITEM, linha))
+            for linha in sessao.execute(
+                select(RelatorioMensalItem.dimensao, RelatorioMensalItem.chave,
+                       func.max(RelatorioMensalItem.rotulo),
+                       func.sum(RelatorioMensalItem.quantidade),
+                       func.sum(RelatorioMensalItem.receita),
+                       func.sum(RelatorioMensalItem.despesa))
+                .where(RelatorioMensalItem.mes >= inicio, RelatorioMensalItem.mes <= fim)
+                .group_by(RelatorioMensalItem.dimensao, RelatorioMensalItem.chave)
+            )
+        ]
+
+        # Meses com movimento ainda não congelados: o corrente, os
+        # encerrados desde o último fechar-relatorios e, com réplica
+        # atrasada, os recém-fechados no primário. Vêm das tabelas de origem.
+        abertos = set(sessao.execute(_com_movimento(
+            ResumoFinanceiro.periodo >= inicio, ResumoFinanceiro.periodo <= fim
+        )).scalars()) - geral.keys()
+        if abertos:
+            geral_abertos, itens_abertos = _calcular(min(abertos), max(abertos), sessao)
+            geral.update((mes, v) for mes, v in geral_abertos.items() if mes in abertos)
+            itens.extend(i for i in itens_abertos if i['mes'] in abertos)
+
+    # Soma as quebras do mês corrente às dos meses fechados
+    por_chave = {}
+    for item in itens:
+        k = (item['dimensao'], item['chave'])
+        if k in por_chave:
+            for campo in ('quantidade', 'receita', 'despesa'):
+                por_chave[k][campo] += item[campo]
+        else:
+            # Mesmo formato para meses abertos e congelados (sem 'mes')
+            por_chave[k] = {campo: item[campo] for campo in CAMPOS_ITEM}
+
+    vazio = {'receita': ZERO, 'despesa': ZERO, 'notas_quantidade': 0, 'notas_soma': ZERO}
+    linhas_meses = []
+    for mes in meses_entre(inicio, fim):
+        valores = geral.get(mes, vazio)
+        linhas_meses.append({
+            'mes': mes,
+            'fechado': mes < atual,
+            **valores,
+            'resultado': valores['receita'] - valores['despesa'],
+        })
+
+    pacientes = sorted((i for i in por_chave.values() if i['dimensao'] == PACIENTE),
+                       key=lambda i: i['receita'], reverse=True)
+    categorias = sorted((i for i in por_chave.values() if i['dimensao'] == CATEGORIA),
+                        key=lambda i: i['receita'] + i['despesa'], reverse=True)
+    receita = sum((l['receita'] for l in linhas_meses), ZERO)
+    despesa = sum((l['despesa'] for l in linhas_meses), ZERO)
+    return {
+        'meses': linhas_meses,
+        'pacientes': pacientes,
+        'categorias': categorias,
+        'totais': {
+            'receita': receita,
+            'despesa': despesa,
+            'resultado': receita - despesa,
+            'notas_quantidade': sum(l['notas_quantidade'] for l in linhas_meses),
+            'notas_soma': sum((l['notas_soma'] for l in linhas_meses), ZERO),
+        },
+    }
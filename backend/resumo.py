@@ -0,0 +1,205 @@
+# backend/resumo.py
+#
+# Mantém a tabela resumo_financeiro atualizada a cada flush do ORM, para
+# que o dashboard leia poucas linhas prontas em vez de varrer transações,
+# notas e pacientes. Inserções em massa (Core) que não passam pelo ORM
+# devem chamar `aplicar_deltas` explicitamente.
+
+from collections import defaultdict
+
+from sqlalchemy import event, extract, func, inspect, select
+from sqlalchemy.orm import Session
+
+from backend.db import insert_do_dialeto
+from backend.dinheiro import ZERO, para_decimal
+from backend.models import db, Paciente, Nota, Transacao, ResumoFinanceiro
+from backend.relatorios import mes_atual, reabrir_meses
+
+PERIODO_TOTAL = 'total'
+
+# Atributos que influenciam o resumo, por modelo. nome e paciente_id não
+# mudam os totais, mas mudam as quebras do relatório mensal daquele mês.
+_CAMPOS = {
+    Transacao: ('tipo', 'valor', 'data_criacao', 'nome'),
+    Nota: ('valor', 'data', 'paciente_id'),
+    Paciente: ('active', 'valor_sessao'),
+}
+
+
+def _carregar_valor_anterior(target, value, oldvalue, initiator):
+    pass
+
+
+# active_history faz o ORM carregar o valor antigo mesmo quando o atributo
+# estava expirado (ex.: após um commit), para que o histórico tenha o delta.
+for _modelo, _campos in _CAMPOS.items():
+    for _campo in _campos:
+        event.listen(getattr(_modelo, _campo), 'set', _carregar_valor_anterior,
+                     active_history=True)
+
+
+def periodo_de(data):
+    return f'{data:%Y-%m}' if data else None
+
+
+def _contribuicoes(modelo, v):
+    """
+    Devolve as linhas do resumo afetadas por um registro, como tuplas
+    (metrica, periodo, quantidade, soma), a partir do dicionário `v`.
+    """
+    if modelo is Transacao:
+        chaves = [(v['tipo'], PERIODO_TOTAL), (v['tipo'], periodo_de(v['data_criacao']))]
+        valor = para_decimal(v['valor']) or ZERO
+    elif modelo is Nota:
+        chaves = [('notas', PERIODO_TOTAL), ('notas', periodo_de(v['data']))]
+        valor = para_decimal(v['valor']) or ZERO
+    else:
+        if not v['active']:
+            return []
+        chaves = [('pacientes_ativos', PERIODO_TOTAL)]
+        valor = para_decimal(v['valor_sessao']) or ZERO
+    return [(metrica, periodo, 1, valor) for metrica, periodo in chaves if periodo]
+
+
+def _valores_atuais(obj, campos):
+    return {c: getattr(obj, c) for c in campos}
+
+
+def _valores_anteriores(obj, campos):
+    attrs = inspect(obj).attrs
+    valores = {}
+    for c in campos:
+        hist = attrs[c].history
+        valores[c] = hist.deleted[0] if hist.deleted else getattr(obj, c)
+    return valores
+
+
+def _acumular(deltas, contribuicoes, sinal):
+    for metrica, periodo, qtd, soma in contribuicoes:
+        atual = deltas[(metrica, periodo)]
+        deltas[(metrica, periodo)] = (atual[0] + sinal * qtd, atual[1] + sinal * soma)
+
+
+def aplicar_deltas(conn, deltas):
+    """
+    Soma `deltas` ({(metrica, periodo): (quantidade, soma)}) nas linhas do
+    resumo, criando as que ainda não existem. Meses encerrados afetados
+    são reabertos em backend/relatorios.py.
+    """
+    tabela = ResumoFinanceiro.__table__
+    atual = mes_atual()
+    meses_fechados = set()
+    linhas = []
+    # Ordem fixa das chaves: transações concorrentes travam as linhas na
+    # mesma sequência (sem deadlock no PostgreSQL)
+    for (metrica, periodo), (qtd, soma) in sorted(deltas.items()):
+        if periodo != PERIODO_TOTAL and periodo < atual:
+            meses_fechados.add(periodo)
+        if qtd or soma:
+            linhas.append({'metrica': metrica, 'periodo': periodo, 'quantidade': qtd, 'soma': soma})
+    if linhas:
+        # Upsert atômico: duas transações criando a mesma linha nova somam
+        # os dois deltas em vez de uma falhar na chave primária
+        stmt = insert_do_dialeto(conn, tabela)
+        conn.execute(stmt.on_conflict_do_update(
+            index_elements=[tabela.c.metrica, tabela.c.periodo],
+            set_={'quantidade': tabela.c.quantidade + stmt.excluded.quantidade,
+                  'soma': tabela.c.soma + stmt.excluded.soma},
+        ), linhas)
+    # Mês já encerrado mudou: o relatório congelado dele deixa de valer
+    reabrir_meses(conn, meses_fechados)
+
+
+def deltas_de_insercao(modelo, linhas):
+    """
+    Deltas do resumo para linhas (dicionários) inseridas em massa pelo
+    Core, que não passam pelos eventos do ORM. Use com `aplicar_deltas`.
+    """
+    deltas = defaultdict(lambda: (0, ZERO))
+    campos = _CAMPOS[modelo]
+    for linha in linhas:
+        _acumular(deltas, _contribuicoes(modelo, {c: linha.get(c) for c in campos}), +1)
+    return deltas
+
+
+@event.listens_for(Session, 'before_flush')
+def _antes_do_flush(session, flush_context, instances):
+    # Alterações e exclusões são calculadas antes do flush, enquanto o
+    # histórico dos atributos e as linhas excluídas ainda estão disponíveis.
+    deltas = session.info.setdefault('resumo_deltas', defaultdict(lambda: (0, ZERO)))
+    for obj in session.deleted:
+        campos = _CAMPOS.get(type(obj))
+        if campos:
+            _acumular(deltas, _contribuicoes(type(obj), _valores_anteriores(obj, campos)), -1)
+    for obj in session.dirty:
+        campos = _CAMPOS.get(type(obj))
+        if not campos or obj in session.deleted:
+            continue
+        attrs = inspect(obj).attrs
+        if not any(attrs[c].history.has_changes() for c in campos):
+            continue
+        _acumular(deltas, _contribuicoes(type(obj), _valores_anteriores(obj, campos)), -1)
+        _acumular(deltas, _contribuicoes(type(obj), _valores_atuais(obj, campos)), +1)
+
+
+@event.listens_for(Session, 'after_flush')
+def _depois_do_flush(session, flush_context):
+    # Inserções são tratadas depois do flush para enxergar os defaults
+    # (ex.: data_criacao, active) já aplicados.
+    deltas = session.info.pop('resumo_deltas', None) or defaultdict(lambda: (0, ZERO))
+    for obj in session.new:
+        campos = _CAMPOS.get(type(obj))
+        if campos:
+            _acumular(deltas, _contribuicoes(type(obj), _valores_atuais(obj, campos)), +1)
+    if deltas:
+        aplicar_deltas(session.connection(), deltas)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _depois_do_rollback(session):
+    session.info.pop('resumo_deltas', None)
+
+
+def ler_resumo(periodo=PERIODO_TOTAL, sessao=None):
+    """Devolve {metrica: (quantidade, soma)} para o período informado."""
+    linhas = (sessao or db.session).execute(
+        select(ResumoFinanceiro.metrica, ResumoFinanceiro.quantidade, ResumoFinanceiro.soma)
+        .where(ResumoFinanceiro.periodo == periodo)
+    ).all()
+    return {metrica: (qtd, soma) for metrica, qtd, soma in linhas}
+
+
+def reconstruir_resumo():
+    """Recalcula toda a tabela de resumo a partir das tabelas de origem."""
+    deltas = defaultdict(lambda: (0, ZERO))
+
+    def _somar(metrica, periodo, qtd, soma):
+        _acumular(deltas, [(metrica, periodo, qtd or 0, soma or ZERO)], +1)
+
+    ano, mes = extract('year', Transacao.data_criacao), extract('month', Transacao.data_criacao)
+    for tipo, a, m, qtd, soma in db.session.execute(
+        select(Transacao.tipo, ano, mes, func.count(), func.sum(Transacao.valor))
+        .group_by(Transacao.tipo, ano, mes)
+    ):
+        _somar(tipo, PERIODO_TOTAL, qtd, soma)
+        if a is not None:
+            _somar(tipo, f'{int(a):04d}-{int(m):02d}', qtd, soma)
+
+    ano, mes = extract('year', Nota.data), extract('month', Nota.data)
+    for a, m, qtd, soma in db.session.execute(
+        select(ano, mes, func.count(), func.sum(Nota.valor)).group_by(ano, mes)
+    ):
+        _somar('notas', PERIODO_TOTAL, qtd, soma)
+        if a is not None:
+            _somar('notas', f'{int(a):04d}-{int(m):02d}', qtd, soma)
+
+    qtd, soma = db.session.execute(
+        select(func.count(), func.sum(Paciente.valor_sessao)).where(Paciente.active.is_(True))
+    ).one()
+    _somar('pacientes_ativos', PERIODO_TOTAL, qtd, soma)
+
+    db.session.execute(ResumoFinanceiro.__table__.delete())
+    conn = db.session.connection()
+    aplicar_deltas(conn, deltas)
+    db.session.commit()
+    return len(deltas)
@@ -0,0 +1,14 @@
+# backend/rotas/__init__.py
+#
+# Blueprints por área. Os endpoints levam o nome do blueprint como prefixo
+# (url_for('pacientes.listar_pacientes')); as URLs continuam as mesmas.
+
+from backend.rotas import auth, metricas, notas, pacientes, painel, simulacoes, transacoes
+
+BLUEPRINTS = (auth.bp, painel.bp, pacientes.bp, transacoes.bp, simulacoes.bp, notas.bp,
+              metricas.bp)
+
+
+def registrar_blueprints(app):
+    for bp in BLUEPRINTS:
+        app.register_blueprint(bp)
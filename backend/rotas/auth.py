@@ -0,0 +1,123 @@
+# backend/rotas/auth.py
+#
+# Login, recuperação de senha, cadastro de usuários e o decorator
+# login_required usado pelos demais blueprints.
+
+from functools import wraps
+
+from flask import (
+    Blueprint, render_template, redirect, url_for, session, request, flash
+)
+
+from backend.db import db
+from backend.models import Usuario
+
+bp = Blueprint('auth', __name__)
+
+# Único usuário com acesso às funções administrativas
+EMAIL_ADMIN = 'admin@admin.com'
+
+
+def login_required(f):
+    """Redireciona para o login quando não há usuário na sessão."""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if 'user_id' not in session:
+            flash('Você precisa estar logado para acessar esta página.', 'warning')
+            return redirect(url_for('auth.login'))
+        return f(*args, **kwargs)
+    return decorated_function
+
+
+def usuario_eh_admin():
+    """O usuário da sessão é o administrador?"""
+    if 'user_id' not in session:
+        return False
+    usuario = db.session.get(Usuario, session['user_id'])
+    return usuario is not None and usuario.email == EMAIL_ADMIN
+
+
+@bp.route('/')
+def home():
+    return redirect(url_for('auth.login'))
+
+@bp.route('/login', methods=['GET', 'POST'])
+def login():
+    if request.method == 'POST':
+        email = request.form.get('email')
+        senha = request.form.get('senha')
+        usuario = Usuario.query.filter_by(email=email).first()
+        if usuario and usuario.check_senha(senha):
+            session['user_id'] = usuario.id
+            flash('Login realizado com sucesso!', 'success')
+            return redirect(url_for('painel.dashboard'))
+        flash('Usuário ou senha inválidos.', 'danger')
+    return render_template('login.html')
+
+@bp.route('/forgot_password', methods=['GET', 'POST'])
+def request_reset_token():
+    if request.method == 'POST':
+        email = request.form.get('email')
+        user = Usuario.query.filter_by(email=email).first()
+        if user:
+            token = user.get_reset_token()
+            db.session.commit()
+            print(f"DEBUG: Link para redefinir senha para {user.email}: {url_for('auth.reset_token', token=token, _external=True)}") # Linha de DEBUG
+            flash('Um e-mail (simulado) foi enviado com instruções para redefinir sua senha.', 'info')
+            return redirect(url_for('auth.login'))
+        else:
+            flash('E-mail não encontrado em nosso sistema.', 'warning')
+    return render_template('request_reset_token.html')
+
+@bp.route('/reset_password/<token>', methods=['GET', 'POST'])
+def reset_token(token):
+    user = Usuario.verify_reset_token(token)
+    if not user:
+        flash('O token de redefinição é inválido ou expirou.', 'warning')
+        return redirect(url_for('auth.request_reset_token'))
+
+    if request.method == 'POST':
+        password = request.form.get('password')
+        confirm_password = request.form.get('confirm_password')
+        if not password or not confirm_password or password != confirm_password:
+            flash('As senhas não conferem ou estão vazias.', 'danger')
+            return render_template('reset_password.html', token=token)
+
+        user.set_senha(password)
+        user.reset_token = None # Invalida o token após o uso
+        user.reset_token_expiration = None
+        db.session.commit()
+        flash('Sua senha foi atualizada com sucesso!', 'success')
+        return redirect(url_for('auth.login'))
+    return render_template('reset_password.html', token=token)
+
+@bp.route('/register', methods=['GET', 'POST'])
+@login_required
+def register():
+    if not usuario_eh_admin():
+        flash('Apenas o administrador pode registrar novos usuários.', 'danger')
+        return redirect(url_for('painel.dashboard'))
+
+    if request.method == 'POST':
+        nome  = request.form.get('nome')
+        email = request.form.get('email')
+        senha = request.form.get('senha')
+        if not (nome and email and senha):
+            flash('Preencha todos os campos.', 'warning')
+        elif Usuario.query.filter_by(email=email).first():
+            flash('E-mail já cadastrado.', 'danger')
+        else:
+            novo = Usuario(nome=nome, email=email)
+            novo.set_senha(senha)
+            db.session.add(novo)
+            db.session.commit()
+            flash('Usuário registrado com sucesso.', 'success')
+            return redirect(url_for('painel.dashboard'))
+    return render_template('register.html')
+
+@bp.route('/logout')
+@login_required
+def logout():
+    session.clear()
+    flash('Você saiu do sistema.', 'info')
+    return redirect(url_for('auth.login'))
@@ -0,0 +1,29 @@
+# backend/rotas/metricas.py
+#
+# GET /metrics para o Prometheus. Exige usuário logado ou o cabeçalho
+# "Authorization: Bearer <METRICAS_TOKEN>" (para o scraper).
+
+import hmac
+import os
+
+from flask import Blueprint, Response, request, session
+
+from backend.metricas import metricas
+
+bp = Blueprint('metricas', __name__)
+
+
+def _autorizado():
+    if 'user_id' in session:
+        return True
+    token = os.getenv('METRICAS_TOKEN')
+    autorizacao = request.headers.get('Authorization', '')
+    return bool(token) and hmac.compare_digest(autorizacao, f'Bearer {token}')
+
+
+@bp.route('/metrics')
+def exportar_metricas():
+    if not _autorizado():
+        return Response('Não autorizado.\n', status=401, mimetype='text/plain',
+                        headers={'WWW-Authenticate': 'Bearer'})
+    return Response(metricas.exportar(), mimetype='text/plain; version=0.0.4; charset=utf-8')
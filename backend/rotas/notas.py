@@ -0,0 +1,195 @@
+# backend/rotas/notas.py
+#
+# Notas emitidas: listagem, geração do mês, PDFs e importação de planilhas.
+
+import os
+import tempfile
+import zipfile
+from datetime import date, datetime, timedelta
+
+from flask import (
+    Blueprint, current_app, render_template, redirect, url_for,
+    request, flash, abort, jsonify, send_file
+)
+from werkzeug.utils import secure_filename
+
+from backend.db import db
+from backend.dinheiro import formatar_dinheiro
+from backend.metricas import medir_job
+from backend.import_excel.jobs import enfileirar_importacao
+from backend.models import Paciente, Nota, ImportacaoJob
+from backend.notas_mensais import dados_das_notas_do_mes, gerar_notas_do_mes
+from backend.paginacao import (
+    codificar_cursor, decodificar_cursor, limite_da_requisicao, paginar
+)
+from backend.pdf_notas import (
+    dados_da_nota, obter_pdfs, renderizar_em_segundo_plano, separar_em_cache
+)
+from backend.rotas.auth import login_required
+
+bp = Blueprint('notas', __name__)
+
+
+def _data_da_requisicao(nome):
+    valor = request.args.get(nome)
+    try:
+        return datetime.strptime(valor, '%Y-%m-%d').date() if valor else None
+    except ValueError:
+        return None
+
+def _filtrar_notas(query, paciente_id, data_inicio, data_fim):
+    if paciente_id:
+        query = query.filter(Nota.paciente_id == paciente_id)
+    if data_inicio:
+        query = query.filter(Nota.data >= data_inicio)
+    if data_fim:
+        query = query.filter(Nota.data < data_fim + timedelta(days=1))
+    return query
+
+@bp.route('/notas')
+@login_required
+def notas():
+    paciente_id = request.args.get('paciente_id', type=int)
+    data_inicio = _data_da_requisicao('data_inicio')
+    data_fim = _data_da_requisicao('data_fim')
+    limite = limite_da_requisicao(request.args)
+
+    # Projeção com JOIN: o nome do paciente vem na mesma consulta (sem N+1)
+    query = db.session.query(
+        Nota.id, Nota.data, Nota.valor, Paciente.nome.label('paciente_nome')
+    ).join(Paciente, Nota.paciente_id == Paciente.id)
+    query = _filtrar_notas(query, paciente_id, data_inicio, data_fim)
+
+    cursor = decodificar_cursor(request.args.get('cursor'), (date, int))
+    notas_list, tem_mais = paginar(query, [Nota.data, Nota.id], cursor, limite)
+    proximo_cursor = codificar_cursor(notas_list[-1].data, notas_list[-1].id) if tem_mais else None
+
+    return render_template('notas.html',
+                           notas=notas_list,
+                           proximo_cursor=proximo_cursor,
+                           paciente_id=paciente_id,
+                           data_inicio=data_inicio,
+                           data_fim=data_fim,
+                           mes_atual=f'{date.today():%Y-%m}',
+                           limite=limite)
+
+@bp.route('/notas/gerar', methods=['POST'])
+@login_required
+def gerar_notas():
+    mes = request.form.get('mes') or ''
+    try:
+        datetime.strptime(mes, '%Y-%m')
+    except ValueError:
+        flash('Informe o mês no formato AAAA-MM.', 'danger')
+        return redirect(url_for('notas.notas'))
+
+    resultado = gerar_notas_do_mes(mes)
+    # Os PDFs do mês ficam prontos para o download em .zip
+    renderizar_em_segundo_plano(dados_das_notas_do_mes(mes))
+    flash(f"{resultado['criadas']} notas geradas para {mes[5:]}/{mes[:4]} "
+          f"(R$ {formatar_dinheiro(resultado['valor_total'])}); "
+          f"{resultado['existentes']} pacientes já tinham nota no mês.", 'success')
+    return redirect(url_for('notas.notas'))
+
+@bp.route('/notas/<int:nota_id>')
+@login_required
+def nota_detalhe(nota_id):
+    nota = Nota.query.get_or_404(nota_id)
+    return render_template('notas_detalhe.html', nota=nota)
+
+@bp.route('/notas/<int:nota_id>/pdf')
+@login_required
+def nota_pdf(nota_id):
+    nota = Nota.query.get_or_404(nota_id)
+    caminho, = obter_pdfs([dados_da_nota(nota, nota.paciente.nome, nota.paciente.cpf)])
+    return send_file(caminho, mimetype='application/pdf',
+                     download_name=f'nota_{nota.id}.pdf')
+
+# Acima disso o usuário precisa restringir o filtro antes de baixar
+LIMITE_NOTAS_ZIP = 5000
+# PDFs fora do cache renderizados na própria requisição; acima disso vão
+# para a fila em segundo plano e o usuário baixa depois
+LIMITE_PDFS_NA_REQUISICAO = 100
+
+@bp.route('/notas/pdf.zip')
+@login_required
+def notas_zip():
+    """Baixa, em um .zip, os PDFs das notas do filtro atual da listagem."""
+    paciente_id = request.args.get('paciente_id', type=int)
+    data_inicio = _data_da_requisicao('data_inicio')
+    data_fim = _data_da_requisicao('data_fim')
+
+    query = db.session.query(Nota, Paciente.nome, Paciente.cpf) \
+        .join(Paciente, Nota.paciente_id == Paciente.id)
+    query = _filtrar_notas(query, paciente_id, data_inicio, data_fim)
+    linhas = query.order_by(Nota.data, Nota.id).limit(LIMITE_NOTAS_ZIP + 1).all()
+    if not linhas:
+        flash('Nenhuma nota encontrada para o filtro.', 'warning')
+        return redirect(url_for('notas.notas'))
+    if len(linhas) > LIMITE_NOTAS_ZIP:
+        flash(f'Mais de {LIMITE_NOTAS_ZIP} notas no filtro; restrinja o período.', 'danger')
+        return redirect(url_for('notas.notas', paciente_id=paciente_id,
+                                data_inicio=request.args.get('data_inicio'),
+                                data_fim=request.args.get('data_fim')))
+
+    lista_dados = [dados_da_nota(nota, nome, cpf) for nota, nome, cpf in linhas]
+    caminhos, faltando = separar_em_cache(lista_dados)
+    if len(faltando) > LIMITE_PDFS_NA_REQUISICAO:
+        renderizar_em_segundo_plano(faltando)
+        flash(f'Os PDFs de {len(faltando)} notas estão sendo gerados. '
+              'Tente baixar de novo em alguns minutos.', 'info')
+        return redirect(url_for('notas.notas', paciente_id=paciente_id,
+                                data_inicio=request.args.get('data_inicio'),
+                                data_fim=request.args.get('data_fim')))
+    if faltando:
+        with medir_job('pdf_notas'):
+            obter_pdfs(faltando, paralelo=False)
+
+    arquivo = tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024)
+    with zipfile.ZipFile(arquivo, 'w', zipfile.ZIP_DEFLATED) as zf:
+        for dados, caminho in zip(lista_dados, caminhos):
+            zf.write(caminho, f"nota_{dados['id']}_{secure_filename(dados['paciente_nome'])}.pdf")
+    arquivo.seek(0)
+    return send_file(arquivo, mimetype='application/zip', as_attachment=True,
+                     download_name=f'notas_{date.today():%Y%m%d}.zip')
+
+@bp.route('/importar', methods=['GET', 'POST'])
+@login_required
+def importar():
+    if request.method == 'POST':
+        arquivo = request.files.get('arquivo')
+        if not arquivo or not arquivo.filename:
+            flash('Selecione um arquivo para importar.', 'warning')
+            return redirect(url_for('notas.importar'))
+        # O importador lê com openpyxl, que só abre .xlsx
+        if arquivo.filename.lower().endswith('.xls'):
+            flash('Arquivos .xls (Excel 97-2003) não são suportados. '
+                  'Abra a planilha no Excel e salve como .xlsx.', 'danger')
+            return redirect(url_for('notas.importar'))
+        if not arquivo.filename.lower().endswith('.xlsx'):
+            flash('Formato inválido. Envie um arquivo .xlsx.', 'danger')
+            return redirect(url_for('notas.importar'))
+
+        # Salva o upload e enfileira o job; o processamento não bloqueia a requisição
+        pasta = current_app.config['UPLOAD_DIR']
+        os.makedirs(pasta, exist_ok=True)
+        nome = f"{datetime.utcnow():%Y%m%d%H%M%S%f}_{secure_filename(arquivo.filename)}"
+        caminho = os.path.join(pasta, nome)
+        arquivo.save(caminho)
+        job = enfileirar_importacao(current_app._get_current_object(), caminho)
+        flash('Importação enviada para processamento.', 'info')
+        return redirect(url_for('notas.importar', job=job.id))
+
+    job = None
+    job_id = request.args.get('job', type=int)
+    if job_id:
+        job = db.session.get(ImportacaoJob, job_id)
+    return render_template('importar.html', job=job)
+
+@bp.route('/importar/<int:job_id>/status')
+@login_required
+def status_importacao(job_id):
+    job = db.session.get(ImportacaoJob, job_id)
+    if job is None:
+        abort(404)
+    return jsonify(job.to_dict())
@@ -0,0 +1,282 @@
+# backend/rotas/pacientes.py
+#
+# Cadastro de pacientes e registro de sessões (avulsas ou em lote).
+
+from datetime import date, datetime
+
+from flask import (
+    Blueprint, render_template, redirect, url_for, request, flash, jsonify
+)
+from sqlalchemy import insert, select
+
+from backend.busca_pacientes import filtrar_pacientes
+from backend.db import db
+from backend.dinheiro import ZERO, formatar_dinheiro, ler_dinheiro
+from backend.models import Paciente, Transacao
+from backend.paginacao import (
+    codificar_cursor, decodificar_cursor, limite_da_requisicao, paginar
+)
+from backend.resumo import aplicar_deltas, deltas_de_insercao
+from backend.rotas.auth import login_required
+
+bp = Blueprint('pacientes', __name__)
+
+
+@bp.route('/pacientes/novo', methods=['GET', 'POST'])
+@login_required
+def novo_paciente():
+    if request.method == 'POST':
+        nome      = request.form.get('nome')
+        cpf       = request.form.get('cpf')
+        profissao = request.form.get('profissao')
+        cep       = request.form.get('cep')
+        endereco  = request.form.get('endereco')
+        idade     = request.form.get('idade')
+        valor_sessao = request.form.get('valor_sessao')
+
+        if not (nome and cpf and cep and valor_sessao):
+            flash('Nome, CPF, CEP e Valor da Sessão são obrigatórios.', 'warning')
+        else:
+            try:
+                valor_sessao_decimal = ler_dinheiro(valor_sessao)
+                if valor_sessao_decimal is None:  # só 'R$' ou espaços
+                    raise ValueError
+                
+                # cria paciente
+                p = Paciente(
+                    nome=nome, cpf=cpf, profissao=profissao or None,
+                    cep=cep, endereco=endereco or None,
+                    idade=int(idade) if idade and idade.strip() else None,
+                    valor_sessao=valor_sessao_decimal
+                )
+                db.session.add(p)
+                db.session.commit() # Commit paciente para obter ID se necessário, ou mover para depois da transação
+
+                # registra receita única inicial
+                t = Transacao(
+                    nome=f"{p.nome}",
+                    tipo='receita',
+                    observacao='Receita única ao cadastrar paciente',
+                    valor=valor_sessao_decimal,
+                    paciente_id=p.id
+                )
+                db.session.add(t)
+                db.session.commit()
+
+                flash('Paciente e receita inicial cadastrados com sucesso!', 'success')
+                return redirect(url_for('pacientes.listar_pacientes'))
+            except ValueError:
+                flash('Valor da sessão inválido. Use números e ponto ou vírgula como separador decimal.', 'danger')
+            except Exception as e:
+                flash(f'Ocorreu um erro ao criar o paciente: {e}', 'danger')
+                db.session.rollback()
+    return render_template('novo_paciente.html')
+
+@bp.route('/pacientes')
+@login_required
+def listar_pacientes():
+    termo = request.args.get('q', '').strip()
+    status = request.args.get('status', '')
+    limite = limite_da_requisicao(request.args)
+
+    query = filtrar_pacientes(Paciente.query, termo, status)
+    cursor = decodificar_cursor(request.args.get('cursor'), (str, int))
+    pacientes, tem_mais = paginar(query, [Paciente.nome, Paciente.id], cursor, limite, descendente=False)
+    proximo_cursor = codificar_cursor(pacientes[-1].nome, pacientes[-1].id) if tem_mais else None
+
+    contexto = dict(pacientes=pacientes, proximo_cursor=proximo_cursor,
+                    termo=termo, status=status, limite=limite)
+    if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+        # Só as linhas da tabela: a busca e o "Carregar mais" trocam o tbody
+        return render_template('partials/tabela_pacientes.html',
+                               continuacao=bool(cursor), **contexto)
+    return render_template('pacientes.html', hoje=date.today(), **contexto)
+
+# Mostrar formulário de edição
+@bp.route('/pacientes/<int:paciente_id>/edit', methods=['GET'])
+@login_required
+def editar_paciente(paciente_id):
+    p = Paciente.query.get_or_404(paciente_id)
+    return render_template('editar_paciente.html', paciente=p)
+
+# Processar edição
+@bp.route('/pacientes/<int:paciente_id>/edit', methods=['POST'])
+@login_required
+def atualizar_paciente(paciente_id):
+    p = Paciente.query.get_or_404(paciente_id)
+    # captura os dados do form
+    nome         = request.form.get('nome')
+    cpf          = request.form.get('cpf')
+    profissao    = request.form.get('profissao')
+    cep          = request.form.get('cep')
+    endereco     = request.form.get('endereco')
+    idade        = request.form.get('idade')
+    valor_sessao = request.form.get('valor_sessao')
+
+    # valida obrigatórios
+    if not (nome and cpf and cep):
+        flash('Nome, CPF e CEP são obrigatórios.', 'warning')
+        return redirect(url_for('pacientes.editar_paciente', paciente_id=p.id))
+
+    # atualiza campos
+    p.nome         = nome
+    p.cpf          = cpf
+    p.profissao    = profissao or None
+    p.cep          = cep
+    p.endereco     = endereco or None
+    p.idade        = int(idade) if idade and idade.strip() else None
+    
+    try:
+        p.valor_sessao = ler_dinheiro(valor_sessao)
+        db.session.commit()
+        flash('Paciente atualizado com sucesso!', 'success')
+        return redirect(url_for('pacientes.listar_pacientes'))
+    except ValueError:
+        flash('Valor da sessão inválido. Use números e ponto ou vírgula como separador decimal.', 'danger')
+        return redirect(url_for('pacientes.editar_paciente', paciente_id=p.id))
+    except Exception as e:
+        flash(f'Ocorreu um erro ao atualizar o paciente: {e}', 'danger')
+        db.session.rollback()
+        return redirect(url_for('pacientes.editar_paciente', paciente_id=p.id))
+
+@bp.route('/pacientes/<int:paciente_id>/sessao', methods=['POST'])
+@login_required
+def registrar_sessao(paciente_id):
+    p = Paciente.query.get_or_404(paciente_id)
+    if not p.active:
+        flash('Não é possível registrar sessão para paciente inativo.', 'warning')
+    else:
+        t = Transacao(
+            nome=f"{p.nome}",
+            tipo='receita',
+            observacao='Sessão avulsa registrada manualmente',
+            valor=p.valor_sessao or ZERO,
+            paciente_id=p.id
+        )
+        db.session.add(t)
+        db.session.commit()
+        flash('Sessão registrada como receita.', 'success')
+    return redirect(url_for('pacientes.listar_pacientes'))
+
+# Quantidade máxima de sessões por envio em /pacientes/sessoes
+LIMITE_SESSOES_LOTE = 500
+
+def _ler_sessoes_em_lote():
+    """
+    Lê as sessões a registrar como pares (paciente_id, data), tanto do
+    formulário de pacientes.html (paciente_id repetido e uma data para
+    todos) quanto de um payload JSON:
+
+        {"sessoes": [{"paciente_id": 1, "data": "2026-10-18"}, ...]}
+
+    Sem data, vale o dia de hoje. Levanta ValueError com a mensagem a exibir.
+    """
+    if request.is_json:
+        dados = request.get_json(silent=True)
+        sessoes = dados.get('sessoes') or [] if isinstance(dados, dict) else None
+        if not isinstance(sessoes, list) or not all(isinstance(s, dict) for s in sessoes):
+            raise ValueError('Formato inválido: envie {"sessoes": [{"paciente_id": ..., "data": ...}]}.')
+        brutas = [(s.get('paciente_id'), s.get('data')) for s in sessoes]
+    else:
+        data = request.form.get('data')
+        brutas = [(paciente_id, data) for paciente_id in request.form.getlist('paciente_id')]
+
+    if not brutas:
+        raise ValueError('Selecione ao menos um paciente.')
+    if len(brutas) > LIMITE_SESSOES_LOTE:
+        raise ValueError(f'Envie no máximo {LIMITE_SESSOES_LOTE} sessões por vez.')
+
+    hoje = date.today()
+    sessoes = []
+    for paciente_id, data in brutas:
+        try:
+            dia = datetime.strptime(data, '%Y-%m-%d').date() if data else hoje
+            sessoes.append((int(paciente_id), dia))
+        except (TypeError, ValueError):
+            raise ValueError(f'Sessão inválida (paciente "{paciente_id}", data "{data}").')
+    return sessoes
+
+@bp.route('/pacientes/sessoes', methods=['POST'])
+@login_required
+def registrar_sessoes_em_lote():
+    def _erro(mensagem):
+        if request.is_json:
+            return jsonify({'erro': mensagem}), 400
+        flash(mensagem, 'danger')
+        return redirect(url_for('pacientes.listar_pacientes'))
+
+    try:
+        sessoes = _ler_sessoes_em_lote()
+    except ValueError as e:
+        return _erro(str(e))
+
+    # Uma consulta valida todos os pacientes de uma vez
+    ids = {paciente_id for paciente_id, _ in sessoes}
+    pacientes = {
+        p.id: p for p in db.session.execute(
+            select(Paciente.id, Paciente.nome, Paciente.valor_sessao, Paciente.active)
+            .where(Paciente.id.in_(ids))
+        )
+    }
+    inexistentes = sorted(ids - pacientes.keys())
+    if inexistentes:
+        return _erro(f'Pacientes não encontrados: {", ".join(map(str, inexistentes))}.')
+    inativos = sorted(p.nome for p in pacientes.values() if not p.active)
+    if inativos:
+        return _erro(f'Não é possível registrar sessão para pacientes inativos: {", ".join(inativos)}.')
+
+    linhas = [
+        {
+            'nome': pacientes[paciente_id].nome,
+            'tipo': 'receita',
+            'observacao': 'Sessão registrada em lote',
+            'valor': pacientes[paciente_id].valor_sessao or ZERO,
+            'data_criacao': datetime.combine(dia, datetime.min.time()),
+            'paciente_id': paciente_id,
+        }
+        for paciente_id, dia in sessoes
+    ]
+    # Um único INSERT de várias linhas; o Core não dispara os eventos do
+    # ORM, então o resumo financeiro é atualizado explicitamente.
+    db.session.execute(insert(Transacao), linhas)
+    aplicar_deltas(db.session.connection(), deltas_de_insercao(Transacao, linhas))
+    db.session.commit()
+
+    total = sum((linha['valor'] for linha in linhas), ZERO)
+    if request.is_json:
+        return jsonify({'registradas': len(linhas), 'total': str(total)}), 201
+    flash(f'{len(linhas)} sessões registradas como receita (R$ {formatar_dinheiro(total)}).', 'success')
+    return redirect(url_for('pacientes.listar_pacientes'))
+
+@bp.route('/pacientes/<int:paciente_id>/receitas')
+@login_required
+def receitas_paciente(paciente_id):
+    p = Paciente.query.get_or_404(paciente_id)
+    limite = limite_da_requisicao(request.args)
+
+    # Total e histórico saem do índice (paciente_id, tipo, data_criacao, id, valor)
+    da_pessoa = (Transacao.paciente_id == p.id, Transacao.tipo == 'receita')
+    quantidade, total = db.session.execute(
+        select(db.func.count(), db.func.coalesce(db.func.sum(Transacao.valor), 0)).where(*da_pessoa)
+    ).one()
+
+    cursor = decodificar_cursor(request.args.get('cursor'), (datetime, int))
+    consulta = db.session.query(Transacao.id, Transacao.data_criacao, Transacao.valor,
+                                Transacao.observacao).filter(*da_pessoa)
+    receitas, tem_mais = paginar(consulta, [Transacao.data_criacao, Transacao.id], cursor, limite)
+    proximo_cursor = (codificar_cursor(receitas[-1].data_criacao, receitas[-1].id)
+                      if tem_mais else None)
+
+    return render_template('paciente_receitas.html', paciente=p, receitas=receitas,
+                           quantidade=quantidade, total=total,
+                           proximo_cursor=proximo_cursor, limite=limite)
+
+@bp.route('/pacientes/<int:paciente_id>/toggle', methods=['POST'])
+@login_required
+def toggle_paciente(paciente_id):
+    p = Paciente.query.get_or_404(paciente_id)
+    p.active = not p.active
+    db.session.commit()
+    status = 'ativado' if p.active else 'desativado'
+    flash(f'Paciente {status} com sucesso.', 'info')
+    return redirect(url_for('pacientes.listar_pacientes'))
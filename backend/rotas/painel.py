@@ -0,0 +1,63 @@
+# backend/rotas/painel.py
+#
+# Dashboard e relatórios mensais: só leem os agregados prontos
+# (resumo_financeiro e relatorio_meses).
+
+from datetime import datetime
+
+from flask import Blueprint, render_template, request
+
+from backend.db import sessao_leitura
+from backend.dinheiro import ZERO
+from backend.relatorios import mes_atual, montar_relatorio
+from backend.resumo import ler_resumo
+from backend.rotas.auth import login_required
+
+bp = Blueprint('painel', __name__)
+
+
+@bp.route('/dashboard')
+@login_required
+def dashboard():
+    # Lê os agregados prontos (mantidos por backend/resumo.py) em vez de varrer as tabelas
+    with sessao_leitura() as sessao:
+        resumo = ler_resumo(sessao=sessao)
+    total_pacientes, soma_sessoes = resumo.get('pacientes_ativos', (0, ZERO))
+    valor_medio_sessao = (soma_sessoes / total_pacientes) if total_pacientes else ZERO
+
+    total_notas = resumo.get('notas', (0, ZERO))[0]
+
+    receita_total = resumo.get('receita', (0, ZERO))[1]
+    despesa_total = resumo.get('despesa', (0, ZERO))[1]
+    lucro = receita_total - despesa_total
+
+    return render_template('dashboard.html',
+        total_pacientes=total_pacientes,
+        valor_medio_sessao=f"{valor_medio_sessao:.2f}",
+        total_notas=total_notas,
+        receita_total=f"{receita_total:.2f}",
+        despesa_total=f"{despesa_total:.2f}",
+        lucro=f"{lucro:.2f}"
+    )
+
+def _mes_da_requisicao(nome, padrao):
+    valor = request.args.get(nome) or ''
+    try:
+        datetime.strptime(valor, '%Y-%m')
+    except ValueError:
+        return padrao
+    return valor
+
+@bp.route('/relatorios')
+@login_required
+def relatorios():
+    fim = _mes_da_requisicao('fim', mes_atual())
+    ano, mes = int(fim[:4]), int(fim[5:7])
+    # Padrão: os 12 meses terminados em `fim`
+    inicio_padrao = f'{ano - 1 + mes // 12:04d}-{mes % 12 + 1:02d}'
+    inicio = _mes_da_requisicao('inicio', inicio_padrao)
+    if inicio > fim:
+        inicio, fim = fim, inicio
+
+    relatorio = montar_relatorio(inicio, fim)
+    return render_template('relatorios.html', inicio=inicio, fim=fim, **relatorio)
@@ -0,0 +1,345 @@
+# backend/rotas/simulacoes.py
+#
+# Simulações financeiras: cadastro, projeção e comparação de cenários.
+
+from itertools import zip_longest
+
+from flask import (
+    Blueprint, render_template, redirect, url_for, request, flash, jsonify
+)
+from sqlalchemy import delete, insert, update
+
+from backend.cache_projecao import cache_projecoes, chave_projecao
+from backend.db import db
+from backend.dinheiro import ZERO, formatar_dinheiro, ler_dinheiro
+from backend.models import Simulacao, SimulacaoItem, SimulacaoEvento
+from backend.projecao import projetar, comparar_cenarios, HORIZONTE_PADRAO, HORIZONTE_MAXIMO
+from backend.rotas.auth import login_required
+
+bp = Blueprint('simulacoes', __name__)
+
+
+# LISTA
+@bp.route('/simulacoes')
+@login_required
+def lista_simulacoes():
+    sims = Simulacao.query.order_by(Simulacao.created_at.desc()).all()
+    return render_template('simulacoes.html', simulacoes=sims)
+
+# COMPARAR TODAS
+@bp.route('/simulacoes/comparar')
+@login_required
+def comparar_simulacoes():
+    meses = request.args.get('meses', 12, type=int)
+    meses = max(1, min(meses or 12, HORIZONTE_MAXIMO))
+
+    sims = db.session.query(Simulacao.id, Simulacao.nome, Simulacao.despesa_mensal_fixa).all()
+    posicao = {s.id: i for i, s in enumerate(sims)}
+
+    # Uma consulta para todos os itens e outra para todos os eventos
+    itens = db.session.query(
+        SimulacaoItem.simulacao_id, SimulacaoItem.pacientes, SimulacaoItem.valor_sessao
+    ).all()
+    eventos = db.session.query(
+        SimulacaoEvento.simulacao_id, SimulacaoEvento.mes_offset, SimulacaoEvento.delta
+    ).all()
+
+    def _colunas(linhas, largura):
+        if not linhas:
+            return ([],) * largura
+        return tuple(zip(*linhas))
+
+    itens_idx, itens_pac, itens_val = _colunas(
+        [(posicao[sid], p or 0, v or 0.0) for sid, p, v in itens if sid in posicao], 3)
+    ev_idx, ev_off, ev_delta = _colunas(
+        [(posicao[sid], m, d or 0) for sid, m, d in eventos if sid in posicao], 3)
+
+    comparacao = comparar_cenarios(
+        len(sims),
+        (itens_idx, itens_pac, itens_val),
+        (ev_idx, ev_off, ev_delta),
+        [s.despesa_mensal_fixa or 0.0 for s in sims],
+        meses
+    )
+
+    ranking = sorted(
+        (
+            {
+                'id': s.id,
+                'nome': s.nome,
+                'resultado_total': float(comparacao['resultado_total'][i]),
+                'caixa_final': float(comparacao['caixa_final'][i]),
+                'mes_equilibrio': int(comparacao['mes_equilibrio'][i]),
+                'caixa_acumulado': comparacao['caixa_acumulado'][i].tolist(),
+            }
+            for i, s in enumerate(sims)
+        ),
+        key=lambda linha: linha['resultado_total'],
+        reverse=True
+    )
+
+    return render_template('simulacoes_comparar.html',
+                           ranking=ranking,
+                           meses=meses,
+                           labels=[f'Mês {m + 1}' for m in range(meses)])
+
+def _numero(valor, tipo):
+    """Converte números do formulário ('170,50') ou do JSON (170.5) para `tipo`."""
+    if isinstance(valor, str):
+        valor = valor.strip().replace(',', '.')
+    return tipo(valor)
+
+def _ler_dados_simulacao():
+    """
+    Lê nome, despesa mensal, itens e eventos da simulação, aceitando tanto
+    o formulário (campos repetidos pacientes/valor e evento_mes/evento_delta)
+    quanto um payload JSON:
+
+        {"nome": "...", "despesa_mensal_fixa": 2500.5,
+         "itens": [{"id": 1, "pacientes": 10, "valor_sessao": 170.0}, ...],
+         "eventos": [{"mes_offset": 0, "delta": 2}, ...]}
+
+    Levanta ValueError com a mensagem a exibir se algum valor for inválido.
+    """
+    if request.is_json:
+        dados = request.get_json(silent=True)
+        if not isinstance(dados, dict):
+            raise ValueError('Formato inválido: envie um objeto JSON com nome, itens e eventos.')
+        nome = dados.get('nome')
+        despesa = dados.get('despesa_mensal_fixa')
+        itens_json, eventos_json = dados.get('itens') or [], dados.get('eventos') or []
+        for campo, lista in (('itens', itens_json), ('eventos', eventos_json)):
+            if not isinstance(lista, list) or not all(isinstance(x, dict) for x in lista):
+                raise ValueError(f'Formato inválido: "{campo}" deve ser uma lista de objetos.')
+        itens_brutos = [(i.get('id'), i.get('pacientes'), i.get('valor_sessao')) for i in itens_json]
+        eventos_brutos = [(e.get('mes_offset'), e.get('delta')) for e in eventos_json]
+        primeiro_mes = 0
+    else:
+        nome = request.form.get('nome_simulacao')
+        despesa = request.form.get('despesa_mensal_fixa')
+        itens_brutos = list(zip_longest(request.form.getlist('item_id'),
+                                        request.form.getlist('pacientes'),
+                                        request.form.getlist('valor')))
+        eventos_brutos = list(zip_longest(request.form.getlist('evento_mes'),
+                                          request.form.getlist('evento_delta')))
+        primeiro_mes = 1  # no formulário o mês é exibido a partir de 1
+
+    if not nome or not str(nome).strip():
+        raise ValueError('O nome da simulação não pode ficar vazio.')
+
+    try:
+        despesa = ler_dinheiro(despesa) or ZERO
+    except ValueError:
+        raise ValueError(f'Valor inválido para Despesa Mensal ("{despesa}").')
+
+    itens = []
+    for n, (item_id, pacientes, valor) in enumerate(itens_brutos, start=1):
+        if pacientes in (None, '') and valor in (None, ''):
+            continue  # linha em branco
+        try:
+            valor_sessao = ler_dinheiro(valor)
+            if valor_sessao is None:
+                raise ValueError
+            itens.append((
+                _numero(item_id, int) if item_id not in (None, '') else None,
+                _numero(pacientes, int),
+                valor_sessao,
+            ))
+        except (TypeError, ValueError):
+            raise ValueError(f'Valor inválido para item {n} (Nº Pacientes: "{pacientes}", Valor Sessão: "{valor}").')
+
+    eventos = {}
+    for mes, delta in eventos_brutos:
+        if delta in (None, ''):
+            continue
+        try:
+            mes_offset, delta = _numero(mes, int) - primeiro_mes, _numero(delta, int)
+        except (TypeError, ValueError):
+            raise ValueError(f'Evento inválido (Mês: "{mes}", Delta: "{delta}"). Use números inteiros.')
+        if mes_offset < 0:
+            raise ValueError(f'Mês inválido para evento: "{mes}".')
+        if delta:
+            eventos[mes_offset] = eventos.get(mes_offset, 0) + delta
+
+    return str(nome).strip(), despesa, itens, eventos
+
+def _salvar_itens_eventos(sim_id, itens, eventos):
+    """
+    Sincroniza itens e eventos da simulação com o estado desejado, aplicando
+    só as diferenças: no máximo um DELETE, um UPDATE (executemany por chave
+    primária) e um INSERT por tabela, independentemente da quantidade.
+    Itens são casados pelo id; eventos, pelo mes_offset.
+    """
+    alteracoes = {'inseridos': 0, 'atualizados': 0, 'removidos': 0}
+
+    existentes = {
+        item_id: (pacientes, valor)
+        for item_id, pacientes, valor in db.session.query(
+            SimulacaoItem.id, SimulacaoItem.pacientes, SimulacaoItem.valor_sessao
+        ).filter(SimulacaoItem.simulacao_id == sim_id)
+    }
+    mantidos = set()
+    atualizar, inserir = [], []
+    for item_id, pacientes, valor in itens:
+        if item_id in existentes and item_id not in mantidos:
+            mantidos.add(item_id)
+            if existentes[item_id] != (pacientes, valor):
+                atualizar.append({'id': item_id, 'pacientes': pacientes, 'valor_sessao': valor})
+        else:
+            inserir.append({'simulacao_id': sim_id, 'pacientes': pacientes, 'valor_sessao': valor})
+    remover = set(existentes) - mantidos
+    if remover:
+        db.session.execute(delete(SimulacaoItem).where(SimulacaoItem.id.in_(remover)))
+    if atualizar:
+        db.session.execute(update(SimulacaoItem), atualizar)
+    if inserir:
+        db.session.execute(insert(SimulacaoItem), inserir)
+    alteracoes['inseridos'] += len(inserir)
+    alteracoes['atualizados'] += len(atualizar)
+    alteracoes['removidos'] += len(remover)
+
+    eventos_existentes = {}
+    remover = set()
+    for evento_id, mes_offset, delta in db.session.query(
+        SimulacaoEvento.id, SimulacaoEvento.mes_offset, SimulacaoEvento.delta
+    ).filter(SimulacaoEvento.simulacao_id == sim_id):
+        if mes_offset in eventos_existentes or mes_offset not in eventos:
+            remover.add(evento_id)  # duplicado ou removido do formulário
+        else:
+            eventos_existentes[mes_offset] = (evento_id, delta)
+    atualizar = [
+        {'id': eventos_existentes[m][0], 'delta': d}
+        for m, d in eventos.items() if m in eventos_existentes and eventos_existentes[m][1] != d
+    ]
+    inserir = [
+        {'simulacao_id': sim_id, 'mes_offset': m, 'delta': d}
+        for m, d in eventos.items() if m not in eventos_existentes
+    ]
+    if remover:
+        db.session.execute(delete(SimulacaoEvento).where(SimulacaoEvento.id.in_(remover)))
+    if atualizar:
+        db.session.execute(update(SimulacaoEvento), atualizar)
+    if inserir:
+        db.session.execute(insert(SimulacaoEvento), inserir)
+    alteracoes['inseridos'] += len(inserir)
+    alteracoes['atualizados'] += len(atualizar)
+    alteracoes['removidos'] += len(remover)
+    return alteracoes
+
+def _contexto_form_simulacao(sim):
+    """Linhas de itens/eventos para o formulário: o que foi enviado (em caso de erro) ou o que está no banco."""
+    if request.method == 'POST' and not request.is_json:
+        itens_form = [
+            {'id': item_id, 'pacientes': pacientes, 'valor': valor}
+            for item_id, pacientes, valor in zip_longest(request.form.getlist('item_id'),
+                                                         request.form.getlist('pacientes'),
+                                                         request.form.getlist('valor'), fillvalue='')
+        ]
+        eventos_form = [
+            {'mes': mes, 'delta': delta}
+            for mes, delta in zip_longest(request.form.getlist('evento_mes'),
+                                          request.form.getlist('evento_delta'), fillvalue='')
+        ]
+    elif sim is not None:
+        itens_form = [
+            {'id': item.id, 'pacientes': item.pacientes,
+             'valor': formatar_dinheiro(item.valor_sessao)}
+            for item in sorted(sim.itens, key=lambda i: i.id)
+        ]
+        eventos_form = [
+            {'mes': evento.mes_offset + 1, 'delta': evento.delta}
+            for evento in sorted(sim.eventos, key=lambda e: e.mes_offset)
+        ]
+    else:
+        itens_form, eventos_form = [], []
+    return {'simulacao': sim, 'itens_form': itens_form, 'eventos_form': eventos_form}
+
+def _erro_simulacao(sim, mensagem):
+    if request.is_json:
+        return jsonify({'erro': mensagem}), 400
+    flash(mensagem, 'danger')
+    return render_template('simulacao_form.html', **_contexto_form_simulacao(sim))
+
+# NOVA
+@bp.route('/simulacoes/novo', methods=['GET','POST'])
+@login_required
+def nova_simulacao():
+    if request.method=='POST':
+        try:
+            nome, despesa, itens, eventos = _ler_dados_simulacao()
+        except ValueError as e:
+            return _erro_simulacao(None, str(e))
+
+        sim = Simulacao(nome=nome, despesa_mensal_fixa=despesa)
+        db.session.add(sim)
+        db.session.flush()
+        _salvar_itens_eventos(sim.id, itens, eventos)
+        db.session.commit()
+        if request.is_json:
+            return jsonify({'id': sim.id, 'versao': sim.versao}), 201
+        flash('Simulação criada.', 'success')
+        return redirect(url_for('simulacoes.editar_simulacao', id=sim.id))
+    return render_template('simulacao_form.html', **_contexto_form_simulacao(None))
+
+# EDITAR
+@bp.route('/simulacoes/<int:id>/edit', methods=['GET','POST'])
+@login_required
+def editar_simulacao(id):
+    sim = Simulacao.query.get_or_404(id)
+
+    if request.method=='POST':
+        try:
+            nome, despesa, itens, eventos = _ler_dados_simulacao()
+        except ValueError as e:
+            return _erro_simulacao(sim, str(e))
+
+        sim.nome = nome
+        sim.despesa_mensal_fixa = despesa
+        alteracoes = _salvar_itens_eventos(sim.id, itens, eventos)
+        sim.marcar_alterada()
+        db.session.commit()
+        cache_projecoes.invalidar(sim.id)
+        if request.is_json:
+            return jsonify({'id': sim.id, 'versao': sim.versao, **alteracoes})
+        flash('Simulação salva.', 'success')
+        return redirect(url_for('simulacoes.detalhe_simulacao', id=id))
+
+    return render_template('simulacao_form.html', **_contexto_form_simulacao(sim))
+
+# DETALHE + GRÁFICO
+@bp.route('/simulacoes/<int:id>')
+@login_required
+def detalhe_simulacao(id):
+    sim = Simulacao.query.get_or_404(id)
+
+    meses = request.args.get('meses', HORIZONTE_PADRAO, type=int)
+    meses = max(1, min(meses or HORIZONTE_PADRAO, HORIZONTE_MAXIMO))
+
+    # Em cache, a página não consulta itens nem eventos
+    projecao = cache_projecoes.obter_ou_calcular(
+        chave_projecao(sim, meses),
+        lambda: projetar(
+            [(item.pacientes, item.valor_sessao) for item in sim.itens],
+            [(evento.mes_offset, evento.delta) for evento in sim.eventos],
+            sim.despesa_mensal_fixa,
+            meses
+        )
+    )
+
+    return render_template('simulacao_detail.html', sim=sim, labels=projecao.labels,
+                           data_receita_projetada=projecao.receita.tolist(),
+                           data_despesas_totais=projecao.despesa.tolist(),
+                           data_resultado_liquido=projecao.resultado.tolist(),
+                           dados_tabela_projecao=projecao.linhas_tabela(),
+                           meses=meses)
+
+# EXCLUIR
+@bp.route('/simulacoes/<int:id>/delete', methods=['POST'])
+@login_required
+def delete_simulacao(id):
+    sim = Simulacao.query.get_or_404(id)
+    db.session.delete(sim)
+    db.session.commit()
+    cache_projecoes.invalidar(id)
+    flash('Simulação removida.', 'info')
+    return redirect(url_for('simulacoes.lista_simulacoes'))
@@ -0,0 +1,323 @@
+# backend/rotas/transacoes.py
+#
+# Receitas e despesas: listagem paginada, exportação, edição e
+# transações recorrentes.
+
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from flask import (
+    Blueprint, render_template, redirect, url_for, request, flash, abort,
+    Response, stream_with_context
+)
+from sqlalchemy import select
+
+from backend.db import db, sessao_leitura
+from backend.dinheiro import ler_dinheiro
+from backend.exportacao import gerar_csv, gerar_xlsx
+from backend.models import Transacao, TransacaoRecorrente
+from backend.paginacao import (
+    codificar_cursor, decodificar_cursor, limite_da_requisicao, paginar
+)
+from backend.recorrencias import FREQUENCIAS, materializar
+from backend.rotas.auth import login_required
+
+bp = Blueprint('transacoes', __name__)
+
+
+# Colunas aceitas em ?ordenar_por= e o tipo Python de cada chave (para o cursor)
+COLUNAS_ORDENACAO_TRANSACOES = {
+    'nome': str,
+    'observacao': str,
+    'data_criacao': datetime,
+    'valor': Decimal,
+}
+
+def intervalo_periodo(periodo, agora=None):
+    """
+    Converte o filtro de período em um intervalo semiaberto [inicio, fim)
+    sobre data_criacao, que pode ser atendido pelo índice (tipo, data_criacao).
+    """
+    agora = agora or datetime.today()
+    hoje = agora.replace(hour=0, minute=0, second=0, microsecond=0)
+    if periodo == 'hoje':
+        return hoje, hoje + timedelta(days=1)
+    if periodo == 'semana':
+        return hoje - timedelta(days=hoje.weekday()), None
+    if periodo == 'mes':
+        inicio = hoje.replace(day=1)
+        fim = (inicio + timedelta(days=32)).replace(day=1)
+        return inicio, fim
+    if periodo in ('30', '60'):
+        return agora - timedelta(days=int(periodo)), None
+    return None, None
+
+def filtrar_transacoes(query, periodo):
+    inicio, fim = intervalo_periodo(periodo)
+    if inicio is not None:
+        query = query.filter(Transacao.data_criacao >= inicio)
+    if fim is not None:
+        query = query.filter(Transacao.data_criacao < fim)
+    return query
+
+def chave_ordenacao_transacao(ordenar_por):
+    # observacao é opcional: COALESCE mantém a chave comparável no keyset
+    # e corresponde ao índice de expressão ix_transacoes_tipo_observacao.
+    if ordenar_por == 'observacao':
+        return db.func.coalesce(Transacao.observacao, '')
+    return getattr(Transacao, ordenar_por)
+
+def pagina_transacoes(tipo, periodo, ordenar_por, ordem, cursor, limite):
+    """Devolve (linhas, próximo cursor ou None) para uma das tabelas (receita/despesa)."""
+    query = filtrar_transacoes(Transacao.query.filter_by(tipo=tipo), periodo)
+    chave = chave_ordenacao_transacao(ordenar_por)
+    valores_cursor = decodificar_cursor(cursor, (COLUNAS_ORDENACAO_TRANSACOES[ordenar_por], int))
+    linhas, tem_mais = paginar(query, [chave, Transacao.id], valores_cursor, limite,
+                               descendente=(ordem != 'asc'))
+    proximo = None
+    if tem_mais:
+        ultima = linhas[-1]
+        valor = getattr(ultima, ordenar_por)
+        if ordenar_por == 'observacao':
+            valor = valor or ''
+        proximo = codificar_cursor(valor, ultima.id)
+    return linhas, proximo
+
+@bp.route('/transacoes')
+@login_required
+def transacoes():
+    periodo = request.args.get('periodo', '')
+    ordenar_por = request.args.get('ordenar_por', 'data_criacao')
+    ordem = request.args.get('ordem', 'desc')
+    limite = limite_da_requisicao(request.args)
+
+    if ordenar_por not in COLUNAS_ORDENACAO_TRANSACOES:
+        ordenar_por = 'data_criacao'
+
+    if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+        # Próxima página de uma das tabelas ("Carregar mais")
+        tipo = request.args.get('tipo', 'receita')
+        if tipo not in ('receita', 'despesa'):
+            abort(400)
+        linhas, proximo = pagina_transacoes(tipo, periodo, ordenar_por, ordem,
+                                            request.args.get('cursor'), limite)
+        return render_template('partials/tabela_transacoes.html',
+                               tipo=tipo,
+                               linhas=linhas,
+                               proximo_cursor=proximo,
+                               continuacao=True,
+                               filtro_periodo=periodo,
+                               ordenar_por=ordenar_por,
+                               ordem=ordem,
+                               limite=limite)
+
+    receitas, proximo_receitas = pagina_transacoes('receita', periodo, ordenar_por, ordem, None, limite)
+    despesas, proximo_despesas = pagina_transacoes('despesa', periodo, ordenar_por, ordem, None, limite)
+    return render_template(
+        'transacoes.html',
+        receitas=receitas,
+        despesas=despesas,
+        proximo_receitas=proximo_receitas,
+        proximo_despesas=proximo_despesas,
+        filtro_periodo=periodo,
+        ordenar_por=ordenar_por,
+        ordem=ordem,
+        limite=limite
+    )
+
+@bp.route('/transacoes/exportar')
+@login_required
+def exportar_transacoes():
+    periodo = request.args.get('periodo', '')
+    ordenar_por = request.args.get('ordenar_por', 'data_criacao')
+    ordem = request.args.get('ordem', 'desc')
+    tipo = request.args.get('tipo')
+    formato = request.args.get('formato', 'csv')
+
+    if ordenar_por not in COLUNAS_ORDENACAO_TRANSACOES:
+        ordenar_por = 'data_criacao'
+    if formato not in ('csv', 'xlsx'):
+        abort(400)
+
+    consulta = filtrar_transacoes(
+        select(Transacao.id, Transacao.data_criacao, Transacao.tipo,
+               Transacao.nome, Transacao.observacao, Transacao.valor),
+        periodo
+    )
+    if tipo in ('receita', 'despesa'):
+        consulta = consulta.where(Transacao.tipo == tipo)
+    chave = chave_ordenacao_transacao(ordenar_por)
+    if ordem == 'asc':
+        consulta = consulta.order_by(chave.asc(), Transacao.id.asc())
+    else:
+        consulta = consulta.order_by(chave.desc(), Transacao.id.desc())
+
+    def linhas():
+        # Cursor do lado do servidor (na réplica, se houver): as linhas
+        # chegam em lotes de 1000
+        with sessao_leitura() as sessao:
+            resultado = sessao.execute(consulta.execution_options(stream_results=True, yield_per=1000))
+            try:
+                yield from resultado
+            finally:
+                resultado.close()
+
+    gerador = gerar_csv(linhas()) if formato == 'csv' else gerar_xlsx(linhas())
+    nome_arquivo = f"transacoes_{datetime.now():%Y%m%d_%H%M}.{formato}"
+    mimetype = ('text/csv; charset=utf-8' if formato == 'csv' else
+                'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+    return Response(stream_with_context(gerador), mimetype=mimetype,
+                    headers={'Content-Disposition': f'attachment; filename="{nome_arquivo}"'})
+
+@bp.route('/transacoes/novo', methods=['GET', 'POST'])
+@login_required
+def novo_transacao():
+    if request.method == 'POST':
+        nome = request.form.get('nome')
+        observacao = request.form.get('observacao')
+        valor = request.form.get('valor')
+        tipo = request.form.get('tipo')  
+
+        if not nome or not valor or not tipo:
+            flash('Nome, valor e tipo são obrigatórios.', 'danger')
+            return redirect(url_for('transacoes.novo_transacao'))
+
+        try:
+            valor = ler_dinheiro(valor)
+            if valor is None:  # só 'R$' ou espaços
+                raise ValueError
+        except ValueError:
+            flash('Valor inválido.', 'danger')
+            return redirect(url_for('transacoes.novo_transacao'))
+
+        nova = Transacao(nome=nome, observacao=observacao, valor=valor, tipo=tipo, data_criacao=datetime.now())
+        db.session.add(nova) # Adiciona a nova transação à sessão
+        db.session.commit()  # Persiste a transação no banco de dados
+
+        flash('Transação criada com sucesso!', 'success')
+        return redirect(url_for('transacoes.transacoes'))
+
+    return render_template('novo_transacao.html')
+
+@bp.route('/transacoes/editar/<int:id>', methods=['GET', 'POST'])
+@login_required
+def editar_transacao(id):
+    t = Transacao.query.get_or_404(id)
+
+    if request.method == 'POST':
+        nome       = request.form.get('nome')
+        tipo       = request.form.get('tipo')
+        observacao = request.form.get('observacao')
+        valor      = request.form.get('valor')
+        data_str   = request.form.get('data') 
+
+        if not (nome and tipo and valor and data_str):
+            flash('Nome, tipo, valor e data são obrigatórios.', 'warning')
+        else:
+            try:
+                valor_decimal = ler_dinheiro(valor)
+                if valor_decimal is None:  # só 'R$' ou espaços
+                    raise ValueError(f'Valor inválido: {valor!r}')
+                data_nova = datetime.strptime(data_str, '%Y-%m-%d')
+               
+                hora =  0
+                minuto =  0
+
+                t.nome = nome
+                t.tipo = tipo
+                t.observacao = observacao or None
+                t.valor = valor_decimal
+                t.data_criacao = datetime(
+                    data_nova.year,
+                    data_nova.month,
+                    data_nova.day,
+                    hora,
+                    minuto
+                )
+                db.session.commit()
+                flash('Transação atualizada com sucesso!', 'success')
+                return redirect(url_for('transacoes.transacoes'))
+            except ValueError as ve:
+                flash(f'Valor ou Data inválida: {ve}. Use ponto ou vírgula para decimais e formato AAAA-MM-DD para data.', 'warning')
+                return render_template('editar_transacao.html', transacao=t)
+            except Exception as e:
+                flash(f'Ocorreu um erro ao atualizar a transação: {e}', 'danger')
+                db.session.rollback()
+                return render_template('editar_transacao.html', transacao=t)
+
+    return render_template('editar_transacao.html', transacao=t)
+
+@bp.route('/transacoes/excluir/<int:id>', methods=['POST'])
+@login_required
+def excluir_transacao(id):
+    t = Transacao.query.get_or_404(id)
+    db.session.delete(t)
+    db.session.commit()
+    flash('Transação excluída com sucesso!', 'success')
+    return redirect(url_for('transacoes.transacoes'))
+
+def _ler_regra_recorrente():
+    """Valida o formulário de recorrencias.html; levanta ValueError com a mensagem a exibir."""
+    nome = (request.form.get('nome') or '').strip()
+    tipo = request.form.get('tipo')
+    frequencia = request.form.get('frequencia')
+    if not nome or tipo not in ('receita', 'despesa') or frequencia not in FREQUENCIAS:
+        raise ValueError('Nome, tipo e frequência são obrigatórios.')
+
+    valor = ler_dinheiro(request.form.get('valor'))
+    if valor is None:
+        raise ValueError('Informe o valor.')
+
+    try:
+        dia = int(request.form.get('dia'))
+    except (TypeError, ValueError):
+        raise ValueError('Dia inválido.')
+    if frequencia == 'mensal' and not 1 <= dia <= 31:
+        raise ValueError('Nas regras mensais o dia deve estar entre 1 e 31.')
+    if frequencia == 'semanal' and not 0 <= dia <= 6:
+        raise ValueError('Nas regras semanais escolha um dia da semana.')
+
+    try:
+        inicio = request.form.get('inicio')
+        inicio = datetime.strptime(inicio, '%Y-%m-%d').date() if inicio else date.today()
+        fim = request.form.get('fim')
+        fim = datetime.strptime(fim, '%Y-%m-%d').date() if fim else None
+    except ValueError:
+        raise ValueError('Data inválida.')
+    if fim and fim < inicio:
+        raise ValueError('A data final não pode ser anterior à inicial.')
+
+    return TransacaoRecorrente(
+        nome=nome, tipo=tipo, observacao=request.form.get('observacao') or None,
+        valor=valor, frequencia=frequencia, dia=dia, inicio=inicio, fim=fim
+    )
+
+@bp.route('/recorrencias', methods=['GET', 'POST'])
+@login_required
+def recorrencias():
+    if request.method == 'POST':
+        try:
+            regra = _ler_regra_recorrente()
+        except ValueError as e:
+            flash(str(e), 'danger')
+        else:
+            db.session.add(regra)
+            db.session.commit()
+            # Já gera os lançamentos devidos (ex.: início no passado)
+            criadas = materializar(regras=[regra])
+            flash(f'Regra criada; {criadas} lançamentos gerados.', 'success')
+            return redirect(url_for('transacoes.recorrencias'))
+
+    regras = TransacaoRecorrente.query.order_by(
+        TransacaoRecorrente.ativa.desc(), TransacaoRecorrente.nome
+    ).all()
+    return render_template('recorrencias.html', regras=regras, hoje=date.today())
+
+@bp.route('/recorrencias/<int:id>/toggle', methods=['POST'])
+@login_required
+def toggle_recorrencia(id):
+    regra = TransacaoRecorrente.query.get_or_404(id)
+    regra.ativa = not regra.ativa
+    db.session.commit()
+    flash(f'Regra {"ativada" if regra.ativa else "pausada"}.', 'info')
+    return redirect(url_for('transacoes.recorrencias'))
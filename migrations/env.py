@@ -7,12 +7,8 @@ from sqlalchemy import engine_from_config, pool
 # Adiciona caminho raiz para importar backend
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from backend.app import app 
 from backend.db import db
 # Ensure models are imported so metadata is populated.
-# backend.app should already do this, but this is an explicit ensure.
-# If backend.app definitely imports all models, this next line might be redundant
-# but is common practice in Alembic env.py files.
 import backend.models # noqa
 
 config = context.config
@@ -0,0 +1,77 @@
+"""Busca de pacientes: cpf_normalizado e indices
+
+Revision ID: 3d5f8b9e2a71
+Revises: 9a6c3b57e0f4
+Create Date: 2026-10-18 13:41:09.112305
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3d5f8b9e2a71'
+down_revision = '9a6c3b57e0f4'
+branch_labels = None
+depends_on = None
+
+TAMANHO_LOTE = 5000
+
+
+def _normalizar_cpf(cpf):
+    # Cópia de backend.models.normalizar_cpf: a migração não importa o app,
+    # que pode mudar depois dela
+    return ''.join(c for c in cpf if c.isdigit()) if cpf else None
+
+
+def upgrade():
+    with op.batch_alter_table('pacientes', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('cpf_normalizado', sa.String(length=14), nullable=True))
+
+    # Preenche cpf_normalizado em lotes, em ordem de id, para não travar a
+    # tabela inteira. Em Python, com a mesma regra do app: em SQL só dá para
+    # remover uma lista fixa de separadores.
+    conn = op.get_bind()
+    ultimo_id = 0
+    while True:
+        linhas = conn.execute(sa.text(
+            'SELECT id, cpf FROM pacientes WHERE id > :ultimo ORDER BY id LIMIT :lote'
+        ), {'ultimo': ultimo_id, 'lote': TAMANHO_LOTE}).all()
+        if not linhas:
+            break
+        conn.execute(
+            sa.text('UPDATE pacientes SET cpf_normalizado = :normalizado WHERE id = :id'),
+            [{'id': id_, 'normalizado': _normalizar_cpf(cpf)} for id_, cpf in linhas],
+        )
+        ultimo_id = linhas[-1][0]
+
+    op.create_index('ix_pacientes_active_nome_id', 'pacientes', ['active', 'nome', 'id'], unique=False)
+    op.create_index('ix_pacientes_nome_id', 'pacientes', ['nome', 'id'], unique=False)
+    op.create_index('ix_pacientes_cpf_normalizado', 'pacientes', ['cpf_normalizado'], unique=False,
+                    postgresql_ops={'cpf_normalizado': 'varchar_pattern_ops'})
+
+    if conn.dialect.name == 'postgresql':
+        # Busca por trecho do nome, sem diferenciar acentos/maiúsculas.
+        # unaccent() não é IMMUTABLE, por isso o wrapper f_unaccent.
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        op.execute('CREATE EXTENSION IF NOT EXISTS unaccent')
+        op.execute(
+            "CREATE OR REPLACE FUNCTION f_unaccent(text) RETURNS text AS "
+            "$$ SELECT public.unaccent('public.unaccent', $1) $$ "
+            "LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT"
+        )
+        op.execute(
+            'CREATE INDEX ix_pacientes_nome_trgm ON pacientes '
+            'USING gin (f_unaccent(lower(nome)) gin_trgm_ops)'
+        )
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute('DROP INDEX IF EXISTS ix_pacientes_nome_trgm')
+        op.execute('DROP FUNCTION IF EXISTS f_unaccent(text)')
+    op.drop_index('ix_pacientes_cpf_normalizado', table_name='pacientes')
+    op.drop_index('ix_pacientes_nome_id', table_name='pacientes')
+    op.drop_index('ix_pacientes_active_nome_id', table_name='pacientes')
+    with op.batch_alter_table('pacientes', schema=None) as batch_op:
+        batch_op.drop_column('cpf_normalizado')
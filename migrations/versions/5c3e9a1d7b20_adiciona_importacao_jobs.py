@@ -0,0 +1,34 @@
+"""Adiciona tabela importacao_jobs
+
+Revision ID: 5c3e9a1d7b20
+Revises: 878bac043bdc
+Create Date: 2026-10-18 09:12:41.503118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5c3e9a1d7b20'
+down_revision = '878bac043bdc'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('importacao_jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('arquivo', sa.String(length=255), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('total', sa.Integer(), nullable=True),
+    sa.Column('processadas', sa.Integer(), nullable=False),
+    sa.Column('mensagem', sa.Text(), nullable=True),
+    sa.Column('criado_em', sa.DateTime(), nullable=True),
+    sa.Column('finalizado_em', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade():
+    op.drop_table('importacao_jobs')
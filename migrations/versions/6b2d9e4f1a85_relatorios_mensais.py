@@ -0,0 +1,43 @@
+"""Adiciona tabelas de relatórios mensais
+
+Revision ID: 6b2d9e4f1a85
+Revises: c81e4f2a9d36
+Create Date: 2026-10-18 15:12:40.318227
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6b2d9e4f1a85'
+down_revision = 'c81e4f2a9d36'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('relatorio_meses',
+    sa.Column('mes', sa.String(length=7), nullable=False),
+    sa.Column('receita', sa.Float(), nullable=False),
+    sa.Column('despesa', sa.Float(), nullable=False),
+    sa.Column('notas_quantidade', sa.Integer(), nullable=False),
+    sa.Column('notas_soma', sa.Float(), nullable=False),
+    sa.Column('fechado_em', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('mes')
+    )
+    op.create_table('relatorio_mensal_itens',
+    sa.Column('mes', sa.String(length=7), nullable=False),
+    sa.Column('dimensao', sa.String(length=10), nullable=False),
+    sa.Column('chave', sa.String(length=120), nullable=False),
+    sa.Column('rotulo', sa.String(length=120), nullable=False),
+    sa.Column('quantidade', sa.Integer(), nullable=False),
+    sa.Column('receita', sa.Float(), nullable=False),
+    sa.Column('despesa', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('mes', 'dimensao', 'chave')
+    )
+
+
+def downgrade():
+    op.drop_table('relatorio_mensal_itens')
+    op.drop_table('relatorio_meses')
@@ -0,0 +1,28 @@
+"""Adiciona periodo em notas
+
+Revision ID: 7e9a2c4d6f18
+Revises: d58b3e7a0c42
+Create Date: 2026-10-18 17:40:37.226105
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7e9a2c4d6f18'
+down_revision = 'd58b3e7a0c42'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('notas', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('periodo', sa.String(length=7), nullable=True))
+        batch_op.create_unique_constraint('uq_notas_paciente_periodo', ['paciente_id', 'periodo'])
+
+
+def downgrade():
+    with op.batch_alter_table('notas', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_notas_paciente_periodo', type_='unique')
+        batch_op.drop_column('periodo')
@@ -0,0 +1,26 @@
+"""Indices para listagem de notas
+
+Revision ID: 9a6c3b57e0f4
+Revises: e4a8f0c2d615
+Create Date: 2026-10-18 12:05:33.640912
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9a6c3b57e0f4'
+down_revision = 'e4a8f0c2d615'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_notas_data_id', 'notas', ['data', 'id'], unique=False)
+    op.create_index('ix_notas_paciente_data_id', 'notas', ['paciente_id', 'data', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_notas_paciente_data_id', table_name='notas')
+    op.drop_index('ix_notas_data_id', table_name='notas')
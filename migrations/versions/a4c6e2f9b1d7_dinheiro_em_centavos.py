@@ -0,0 +1,89 @@
+"""Valores monetários em centavos (BIGINT)
+
+Revision ID: a4c6e2f9b1d7
+Revises: f3a71c8d2b94
+Create Date: 2026-10-18 16:25:51.804417
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a4c6e2f9b1d7'
+down_revision = 'f3a71c8d2b94'
+branch_labels = None
+depends_on = None
+
+TAMANHO_LOTE = 5000
+
+# (tabela, coluna, nullable, tem coluna id)
+COLUNAS = [
+    ('pacientes', 'valor_sessao', True, True),
+    ('notas', 'valor', False, True),
+    ('transacoes', 'valor', False, True),
+    ('simulacoes', 'despesa_mensal_fixa', True, True),
+    ('simulacao_itens', 'valor_sessao', False, True),
+    ('resumo_financeiro', 'soma', False, False),
+    ('relatorio_meses', 'receita', False, False),
+    ('relatorio_meses', 'despesa', False, False),
+    ('relatorio_meses', 'notas_soma', False, False),
+    ('relatorio_mensal_itens', 'receita', False, False),
+    ('relatorio_mensal_itens', 'despesa', False, False),
+]
+
+# Índices de transacoes que envolvem valor (ou uma expressão, que o modo
+# batch do SQLite não consegue recriar): removidos antes e recriados depois
+INDICES_TRANSACOES = [
+    ('ix_transacoes_tipo_valor', ['tipo', 'valor', 'id']),
+    ('ix_transacoes_paciente_tipo_data', ['paciente_id', 'tipo', 'data_criacao', 'id', 'valor']),
+    ('ix_transacoes_tipo_observacao', ['tipo', sa.text("coalesce(observacao, '')"), 'id']),
+]
+
+
+def _converter(tabela, coluna, nullable, tem_id, tipo_novo, expressao):
+    """
+    Troca o tipo de `coluna` copiando os valores para uma coluna nova em
+    faixas de id (para não travar a tabela inteira) e renomeando-a no fim.
+    """
+    temporaria = f'{coluna}_novo'
+    with op.batch_alter_table(tabela, schema=None) as batch_op:
+        batch_op.add_column(sa.Column(temporaria, tipo_novo, nullable=True))
+
+    conn = op.get_bind()
+    atualizar = f'UPDATE {tabela} SET {temporaria} = {expressao.format(coluna=coluna)}'
+    if tem_id:
+        maior_id = conn.execute(sa.text(f'SELECT max(id) FROM {tabela}')).scalar() or 0
+        for inicio in range(0, maior_id + 1, TAMANHO_LOTE):
+            conn.execute(sa.text(atualizar + ' WHERE id >= :inicio AND id < :fim'),
+                         {'inicio': inicio, 'fim': inicio + TAMANHO_LOTE})
+    else:
+        conn.execute(sa.text(atualizar))
+
+    with op.batch_alter_table(tabela, schema=None) as batch_op:
+        batch_op.drop_column(coluna)
+        batch_op.alter_column(temporaria, new_column_name=coluna,
+                              existing_type=tipo_novo, nullable=nullable)
+
+
+def upgrade():
+    for nome, _ in INDICES_TRANSACOES:
+        op.drop_index(nome, table_name='transacoes')
+
+    for tabela, coluna, nullable, tem_id in COLUNAS:
+        _converter(tabela, coluna, nullable, tem_id, sa.BigInteger(),
+                   'CAST(round({coluna} * 100) AS BIGINT)')
+
+    for nome, colunas in INDICES_TRANSACOES:
+        op.create_index(nome, 'transacoes', colunas, unique=False)
+
+
+def downgrade():
+    for nome, _ in INDICES_TRANSACOES:
+        op.drop_index(nome, table_name='transacoes')
+
+    for tabela, coluna, nullable, tem_id in COLUNAS:
+        _converter(tabela, coluna, nullable, tem_id, sa.Float(), '{coluna} / 100.0')
+
+    for nome, colunas in INDICES_TRANSACOES:
+        op.create_index(nome, 'transacoes', colunas, unique=False)
@@ -0,0 +1,86 @@
+"""Adiciona tabela resumo_financeiro
+
+O upgrade já popula a tabela com os totais atuais (as mesmas agregações de
+`flask --app backend.app reconstruir-resumo`), para o painel não abrir
+zerado depois do deploy.
+
+Revision ID: b7d24e61c9a3
+Revises: 5c3e9a1d7b20
+Create Date: 2026-10-18 10:02:17.881460
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7d24e61c9a3'
+down_revision = '5c3e9a1d7b20'
+branch_labels = None
+depends_on = None
+
+PERIODO_TOTAL = 'total'
+
+# Só as colunas usadas nas agregações, como estão nesta revisão
+transacoes = sa.table('transacoes', sa.column('tipo', sa.String), sa.column('valor', sa.Float),
+                      sa.column('data_criacao', sa.DateTime))
+notas = sa.table('notas', sa.column('valor', sa.Float), sa.column('data', sa.Date))
+pacientes = sa.table('pacientes', sa.column('active', sa.Boolean), sa.column('valor_sessao', sa.Float))
+
+
+def _agregar(conn):
+    """{(metrica, periodo): [quantidade, soma]}, como em reconstruir_resumo."""
+    resumo = {}
+
+    def _somar(metrica, periodo, qtd, soma):
+        atual = resumo.setdefault((metrica, periodo), [0, 0.0])
+        atual[0] += qtd or 0
+        atual[1] += float(soma or 0)
+
+    ano, mes = sa.extract('year', transacoes.c.data_criacao), sa.extract('month', transacoes.c.data_criacao)
+    for tipo, a, m, qtd, soma in conn.execute(
+        sa.select(transacoes.c.tipo, ano, mes, sa.func.count(), sa.func.sum(transacoes.c.valor))
+        .group_by(transacoes.c.tipo, ano, mes)
+    ):
+        _somar(tipo, PERIODO_TOTAL, qtd, soma)
+        if a is not None:
+            _somar(tipo, f'{int(a):04d}-{int(m):02d}', qtd, soma)
+
+    ano, mes = sa.extract('year', notas.c.data), sa.extract('month', notas.c.data)
+    for a, m, qtd, soma in conn.execute(
+        sa.select(ano, mes, sa.func.count(), sa.func.sum(notas.c.valor)).group_by(ano, mes)
+    ):
+        _somar('notas', PERIODO_TOTAL, qtd, soma)
+        if a is not None:
+            _somar('notas', f'{int(a):04d}-{int(m):02d}', qtd, soma)
+
+    qtd, soma = conn.execute(
+        sa.select(sa.func.count(), sa.func.sum(pacientes.c.valor_sessao))
+        .where(pacientes.c.active.is_(sa.true()))
+    ).one()
+    _somar('pacientes_ativos', PERIODO_TOTAL, qtd, soma)
+    return resumo
+
+
+def upgrade():
+    tabela = op.create_table('resumo_financeiro',
+    sa.Column('metrica', sa.String(length=30), nullable=False),
+    sa.Column('periodo', sa.String(length=7), nullable=False),
+    sa.Column('quantidade', sa.BigInteger(), nullable=False),
+    sa.Column('soma', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('metrica', 'periodo')
+    )
+
+    # Uma linha por (métrica, mês): o volume é pequeno mesmo com muitas
+    # transações, porque as agregações são feitas no banco
+    linhas = [
+        {'metrica': metrica, 'periodo': periodo, 'quantidade': qtd, 'soma': soma}
+        for (metrica, periodo), (qtd, soma) in sorted(_agregar(op.get_bind()).items())
+        if qtd or soma
+    ]
+    if linhas:
+        op.bulk_insert(tabela, linhas)
+
+
+def downgrade():
+    op.drop_table('resumo_financeiro')
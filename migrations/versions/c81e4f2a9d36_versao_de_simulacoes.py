@@ -0,0 +1,28 @@
+"""Adiciona versao e updated_at em simulacoes
+
+Revision ID: c81e4f2a9d36
+Revises: 3d5f8b9e2a71
+Create Date: 2026-10-18 14:37:22.905614
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c81e4f2a9d36'
+down_revision = '3d5f8b9e2a71'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('simulacoes', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('versao', sa.Integer(), nullable=False, server_default='1'))
+        batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('simulacoes', schema=None) as batch_op:
+        batch_op.drop_column('updated_at')
+        batch_op.drop_column('versao')
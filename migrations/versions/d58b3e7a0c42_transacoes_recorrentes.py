@@ -0,0 +1,64 @@
+"""Adiciona transacoes_recorrentes e vínculo em transacoes
+
+Revision ID: d58b3e7a0c42
+Revises: a4c6e2f9b1d7
+Create Date: 2026-10-18 17:02:14.530981
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd58b3e7a0c42'
+down_revision = 'a4c6e2f9b1d7'
+branch_labels = None
+depends_on = None
+
+
+def _recriando_indice_de_expressao(alteracao):
+    # Como em f3a71c8d2b94: o modo batch do SQLite perderia o índice de expressão
+    sqlite = op.get_bind().dialect.name == 'sqlite'
+    if sqlite:
+        op.drop_index('ix_transacoes_tipo_observacao', table_name='transacoes')
+    alteracao()
+    if sqlite:
+        op.create_index('ix_transacoes_tipo_observacao', 'transacoes',
+                        ['tipo', sa.text("coalesce(observacao, '')"), 'id'], unique=False)
+
+
+def upgrade():
+    op.create_table('transacoes_recorrentes',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('nome', sa.String(length=120), nullable=False),
+    sa.Column('tipo', sa.String(length=10), nullable=False),
+    sa.Column('observacao', sa.Text(), nullable=True),
+    sa.Column('valor', sa.BigInteger(), nullable=False),
+    sa.Column('frequencia', sa.String(length=10), nullable=False),
+    sa.Column('dia', sa.Integer(), nullable=False),
+    sa.Column('inicio', sa.Date(), nullable=False),
+    sa.Column('fim', sa.Date(), nullable=True),
+    sa.Column('ativa', sa.Boolean(), nullable=False),
+    sa.Column('criado_em', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+    def _adicionar_colunas():
+        with op.batch_alter_table('transacoes', schema=None) as batch_op:
+            batch_op.add_column(sa.Column('recorrencia_id', sa.Integer(), nullable=True))
+            batch_op.add_column(sa.Column('periodo', sa.String(length=8), nullable=True))
+            batch_op.create_foreign_key('fk_transacoes_recorrencia_id', 'transacoes_recorrentes', ['recorrencia_id'], ['id'])
+            batch_op.create_unique_constraint('uq_transacoes_recorrencia_periodo', ['recorrencia_id', 'periodo'])
+    _recriando_indice_de_expressao(_adicionar_colunas)
+
+
+def downgrade():
+    def _remover_colunas():
+        with op.batch_alter_table('transacoes', schema=None) as batch_op:
+            batch_op.drop_constraint('uq_transacoes_recorrencia_periodo', type_='unique')
+            batch_op.drop_constraint('fk_transacoes_recorrencia_id', type_='foreignkey')
+            batch_op.drop_column('periodo')
+            batch_op.drop_column('recorrencia_id')
+    _recriando_indice_de_expressao(_remover_colunas)
+
+    op.drop_table('transacoes_recorrentes')
@@ -0,0 +1,31 @@
+"""Indices compostos para listagem de transacoes
+
+Revision ID: e4a8f0c2d615
+Revises: b7d24e61c9a3
+Create Date: 2026-10-18 11:20:54.319027
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e4a8f0c2d615'
+down_revision = 'b7d24e61c9a3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_transacoes_tipo_data_criacao', 'transacoes', ['tipo', 'data_criacao', 'id'], unique=False)
+    op.create_index('ix_transacoes_tipo_nome', 'transacoes', ['tipo', 'nome', 'id'], unique=False)
+    op.create_index('ix_transacoes_tipo_valor', 'transacoes', ['tipo', 'valor', 'id'], unique=False)
+    op.create_index('ix_transacoes_tipo_observacao', 'transacoes',
+                    ['tipo', sa.text("coalesce(observacao, '')"), 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_transacoes_tipo_observacao', table_name='transacoes')
+    op.drop_index('ix_transacoes_tipo_valor', table_name='transacoes')
+    op.drop_index('ix_transacoes_tipo_nome', table_name='transacoes')
+    op.drop_index('ix_transacoes_tipo_data_criacao', table_name='transacoes')
@@ -0,0 +1,66 @@
+"""Adiciona paciente_id em transacoes
+
+Revision ID: f3a71c8d2b94
+Revises: 6b2d9e4f1a85
+Create Date: 2026-10-18 15:48:03.671932
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3a71c8d2b94'
+down_revision = '6b2d9e4f1a85'
+branch_labels = None
+depends_on = None
+
+TAMANHO_LOTE = 5000
+
+
+def _recriando_indice_de_expressao(alteracao):
+    # No SQLite o modo batch recria a tabela e não reflete índices de
+    # expressão, que seriam perdidos; ix_transacoes_tipo_observacao é
+    # removido e recriado à parte.
+    sqlite = op.get_bind().dialect.name == 'sqlite'
+    if sqlite:
+        op.drop_index('ix_transacoes_tipo_observacao', table_name='transacoes')
+    alteracao()
+    if sqlite:
+        op.create_index('ix_transacoes_tipo_observacao', 'transacoes',
+                        ['tipo', sa.text("coalesce(observacao, '')"), 'id'], unique=False)
+
+
+def upgrade():
+    def _adicionar_coluna():
+        with op.batch_alter_table('transacoes', schema=None) as batch_op:
+            batch_op.add_column(sa.Column('paciente_id', sa.Integer(), nullable=True))
+            batch_op.create_foreign_key('fk_transacoes_paciente_id', 'pacientes', ['paciente_id'], ['id'])
+    _recriando_indice_de_expressao(_adicionar_coluna)
+
+    # Vincula as receitas existentes pelo nome, em faixas de id para não
+    # travar a tabela inteira. Nomes compartilhados por mais de um paciente
+    # são ambíguos e ficam sem vínculo.
+    conn = op.get_bind()
+    maior_id = conn.execute(sa.text('SELECT max(id) FROM transacoes')).scalar() or 0
+    for inicio in range(0, maior_id + 1, TAMANHO_LOTE):
+        conn.execute(sa.text(
+            "UPDATE transacoes SET paciente_id = ("
+            "  SELECT min(p.id) FROM pacientes p WHERE p.nome = transacoes.nome"
+            "  HAVING count(*) = 1"
+            ") "
+            "WHERE id >= :inicio AND id < :fim AND tipo = 'receita' AND paciente_id IS NULL"
+        ), {'inicio': inicio, 'fim': inicio + TAMANHO_LOTE})
+
+    op.create_index('ix_transacoes_paciente_tipo_data', 'transacoes',
+                    ['paciente_id', 'tipo', 'data_criacao', 'id', 'valor'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_transacoes_paciente_tipo_data', table_name='transacoes')
+
+    def _remover_coluna():
+        with op.batch_alter_table('transacoes', schema=None) as batch_op:
+            batch_op.drop_constraint('fk_transacoes_paciente_id', type_='foreignkey')
+            batch_op.drop_column('paciente_id')
+    _recriando_indice_de_expressao(_remover_coluna)
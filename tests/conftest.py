@@ -0,0 +1,42 @@
+# tests/conftest.py
+#
+# App de teste sobre SQLite em memória (sem DATABASE_URL) e um cliente já
+# autenticado. Rode da raiz do projeto: python -m pytest
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from backend.app import create_app  # noqa: E402
+from backend.db import db  # noqa: E402
+from backend.models import Usuario  # noqa: E402
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': 'sqlite://',
+        'SQLALCHEMY_ENGINE_OPTIONS': {},
+        'PERFIL_DIR': str(tmp_path / 'perfis'),
+    })
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def cliente(app):
+    usuario = Usuario(nome='Admin', email='admin@admin.com')
+    usuario.set_senha('senha')
+    db.session.add(usuario)
+    db.session.commit()
+    cliente = app.test_client()
+    with cliente.session_transaction() as sessao:
+        sessao['user_id'] = usuario.id
+    return cliente
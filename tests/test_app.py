@@ -0,0 +1,19 @@
+# tests/test_app.py
+
+import pytest
+from flask import Flask
+
+import backend.app as modulo_app
+
+
+def test_app_do_modulo_e_criado_uma_vez_sob_demanda(monkeypatch):
+    monkeypatch.setenv('DATABASE_URL', 'sqlite://')
+    monkeypatch.setattr(modulo_app, '_app', None)
+
+    from backend.app import app
+    assert isinstance(app, Flask)
+    assert modulo_app.app is app
+    assert 'auth.login' in {r.endpoint for r in app.url_map.iter_rules()}
+
+    with pytest.raises(AttributeError):
+        modulo_app.nao_existe
@@ -0,0 +1,42 @@
+# tests/test_cache_projecao.py
+
+import os
+import time
+
+from backend.cache_projecao import IDADE_MAXIMA_TMP, CacheProjecao
+
+
+def _arquivos(diretorio):
+    return sorted(os.listdir(diretorio))
+
+
+def test_nova_versao_apaga_as_anteriores_da_simulacao(tmp_path):
+    cache = CacheProjecao(diretorio=str(tmp_path))
+    cache.guardar((1, 'a', 1, 12), 'v1-12')
+    cache.guardar((1, 'a', 1, 24), 'v1-24')
+    cache.guardar((12, 'a', 1, 12), 'outra')
+    cache.guardar((1, 'a', 2, 12), 'v2-12')
+    assert _arquivos(tmp_path) == ['1-a-2-12.pkl', '12-a-1-12.pkl']
+
+
+def test_diretorio_limitado_remove_os_menos_usados(tmp_path):
+    cache = CacheProjecao(diretorio=str(tmp_path), max_arquivos=3)
+    for sim_id in range(1, 4):
+        cache.guardar((sim_id, 'a', 1, 12), sim_id)
+        os.utime(tmp_path / f'{sim_id}-a-1-12.pkl', (1000 + sim_id, 1000 + sim_id))
+
+    # Lida do disco por outro processo: passa a ser a mais recente
+    assert CacheProjecao(diretorio=str(tmp_path)).obter((1, 'a', 1, 12)) == 1
+    cache.guardar((4, 'a', 1, 12), 4)
+    assert _arquivos(tmp_path) == ['1-a-1-12.pkl', '3-a-1-12.pkl', '4-a-1-12.pkl']
+
+
+def test_tmp_abandonado_e_removido(tmp_path):
+    abandonado, recente = tmp_path / 'abc.tmp', tmp_path / 'def.tmp'
+    abandonado.write_bytes(b'')
+    recente.write_bytes(b'')
+    velho = time.time() - IDADE_MAXIMA_TMP - 1
+    os.utime(abandonado, (velho, velho))
+
+    CacheProjecao(diretorio=str(tmp_path)).guardar((1, 'a', 1, 12), 'x')
+    assert _arquivos(tmp_path) == ['1-a-1-12.pkl', 'def.tmp']
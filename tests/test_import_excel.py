@@ -0,0 +1,66 @@
+# tests/test_import_excel.py
+
+from decimal import Decimal
+
+import openpyxl
+import pytest
+
+from backend.db import db
+from backend.import_excel import import_excel
+from backend.models import Nota, Paciente, normalizar_cpf
+
+
+@pytest.fixture
+def planilha(tmp_path):
+    caminho = tmp_path / 'extrato.xlsx'
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.append(['CPF', 'Nome', 'Data', 'Valor', 'Tipo', 'Descrição'])
+    ws.append(['12345678900', 'Ana', '2026-03-02', '150,00', 'Receita', 'Sessão'])
+    ws.append(['987.654.321-00', 'Bruno', '2026-03-03', 200, 'Receita', 'Sessão'])
+    ws.append(['111.222.333-44', 'Carla', '2026-03-04', 100, 'Receita', 'Sessão'])
+    ws.append(['11122233344', 'Carla', '2026-03-05', 100, 'Receita', 'Sessão'])
+    wb.save(caminho)
+    return str(caminho)
+
+
+def _paciente(cpf, nome):
+    paciente = Paciente(nome=nome, cpf=cpf, cpf_normalizado=normalizar_cpf(cpf), cep='01000-000')
+    db.session.add(paciente)
+    db.session.commit()
+    return paciente.id
+
+
+def test_importacao_reaproveita_pacientes_pelo_cpf_normalizado(app, planilha):
+    ana = _paciente('123.456.789-00', 'Ana')
+    bruno = _paciente('98765432100', 'Bruno')
+
+    stats = import_excel.importar_excel(planilha)
+
+    assert stats['pacientes_criados'] == 1
+    assert stats['notas_criadas'] == 4
+    assert db.session.query(Paciente).count() == 3
+    carla = db.session.query(Paciente).filter_by(cpf_normalizado='11122233344').one().id
+    notas = {(n.paciente_id, n.valor) for n in db.session.query(Nota)}
+    assert notas == {(ana, Decimal('150.00')), (bruno, Decimal('200.00')),
+                     (carla, Decimal('100.00'))}
+
+
+def test_paciente_criado_durante_a_importacao_nao_derruba_o_lote(app, planilha, monkeypatch):
+    consultar = import_excel._ids_por_cpf
+    chamadas = []
+
+    def consulta_antes_do_cadastro_concorrente(cpfs):
+        chamadas.append(cpfs)
+        if len(chamadas) == 1:
+            # Cadastrado por outra importação depois desta consulta
+            _paciente('111.222.333-44', 'Carla')
+            return {}
+        return consultar(cpfs)
+
+    monkeypatch.setattr(import_excel, '_ids_por_cpf', consulta_antes_do_cadastro_concorrente)
+    stats = import_excel.importar_excel(planilha)
+
+    assert stats['pacientes_criados'] == 2
+    assert db.session.query(Paciente).count() == 3
+    assert db.session.query(Nota).count() == 4
@@ -0,0 +1,72 @@
+# tests/test_metricas.py
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from backend.metricas import ARQUIVO_ENCERRADOS, BUCKETS_JOB, RegistroMetricas, _inicio_processo
+
+
+def _pid_encerrado():
+    processo = subprocess.Popen([sys.executable, '-c', 'pass'])
+    processo.wait()
+    return processo.pid
+
+
+def _gravar_como(diretorio, pid, contador, segundos, inicio=None):
+    outro = RegistroMetricas()
+    outro.incrementar('gestor_requisicoes_total', contador, endpoint='notas')
+    outro.observar('gestor_job_segundos', segundos, BUCKETS_JOB, job='recorrencias', status='ok')
+    if inicio is None:
+        inicio = _inicio_processo(pid) or 1
+    nome = f'metricas-{pid}-{inicio}.json'
+    with open(os.path.join(diretorio, nome), 'w') as f:
+        json.dump(outro._estado(), f)
+    return nome
+
+
+def test_arquivos_de_workers_encerrados_sao_consolidados(tmp_path):
+    registro = RegistroMetricas(diretorio=str(tmp_path))
+    registro.incrementar('gestor_requisicoes_total', endpoint='notas')
+    # Um worker vivo (o processo pai, que existe) e dois encerrados
+    vivo = _gravar_como(tmp_path, os.getppid(), 10, 0.2)
+    _gravar_como(tmp_path, _pid_encerrado(), 100, 2)
+    _gravar_como(tmp_path, _pid_encerrado(), 1000, 20)
+
+    esperado = registro.exportar()
+    assert 'gestor_requisicoes_total{endpoint="notas"} 1111' in esperado
+    assert 'gestor_job_segundos_count{job="recorrencias",status="ok"} 3' in esperado
+
+    arquivos = sorted(os.listdir(tmp_path))
+    assert ARQUIVO_ENCERRADOS in arquivos
+    assert [a for a in arquivos if a[9:10].isdigit()] == [vivo]
+
+    # Uma nova consolidação acumula sobre a anterior e a soma não muda
+    assert registro.exportar() == esperado
+    _gravar_como(tmp_path, _pid_encerrado(), 5, 0.01)
+    assert 'gestor_requisicoes_total{endpoint="notas"} 1116' in registro.exportar()
+
+
+def test_pid_reutilizado_nao_esconde_o_worker_encerrado(tmp_path):
+    if _inicio_processo(os.getpid()) is None:
+        pytest.skip('sem /proc')
+    registro = RegistroMetricas(diretorio=str(tmp_path))
+    # Mesmo pid de um processo vivo, mas com outro instante de início: o
+    # worker que gravou o arquivo morreu e o pid foi reaproveitado
+    reaproveitado = _gravar_como(tmp_path, os.getppid(), 7, 0.2,
+                                 inicio=_inicio_processo(os.getppid()) + 1)
+    registro.gravar()
+    assert 'gestor_requisicoes_total{endpoint="notas"} 7' in registro.exportar()
+    arquivos = os.listdir(tmp_path)
+    assert reaproveitado not in arquivos
+    assert f'metricas-{os.getpid()}-{_inicio_processo(os.getpid())}.json' in arquivos
+
+    # O master consolida assim que o worker morre (gancho child_exit)
+    _gravar_como(tmp_path, _pid_encerrado(), 3, 0.2, inicio=1)
+    registro.consolidar_encerrados()
+    assert [a for a in os.listdir(tmp_path) if a[9:10].isdigit()] == \
+        [f'metricas-{os.getpid()}-{_inicio_processo(os.getpid())}.json']
+    assert 'gestor_requisicoes_total{endpoint="notas"} 10' in registro.exportar()
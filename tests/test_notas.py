@@ -0,0 +1,88 @@
+# tests/test_notas.py
+
+import io
+import zipfile
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import event
+
+from backend.db import db
+from backend.models import ImportacaoJob, Nota, Paciente
+from backend.notas_mensais import renderizar_pdfs_do_mes
+from backend.rotas import notas as rotas_notas
+
+
+def _criar_notas(quantidade, inicio=0):
+    # Um paciente por nota: um carregamento preguiçoso de paciente faria
+    # uma consulta a mais por linha
+    for i in range(inicio, inicio + quantidade):
+        paciente = Paciente(nome=f'Paciente {i:03d}', cpf=f'{i:011d}', cep='01000-000')
+        db.session.add(paciente)
+        db.session.flush()
+        db.session.add(Nota(paciente_id=paciente.id, data=date(2026, 1, 1 + i % 28),
+                            valor=Decimal('150.00'), descricao=f'Nota {i}'))
+    db.session.commit()
+
+
+def _consultas(cliente, url):
+    comandos = []
+
+    def contar(conn, cursor, statement, parameters, context, executemany):
+        comandos.append(statement)
+
+    engine = db.engine
+    event.listen(engine, 'before_cursor_execute', contar)
+    try:
+        resposta = cliente.get(url)
+    finally:
+        event.remove(engine, 'before_cursor_execute', contar)
+    assert resposta.status_code == 200
+    return comandos
+
+
+@pytest.mark.parametrize('quantidade', [1, 40, 120])
+def test_listagem_de_notas_tem_consultas_constantes(app, cliente, quantidade):
+    _criar_notas(1)
+    base = len(_consultas(cliente, '/notas'))
+
+    _criar_notas(quantidade, inicio=1)
+    comandos = _consultas(cliente, '/notas')
+    assert len(comandos) == base, comandos
+
+
+def test_filtro_por_paciente_tem_consultas_constantes(app, cliente):
+    _criar_notas(1)
+    base = len(_consultas(cliente, '/notas?paciente_id=1'))
+    for _ in range(30):
+        db.session.add(Nota(paciente_id=1, data=date(2026, 2, 1), valor=Decimal('90.00')))
+    db.session.commit()
+    assert len(_consultas(cliente, '/notas?paciente_id=1')) == base
+
+
+def test_importar_recusa_xls_antes_de_enfileirar(app, cliente):
+    resposta = cliente.post('/importar', follow_redirects=True, data={
+        'arquivo': (io.BytesIO(b'\xd0\xcf\x11\xe0'), 'planilha.xls'),
+    })
+    assert 'salve como .xlsx' in resposta.get_data(as_text=True)
+    assert db.session.query(ImportacaoJob).count() == 0
+
+
+def test_zip_so_compacta_pdfs_prontos_e_enfileira_os_que_faltam(app, cliente, tmp_path, monkeypatch):
+    monkeypatch.setenv('NOTAS_PDF_DIR', str(tmp_path))
+    monkeypatch.setattr(rotas_notas, 'LIMITE_PDFS_NA_REQUISICAO', 2)
+    enfileiradas = []
+    monkeypatch.setattr(rotas_notas, 'renderizar_em_segundo_plano', enfileiradas.extend)
+    _criar_notas(3)
+
+    resposta = cliente.get('/notas/pdf.zip')
+    assert resposta.status_code == 302
+    assert len(enfileiradas) == 3
+    assert list(tmp_path.iterdir()) == []  # nada renderizado na requisição
+
+    assert renderizar_pdfs_do_mes('2026-01', lote=2) == {'notas': 3, 'renderizadas': 3}
+    assert renderizar_pdfs_do_mes('2026-01') == {'notas': 3, 'renderizadas': 0}
+    resposta = cliente.get('/notas/pdf.zip')
+    assert resposta.status_code == 200
+    assert len(zipfile.ZipFile(io.BytesIO(resposta.data)).namelist()) == 3
@@ -0,0 +1,36 @@
+# tests/test_notas_mensais.py
+
+from datetime import datetime
+from decimal import Decimal
+
+from backend.db import db
+from backend.models import Nota, Paciente, Transacao
+from backend.notas_mensais import gerar_notas_do_mes
+from backend.resumo import ler_resumo
+
+
+def _paciente_com_sessoes(n, sessoes, ativo=True):
+    p = Paciente(nome=f'P{n}', cpf=f'{n:011d}', cep='01000-000', valor_sessao=Decimal('100'), active=ativo)
+    db.session.add(p)
+    db.session.flush()
+    for dia in range(1, sessoes + 1):
+        db.session.add(Transacao(nome=p.nome, tipo='receita', valor=Decimal('100'),
+                                 paciente_id=p.id, data_criacao=datetime(2026, 3, dia)))
+    db.session.commit()
+    return p
+
+
+def test_gera_uma_nota_por_paciente_ativo_e_e_idempotente(app):
+    _paciente_com_sessoes(1, 2)
+    _paciente_com_sessoes(2, 3)
+    _paciente_com_sessoes(3, 1, ativo=False)
+
+    resultado = gerar_notas_do_mes('2026-03')
+    assert resultado == {'criadas': 2, 'existentes': 0, 'valor_total': Decimal('500.00')}
+    assert ler_resumo()['notas'] == (2, Decimal('500.00'))
+
+    _paciente_com_sessoes(4, 1)
+    resultado = gerar_notas_do_mes('2026-03')
+    assert resultado == {'criadas': 1, 'existentes': 2, 'valor_total': Decimal('100.00')}
+    assert db.session.query(Nota).filter_by(periodo='2026-03').count() == 3
+    assert ler_resumo()['notas'] == (3, Decimal('600.00'))
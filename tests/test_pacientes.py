@@ -0,0 +1,23 @@
+# tests/test_pacientes.py
+
+import pytest
+
+
+@pytest.mark.parametrize('corpo', [[1], {'sessoes': [1, 2]}, {'sessoes': 'abc'}, {'sessoes': {'a': 1}}])
+def test_sessoes_em_lote_com_json_malformado_devolve_400(app, cliente, corpo):
+    resposta = cliente.post('/pacientes/sessoes', json=corpo)
+    assert resposta.status_code == 400
+    assert 'erro' in resposta.get_json()
+
+
+def test_valor_da_sessao_sem_digitos_nao_cria_paciente(app, cliente):
+    from backend.db import db
+    from backend.models import Paciente
+
+    resposta = cliente.post('/pacientes/novo', data={
+        'nome': 'Ana', 'cpf': '123.456.789-00', 'cep': '01000-000', 'valor_sessao': 'R$',
+    })
+    assert resposta.status_code == 200
+    with cliente.session_transaction() as sessao:
+        assert any(m.startswith('Valor da sessão inválido') for _, m in sessao['_flashes'])
+    assert db.session.query(Paciente).count() == 0
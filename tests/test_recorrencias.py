@@ -0,0 +1,43 @@
+# tests/test_recorrencias.py
+
+from datetime import date, datetime
+from decimal import Decimal
+
+from backend import recorrencias
+from backend.db import db
+from backend.models import Transacao, TransacaoRecorrente
+from backend.recorrencias import materializar
+from backend.resumo import ler_resumo
+
+
+def _aluguel():
+    regra = TransacaoRecorrente(nome='Aluguel', tipo='despesa', valor=Decimal('1000'),
+                                frequencia='mensal', dia=5, inicio=date(2026, 1, 1))
+    db.session.add(regra)
+    db.session.commit()
+    return regra
+
+
+def test_materializa_os_meses_pendentes_uma_vez(app):
+    _aluguel()
+    assert materializar(ate=date(2026, 3, 31)) == 3
+    assert materializar(ate=date(2026, 3, 31)) == 0
+    assert ler_resumo()['despesa'] == (3, Decimal('3000.00'))
+
+
+def test_conflito_concorrente_nao_descarta_o_lote(app, monkeypatch):
+    regra = _aluguel()
+    originais = recorrencias.ocorrencias
+
+    def ocorrencias_com_concorrente(r, ate):
+        # Outra execução grava fevereiro depois da leitura dos existentes
+        db.session.add(Transacao(nome='Aluguel', tipo='despesa', valor=Decimal('1000'),
+                                 data_criacao=datetime(2026, 2, 5), recorrencia_id=r.id,
+                                 periodo='2026-02'))
+        db.session.flush()
+        return originais(r, ate)
+
+    monkeypatch.setattr(recorrencias, 'ocorrencias', ocorrencias_com_concorrente)
+    assert materializar(ate=date(2026, 3, 31), regras=[regra]) == 2
+    assert db.session.query(Transacao).filter_by(recorrencia_id=regra.id).count() == 3
+    assert ler_resumo()['despesa'] == (3, Decimal('3000.00'))
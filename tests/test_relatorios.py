@@ -0,0 +1,42 @@
+# tests/test_relatorios.py
+
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import event
+
+from backend.db import db
+from backend.models import RelatorioMes, Transacao
+from backend.relatorios import fechar_meses, montar_relatorio
+
+
+def _lancar(tipo, valor, data):
+    db.session.add(Transacao(nome='Aluguel' if tipo == 'despesa' else 'Sessão', tipo=tipo,
+                             valor=Decimal(valor), data_criacao=data))
+    db.session.commit()
+
+
+def test_relatorio_nao_escreve_e_fechamento_nao_muda_o_resultado(app):
+    _lancar('receita', '300', datetime(2025, 1, 10))
+    _lancar('despesa', '120', datetime(2025, 1, 15))
+    _lancar('receita', '50', datetime(2025, 2, 3))
+
+    escritas = []
+
+    def registrar(conn, cursor, statement, parameters, context, executemany):
+        if not statement.lstrip().upper().startswith('SELECT'):
+            escritas.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', registrar)
+    try:
+        aberto = montar_relatorio('2025-01', '2025-03')
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', registrar)
+    assert escritas == []
+    assert db.session.query(RelatorioMes).count() == 0
+
+    assert fechar_meses() == 2
+    fechado = montar_relatorio('2025-01', '2025-03')
+    assert fechado == aberto
+    assert aberto['totais']['receita'] == Decimal('350.00')
+    assert aberto['totais']['resultado'] == Decimal('230.00')
@@ -0,0 +1,43 @@
+# tests/test_resumo.py
+
+from collections import defaultdict
+from datetime import datetime
+from decimal import Decimal
+
+from backend.db import db
+from backend.models import Transacao
+from backend.resumo import aplicar_deltas, ler_resumo, reconstruir_resumo
+
+
+def test_aplicar_deltas_cria_e_soma_linhas(app):
+    conn = db.session.connection()
+    aplicar_deltas(conn, {('receita', 'total'): (1, Decimal('10.00'))})
+    aplicar_deltas(conn, {('receita', 'total'): (2, Decimal('5.50')),
+                          ('despesa', 'total'): (1, Decimal('3.00'))})
+    db.session.commit()
+    assert ler_resumo() == {'receita': (3, Decimal('15.50')), 'despesa': (1, Decimal('3.00'))}
+
+
+def test_resumo_incremental_igual_ao_reconstruido(app):
+    for i in range(12):
+        db.session.add(Transacao(nome=f'T{i}', tipo='receita' if i % 3 else 'despesa',
+                                 valor=Decimal(f'{i}.25'), data_criacao=datetime(2026, 1 + i % 4, 5)))
+        db.session.commit()
+    t = db.session.get(Transacao, 1)
+    t.valor = Decimal('99.99')
+    db.session.delete(db.session.get(Transacao, 2))
+    db.session.commit()
+
+    def _todos():
+        return {(p, m): v for p in ('total', '2026-01', '2026-02', '2026-03', '2026-04')
+                for m, v in ler_resumo(p).items()}
+
+    incremental = _todos()
+    reconstruir_resumo()
+    assert incremental == _todos()
+    # O período de cada transação também tem sua linha
+    por_mes = defaultdict(int)
+    for (periodo, _), (qtd, _) in incremental.items():
+        if periodo != 'total':
+            por_mes[periodo] += qtd
+    assert sum(por_mes.values()) == 11
@@ -0,0 +1,68 @@
+# tests/test_simulacoes.py
+
+from sqlalchemy import event
+
+from backend.db import db
+from backend.models import Simulacao
+
+
+def test_edicao_incrementa_versao_no_banco(app, cliente):
+    resposta = cliente.post('/simulacoes/novo', json={
+        'nome': 'Base', 'despesa_mensal_fixa': 1000,
+        'itens': [{'pacientes': 10, 'valor_sessao': 150}],
+    })
+    assert resposta.status_code == 201
+    sim_id = resposta.get_json()['id']
+
+    updates = []
+
+    def registrar(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith('UPDATE simulacoes'):
+            updates.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', registrar)
+    try:
+        resposta = cliente.post(f'/simulacoes/{sim_id}/edit', json={
+            'nome': 'Base 2', 'despesa_mensal_fixa': 1000,
+            'itens': [{'pacientes': 12, 'valor_sessao': 150}],
+        })
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', registrar)
+
+    assert resposta.status_code == 200
+    assert resposta.get_json()['versao'] == 2
+    # O incremento é feito pelo banco, não a partir do valor lido em Python
+    assert any('versao=(simulacoes.versao + ?)' in u for u in updates), updates
+    db.session.expire_all()
+    assert db.session.get(Simulacao, sim_id).versao == 2
+
+
+
+def test_payload_json_malformado_devolve_400(app, cliente):
+    for corpo in ([], {'nome': 'x', 'itens': [1]}, {'nome': 'x', 'eventos': 'a'}):
+        resposta = cliente.post('/simulacoes/novo', json=corpo)
+        assert resposta.status_code == 400
+        assert 'erro' in resposta.get_json()
+
+
+def test_id_reaproveitado_nao_serve_projecao_da_simulacao_excluida(app, cliente, monkeypatch):
+    from backend.cache_projecao import cache_projecoes
+
+    def criar(pacientes):
+        return cliente.post('/simulacoes/novo', json={
+            'nome': 'Cenário', 'despesa_mensal_fixa': 1000,
+            'itens': [{'pacientes': pacientes, 'valor_sessao': 150}],
+        }).get_json()['id']
+
+    sim_id = criar(10)
+    antiga = cliente.get(f'/simulacoes/{sim_id}').get_data(as_text=True)
+
+    # Outro worker do gunicorn não vê a invalidação feita por este
+    monkeypatch.setattr(cache_projecoes, 'invalidar', lambda sim_id: None)
+    cliente.post(f'/simulacoes/{sim_id}/delete')
+    assert criar(30) == sim_id  # o SQLite reaproveita o id
+
+    nova = cliente.get(f'/simulacoes/{sim_id}').get_data(as_text=True)
+    assert nova != antiga
+    cache_projecoes._entradas.clear()
+    assert cliente.get(f'/simulacoes/{sim_id}').get_data(as_text=True) == nova
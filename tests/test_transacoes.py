@@ -0,0 +1,47 @@
+# tests/test_transacoes.py
+
+import base64
+import json
+
+import pytest
+
+XHR = {'X-Requested-With': 'XMLHttpRequest'}
+
+
+def _cursor(valores):
+    return base64.urlsafe_b64encode(json.dumps(valores).encode()).decode()
+
+
+@pytest.mark.parametrize('cursor', [
+    _cursor(['abc', 1]), _cursor(['NaN', 1]), _cursor(['Infinity', 1]),
+    _cursor(5), 'nao-e-base64!',
+])
+def test_cursor_malformado_volta_para_a_primeira_pagina(app, cliente, cursor):
+    resposta = cliente.get(f'/transacoes?ordenar_por=valor&cursor={cursor}', headers=XHR)
+    assert resposta.status_code == 200
+
+
+@pytest.mark.parametrize('valor', ['R$', ' ', 'R$  '])
+def test_valor_sem_digitos_e_recusado_sem_erro_500(app, cliente, valor):
+    from datetime import datetime
+    from decimal import Decimal
+
+    from backend.db import db
+    from backend.models import Transacao
+
+    resposta = cliente.post('/transacoes/novo', data={'nome': 'Aluguel', 'tipo': 'despesa', 'valor': valor})
+    assert resposta.status_code == 302
+    with cliente.session_transaction() as sessao:
+        assert ('danger', 'Valor inválido.') in sessao['_flashes']
+    assert db.session.query(Transacao).count() == 0
+
+    t = Transacao(nome='Aluguel', tipo='despesa', valor=Decimal('10'), data_criacao=datetime(2026, 1, 1))
+    db.session.add(t)
+    db.session.commit()
+    resposta = cliente.post(f'/transacoes/editar/{t.id}',
+                            data={'nome': 'Aluguel', 'tipo': 'despesa', 'valor': valor, 'data': '2026-01-02'})
+    assert resposta.status_code == 200
+    with cliente.session_transaction() as sessao:
+        assert any(m.startswith('Valor ou Data inválida') for _, m in sessao['_flashes'])
+    db.session.expire_all()
+    assert db.session.get(Transacao, t.id).valor == Decimal('10.00')